@@ -0,0 +1,96 @@
+"""store chunk embeddings in the configured vector search mode
+
+Revision ID: 0b6e2f9a1c57
+Revises: f41d8b2c6a93
+Create Date: 2026-10-16 11:20:05.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import pgvector.sqlalchemy
+
+from core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6e2f9a1c57'
+down_revision: Union[str, Sequence[str], None] = 'f41d8b2c6a93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Only the storage of settings.VECTOR_SEARCH_MODE is built, so the HNSW
+    # working set is one representation per chunk. Requires pgvector >= 0.7
+    # (halfvec, bit ops, binary_quantize). Switch modes later with
+    # convert_vector_storage.py.
+    mode = settings.VECTOR_SEARCH_MODE
+    if mode == 'float32':
+        return
+    if mode not in ('halfvec', 'binary'):
+        raise ValueError(f"Unknown vector search mode: {mode}")
+
+    # halfvec / binary: convert chunks.embedding in place (half the bytes);
+    # binary mode rescores its Hamming candidates against it
+    op.drop_index('ix_chunks_embedding_hnsw', table_name='chunks')
+    op.execute(
+        "ALTER TABLE chunks ALTER COLUMN embedding TYPE halfvec(1024) "
+        "USING embedding::halfvec(1024)"
+    )
+
+    if mode == 'halfvec':
+        op.create_index(
+            'ix_chunks_embedding_hnsw',
+            'chunks',
+            ['embedding'],
+            unique=False,
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'embedding': 'halfvec_cosine_ops'},
+        )
+        return
+
+    # binary: only the 128-byte sign bits are indexed; derived by PostgreSQL
+    # on every write, so ingestion (COPY included) needs no changes
+    op.add_column(
+        'chunks',
+        sa.Column(
+            'embedding_bin',
+            pgvector.sqlalchemy.BIT(length=1024),
+            sa.Computed('binary_quantize(embedding)::bit(1024)', persisted=True),
+            nullable=True,
+        )
+    )
+    op.create_index(
+        'ix_chunks_embedding_bin_hnsw',
+        'chunks',
+        ['embedding_bin'],
+        unique=False,
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_ops={'embedding_bin': 'bit_hamming_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Storage may have been switched after upgrade, so undo whatever is there
+    op.execute("DROP INDEX IF EXISTS ix_chunks_embedding_bin_hnsw")
+    op.execute("ALTER TABLE chunks DROP COLUMN IF EXISTS embedding_bin")
+    op.execute("DROP INDEX IF EXISTS ix_chunks_embedding_hnsw")
+    op.execute(
+        "ALTER TABLE chunks ALTER COLUMN embedding TYPE vector(1024) "
+        "USING embedding::vector(1024)"
+    )
+    op.create_index(
+        'ix_chunks_embedding_hnsw',
+        'chunks',
+        ['embedding'],
+        unique=False,
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_ops={'embedding': 'vector_cosine_ops'},
+    )
@@ -0,0 +1,50 @@
+"""add tsvector search column to chunks
+
+Revision ID: 1c8d5e7f2a94
+Revises: 0b6e2f9a1c57
+Create Date: 2026-10-16 15:42:11.218304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c8d5e7f2a94'
+down_revision: Union[str, Sequence[str], None] = '0b6e2f9a1c57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # PostgreSQL ships no Polish text search configuration (it needs ispell
+    # dictionaries installed on the server), so 'simple' is used: lowercase,
+    # no stemming - the same normalization as the in-memory BM25 tokenizer.
+    # The configuration must match FTS_CONFIG in services/search_service.py.
+    # Adding a STORED generated column rewrites the table once.
+    op.add_column(
+        'chunks',
+        sa.Column(
+            'text_search',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('simple'::regconfig, coalesce(text, ''))", persisted=True),
+            nullable=True
+        )
+    )
+    op.create_index(
+        'ix_chunks_text_search_gin',
+        'chunks',
+        ['text_search'],
+        unique=False,
+        postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chunks_text_search_gin', table_name='chunks', postgresql_using='gin')
+    op.drop_column('chunks', 'text_search')
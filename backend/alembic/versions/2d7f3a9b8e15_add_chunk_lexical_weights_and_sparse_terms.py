@@ -0,0 +1,82 @@
+"""add chunk lexical weights and sparse terms
+
+Revision ID: 2d7f3a9b8e15
+Revises: 1c8d5e7f2a94
+Create Date: 2026-10-16 18:07:36.512940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d7f3a9b8e15'
+down_revision: Union[str, Sequence[str], None] = '1c8d5e7f2a94'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # BGE-M3 lexical weights ({"<token id>": weight}) from the same encode()
+    # call that produced chunks.embedding
+    op.add_column('chunks', sa.Column('lexical_weights', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+    # Postings of the learned sparse index, one row per (chunk, token)
+    op.create_table(
+        'chunk_sparse_terms',
+        sa.Column('chunk_id', sa.Integer(), nullable=False),
+        sa.Column('project_id', sa.Integer(), nullable=True),
+        sa.Column('term_id', sa.Integer(), nullable=False),
+        sa.Column('weight', sa.REAL(), nullable=False),
+        sa.ForeignKeyConstraint(['chunk_id'], ['chunks.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('chunk_id', 'term_id')
+    )
+    # Query path: WHERE project_id = ? AND term_id = ANY(?) as an index-only scan
+    op.create_index(
+        'ix_chunk_sparse_terms_project_term',
+        'chunk_sparse_terms',
+        ['project_id', 'term_id'],
+        unique=False,
+        postgresql_include=['chunk_id', 'weight']
+    )
+
+    # Postings are derived from chunks.lexical_weights on every write, and
+    # follow chunks.project_id when a document moves between projects.
+    # Existing chunks get weights from backfill_lexical_weights.py.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION chunks_expand_lexical_weights() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' THEN
+                DELETE FROM chunk_sparse_terms WHERE chunk_id = NEW.id;
+            END IF;
+            IF NEW.lexical_weights IS NOT NULL THEN
+                INSERT INTO chunk_sparse_terms (chunk_id, project_id, term_id, weight)
+                SELECT NEW.id, NEW.project_id, key::integer, value::real
+                FROM jsonb_each_text(NEW.lexical_weights);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_chunks_expand_lexical_weights
+        AFTER INSERT OR UPDATE OF lexical_weights, project_id ON chunks
+        FOR EACH ROW EXECUTE FUNCTION chunks_expand_lexical_weights()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_chunks_expand_lexical_weights ON chunks")
+    op.execute("DROP FUNCTION IF EXISTS chunks_expand_lexical_weights()")
+    op.drop_index('ix_chunk_sparse_terms_project_term', table_name='chunk_sparse_terms')
+    op.drop_table('chunk_sparse_terms')
+    op.drop_column('chunks', 'lexical_weights')
@@ -0,0 +1,131 @@
+"""add project index versions
+
+Revision ID: 3e9a4c2d7b61
+Revises: 2d7f3a9b8e15
+Create Date: 2026-10-16 21:42:18.305117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e9a4c2d7b61'
+down_revision: Union[str, Sequence[str], None] = '2d7f3a9b8e15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Monotonic per-project counter, part of every search result cache key
+    op.create_table(
+        'project_index_versions',
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('project_id')
+    )
+
+    # Bumped in the same transaction as the write, so a reader never sees new
+    # chunks under an old version. Statement-level triggers keep bulk COPY
+    # ingestion at one upsert per project; projects are locked in id order
+    # to avoid deadlocks between concurrent ingestions.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_project_index_versions(project_ids integer[]) RETURNS void AS $$
+            INSERT INTO project_index_versions AS v (project_id, version, updated_at)
+            SELECT DISTINCT project_id, 1, now()
+            FROM unnest(project_ids) AS project_id
+            WHERE project_id IS NOT NULL
+            ORDER BY project_id
+            ON CONFLICT (project_id) DO UPDATE SET version = v.version + 1, updated_at = now();
+        $$ LANGUAGE sql
+        """
+    )
+    # Inserted, deleted (incl. cascades from documents) and re-embedded or
+    # moved chunks; updates of other columns (e.g. has_embedding flags) don't count
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION chunks_bump_project_index_version() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                PERFORM bump_project_index_versions(ARRAY(SELECT project_id FROM new_rows));
+            ELSIF TG_OP = 'DELETE' THEN
+                PERFORM bump_project_index_versions(ARRAY(SELECT project_id FROM old_rows));
+            ELSE
+                PERFORM bump_project_index_versions(ARRAY(
+                    SELECT unnest(ARRAY[o.project_id, n.project_id])
+                    FROM new_rows n JOIN old_rows o ON o.id = n.id
+                    WHERE n.text IS DISTINCT FROM o.text
+                       OR n.embedding IS DISTINCT FROM o.embedding
+                       OR n.project_id IS DISTINCT FROM o.project_id
+                ));
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_chunks_index_version_insert
+        AFTER INSERT ON chunks REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION chunks_bump_project_index_version()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_chunks_index_version_delete
+        AFTER DELETE ON chunks REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION chunks_bump_project_index_version()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_chunks_index_version_update
+        AFTER UPDATE ON chunks REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION chunks_bump_project_index_version()
+        """
+    )
+
+    # Document fields copied into results or used as filters
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION documents_bump_project_index_version() RETURNS trigger AS $$
+        BEGIN
+            PERFORM bump_project_index_versions(ARRAY(
+                SELECT unnest(ARRAY[o.project_id, n.project_id])
+                FROM new_rows n JOIN old_rows o ON o.id = n.id
+                WHERE n.category_id IS DISTINCT FROM o.category_id
+                   OR n.project_id IS DISTINCT FROM o.project_id
+                   OR n.title IS DISTINCT FROM o.title
+                   OR n.filename IS DISTINCT FROM o.filename
+            ));
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_documents_index_version_update
+        AFTER UPDATE ON documents REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION documents_bump_project_index_version()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_documents_index_version_update ON documents")
+    op.execute("DROP FUNCTION IF EXISTS documents_bump_project_index_version()")
+    op.execute("DROP TRIGGER IF EXISTS trg_chunks_index_version_update ON chunks")
+    op.execute("DROP TRIGGER IF EXISTS trg_chunks_index_version_delete ON chunks")
+    op.execute("DROP TRIGGER IF EXISTS trg_chunks_index_version_insert ON chunks")
+    op.execute("DROP FUNCTION IF EXISTS chunks_bump_project_index_version()")
+    op.execute("DROP FUNCTION IF EXISTS bump_project_index_versions(integer[])")
+    op.drop_table('project_index_versions')
@@ -0,0 +1,39 @@
+"""add hnsw index on chunk embeddings
+
+Revision ID: e3a9c71d4b20
+Revises: 8574c5550787
+Create Date: 2026-10-16 09:12:44.218503
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9c71d4b20'
+down_revision: Union[str, Sequence[str], None] = '8574c5550787'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # HNSW index for cosine-distance k-NN (ORDER BY embedding <=> :q LIMIT k).
+    # m / ef_construction are pgvector defaults; query-time recall is tuned
+    # per request with hnsw.ef_search.
+    op.create_index(
+        'ix_chunks_embedding_hnsw',
+        'chunks',
+        ['embedding'],
+        unique=False,
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_ops={'embedding': 'vector_cosine_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chunks_embedding_hnsw', table_name='chunks')
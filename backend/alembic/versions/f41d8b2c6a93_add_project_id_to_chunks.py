@@ -0,0 +1,100 @@
+"""add project_id to chunks
+
+Revision ID: f41d8b2c6a93
+Revises: e3a9c71d4b20
+Create Date: 2026-10-16 10:03:27.551840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f41d8b2c6a93'
+down_revision: Union[str, Sequence[str], None] = 'e3a9c71d4b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('chunks', sa.Column('project_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_chunks_project_id_projects', 'chunks', 'projects',
+        ['project_id'], ['id'], ondelete='CASCADE'
+    )
+
+    # Backfill from the owning document
+    op.execute(
+        """
+        UPDATE chunks AS c
+        SET project_id = d.project_id
+        FROM documents AS d
+        WHERE c.document_id = d.id
+        """
+    )
+
+    # chunks.project_id is always derived from documents.project_id:
+    # filled on insert / document_id change, propagated when a document moves.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION chunks_set_project_id() RETURNS trigger AS $$
+        BEGIN
+            SELECT project_id INTO NEW.project_id FROM documents WHERE id = NEW.document_id;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_chunks_set_project_id
+        BEFORE INSERT OR UPDATE OF document_id ON chunks
+        FOR EACH ROW EXECUTE FUNCTION chunks_set_project_id()
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION documents_propagate_project_id() RETURNS trigger AS $$
+        BEGIN
+            UPDATE chunks SET project_id = NEW.project_id WHERE document_id = NEW.id;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_documents_propagate_project_id
+        AFTER UPDATE OF project_id ON documents
+        FOR EACH ROW
+        WHEN (OLD.project_id IS DISTINCT FROM NEW.project_id)
+        EXECUTE FUNCTION documents_propagate_project_id()
+        """
+    )
+
+    # Project-scoped lookups (statistics, category semi-join, BM25 loads)
+    op.create_index('ix_chunks_project_id_document_id', 'chunks', ['project_id', 'document_id'], unique=False)
+    # Searchable chunks only: small projects are scanned exactly through this
+    # index instead of post-filtering the global HNSW graph
+    op.create_index(
+        'ix_chunks_project_id_embedded',
+        'chunks',
+        ['project_id', 'id'],
+        unique=False,
+        postgresql_where=sa.text('has_embedding = 1'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chunks_project_id_embedded', table_name='chunks')
+    op.drop_index('ix_chunks_project_id_document_id', table_name='chunks')
+    op.execute("DROP TRIGGER IF EXISTS trg_documents_propagate_project_id ON documents")
+    op.execute("DROP FUNCTION IF EXISTS documents_propagate_project_id()")
+    op.execute("DROP TRIGGER IF EXISTS trg_chunks_set_project_id ON chunks")
+    op.execute("DROP FUNCTION IF EXISTS chunks_set_project_id()")
+    op.drop_constraint('fk_chunks_project_id_projects', 'chunks', type_='foreignkey')
+    op.drop_column('chunks', 'project_id')
@@ -37,7 +37,9 @@ from api.dependencies import (
 )
 from services.pdf_processor import PDFProcessor
 from services.text_chunker import TextChunker
-from services.embedding_generator import EmbeddingGenerator
+from services.embedding_generator import embedding_generator
+from services.bm25_service import bm25_service
+from services.rerank_score_cache import rerank_score_cache
 from services.usage_service import usage_service
 from services.category_tree_generator import generate_category_tree
 from services.activity_tracker import ActivityTracker
@@ -50,7 +52,6 @@ logger = logging.getLogger(__name__)
 # Initialize services
 pdf_processor = PDFProcessor(upload_dir=settings.UPLOAD_DIR)
 text_chunker = TextChunker()
-embedding_generator = EmbeddingGenerator()
 
 
 @router.post("/upload", response_model=DocumentUploadResponse, status_code=status.HTTP_201_CREATED)
@@ -691,6 +692,10 @@ async def delete_document(
     await db.delete(document)
     await db.commit()
 
+    # Drop the document's chunks from the in-memory sparse index and score cache
+    bm25_service.remove_document(document_id)
+    rerank_score_cache.invalidate_document(document_id)
+
     logger.info(f"Deleted document: {document_id}")
     return None
 
@@ -23,6 +23,7 @@ from schemas.project import (
     ProjectListResponse,
 )
 from api.dependencies import get_current_active_user
+from services.bm25_service import bm25_service
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 logger = logging.getLogger(__name__)
@@ -259,6 +260,8 @@ async def delete_project(
     await db.delete(project)
     await db.commit()
 
+    bm25_service.remove_project(project_id)
+
     logger.info(
         f"Project deleted: {project.id} by user {current_user.id} "
         f"(had {stats['document_count']} documents, "
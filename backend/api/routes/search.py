@@ -3,11 +3,16 @@ KnowledgeTree Backend - Search Routes
 Semantic search endpoints using vector similarity
 """
 
+import json
 import logging
+import time
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from core.config import settings
 from core.database import get_db
 from models.user import User
 from models.project import Project
@@ -17,11 +22,17 @@ from schemas.search import (
     SearchResponse,
     SearchStatistics,
     HybridSearchRequest,
+    BatchSearchRequest,
+    BatchSearchItem,
     RerankSearchRequest,
 )
 from api.dependencies import get_current_active_user
-from services.search_service import SearchService
+from services.search_service import SearchService, query_embedding_batcher
+from services.cross_encoder_service import cross_encoder_service
+from services.query_embedding_cache import query_embedding_cache
+from services.inference_executor import inference_executor
 from services.explainability_service import explainability_service
+from services.pipeline_metrics import stage_timer
 from services.activity_tracker import ActivityTracker
 
 router = APIRouter(prefix="/search", tags=["Search"])
@@ -31,6 +42,31 @@ logger = logging.getLogger(__name__)
 search_service = SearchService()
 
 
+def _round_timings(timings: dict) -> dict:
+    """Stage timings for SearchResponse.timings (ms, 2 decimals)"""
+    return {name: round(ms, 2) for name, ms in timings.items()}
+
+
+def _project(response: SearchResponse, fields: Optional[List[str]]):
+    """
+    Apply a request's `fields` projection to the results
+
+    Projected responses are serialized here and returned as a JSONResponse,
+    since the omitted required fields would fail response_model validation.
+    """
+    if not fields:
+        return response
+    return JSONResponse(response.model_dump(mode="json", exclude=_projection_exclude(fields)))
+
+
+def _projection_exclude(fields: Optional[List[str]]) -> Optional[dict]:
+    """model_dump() exclude spec dropping the result fields not in a projection"""
+    if not fields:
+        return None
+    omitted = set(SearchResult.model_fields) - set(fields) - {"chunk_id"}
+    return {"results": {"__all__": omitted}}
+
+
 @router.post("/", response_model=SearchResponse)
 async def search_documents(
     search_request: SearchRequest,
@@ -75,13 +111,16 @@ async def search_documents(
 
     try:
         # Perform search
+        timings = {}
         results, execution_time = await search_service.search(
             db=db,
             query=search_request.query,
             project_id=search_request.project_id,
             limit=search_request.limit,
             min_similarity=search_request.min_similarity,
-            category_id=search_request.category_id
+            category_id=search_request.category_id,
+            ef_search=search_request.ef_search,
+            timings=timings
         )
 
         # Re-rank results with recency boost
@@ -120,13 +159,15 @@ async def search_documents(
             response_time_ms=int(execution_time)
         )
 
-        return SearchResponse(
+        response = SearchResponse(
             query=search_request.query,
             results=search_results,
             total_results=len(search_results),
             execution_time_ms=round(execution_time, 2),
-            filters_applied=filters_applied
+            filters_applied=filters_applied,
+            timings=_round_timings(timings)
         )
+        return _project(response, search_request.fields)
 
     except Exception as e:
         logger.error(f"Search failed: {str(e)}")
@@ -184,6 +225,29 @@ async def get_search_statistics(
         )
 
 
+@router.get("/cache/stats")
+async def get_search_cache_stats(
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Get query embedding cache, rerank score cache, search result cache,
+    inference executor and micro-batcher metrics for this API process
+
+    Returns size, per-tier hits (memory/Redis), misses, hit rate,
+    evictions and Redis error count, cross-encoder score cache hit rate
+    and invalidations, inference queue depth and wait/run times, and
+    per-batcher batch sizes and flush delays.
+    """
+    return {
+        "query_embedding_cache": query_embedding_cache.get_stats(),
+        "rerank_score_cache": cross_encoder_service.score_cache.get_stats(),
+        "search_result_cache": search_service.search_result_cache.get_stats(),
+        "inference_executor": inference_executor.get_stats(),
+        "query_embedding_batcher": query_embedding_batcher.get_stats(),
+        "cross_encoder_batcher": cross_encoder_service.batcher.get_stats(),
+    }
+
+
 @router.post("/sparse", response_model=SearchResponse)
 async def search_sparse(
     search_request: SearchRequest,
@@ -228,12 +292,15 @@ async def search_sparse(
 
     try:
         # Perform sparse search
+        timings = {}
         results, execution_time = await search_service.search_sparse(
             db=db,
             query=search_request.query,
             project_id=search_request.project_id,
             limit=search_request.limit,
-            min_score=search_request.min_similarity  # Reuse min_similarity field
+            min_score=search_request.min_similarity,  # Reuse min_similarity field
+            engine=search_request.sparse_engine,
+            timings=timings
         )
 
         # Format response
@@ -244,7 +311,7 @@ async def search_sparse(
             "category_id": search_request.category_id,
             "min_bm25_score": search_request.min_similarity,
             "limit": search_request.limit,
-            "search_type": "sparse (BM25)",
+            "search_type": f"sparse ({search_request.sparse_engine or settings.SPARSE_ENGINE})",
         }
 
         logger.info(
@@ -254,13 +321,15 @@ async def search_sparse(
             f"time={execution_time:.2f}ms"
         )
 
-        return SearchResponse(
+        response = SearchResponse(
             query=search_request.query,
             results=search_results,
             total_results=len(search_results),
             execution_time_ms=round(execution_time, 2),
-            filters_applied=filters_applied
+            filters_applied=filters_applied,
+            timings=_round_timings(timings)
         )
+        return _project(response, search_request.fields)
 
     except Exception as e:
         logger.error(f"Sparse search failed: {str(e)}")
@@ -325,6 +394,7 @@ async def search_hybrid(
 
     try:
         # Perform hybrid search
+        timings = {}
         results, execution_time = await search_service.hybrid_search(
             db=db,
             query=search_request.query,
@@ -335,7 +405,10 @@ async def search_hybrid(
             min_bm25_score=search_request.min_bm25_score,
             dense_weight=search_request.dense_weight,
             sparse_weight=search_request.sparse_weight,
-            category_id=search_request.category_id
+            category_id=search_request.category_id,
+            ef_search=search_request.ef_search,
+            sparse_engine=search_request.sparse_engine,
+            timings=timings
         )
 
         # Format response
@@ -367,14 +440,16 @@ async def search_hybrid(
             f"time={execution_time:.2f}ms"
         )
 
-        return SearchResponse(
+        response = SearchResponse(
             query=search_request.query,
             results=search_results,
             total_results=len(search_results),
             execution_time_ms=round(execution_time, 2),
             filters_applied=filters_applied,
-            pipeline_summary=pipeline_summary
+            pipeline_summary=pipeline_summary,
+            timings=_round_timings(timings)
         )
+        return _project(response, search_request.fields)
 
     except Exception as e:
         logger.error(f"Hybrid search failed: {str(e)}")
@@ -384,6 +459,93 @@ async def search_hybrid(
         )
 
 
+@router.post("/batch")
+async def search_batch(
+    search_request: BatchSearchRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Hybrid search for many queries of one project, streamed as NDJSON
+
+    Meant for evaluation jobs and bulk integrations that would otherwise call
+    /search/hybrid once per query. Queries are processed in groups
+    (BATCH_SEARCH_GROUP_SIZE): each group is embedded in one batched model
+    call, searched with one pgvector SQL statement and scored in one BM25
+    pass, then fused per query with RRF exactly like /search/hybrid.
+
+    **Request:** `queries` (1-100) plus the /search/hybrid parameters, applied
+    to every query, and an optional `fields` projection.
+
+    **Returns:** `application/x-ndjson`, one line per query as soon as its group
+    finishes, in query order:
+    `{"index": 0, "query": "...", "results": [...], "total_results": 10}`.
+    A failure after streaming has started ends the stream with an
+    `{"error": "..."}` line.
+    """
+    # Verify project access (before the response starts)
+    result = await db.execute(
+        select(Project).where(
+            Project.id == search_request.project_id,
+            Project.owner_id == current_user.id
+        )
+    )
+    project = result.scalar_one_or_none()
+
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found or access denied"
+        )
+
+    exclude = _projection_exclude(search_request.fields)
+
+    async def generate():
+        # The retrieval legs open their own sessions: the request session is
+        # not used once the response is streaming
+        start_time = time.time()
+        timings = {}
+        try:
+            async for index, results in search_service.hybrid_search_batch(
+                queries=search_request.queries,
+                project_id=search_request.project_id,
+                limit=search_request.limit,
+                top_k_retrieve=search_request.top_k_retrieve,
+                min_similarity=search_request.min_similarity,
+                min_bm25_score=search_request.min_bm25_score,
+                dense_weight=search_request.dense_weight,
+                sparse_weight=search_request.sparse_weight,
+                category_id=search_request.category_id,
+                ef_search=search_request.ef_search,
+                sparse_engine=search_request.sparse_engine,
+                timings=timings
+            ):
+                item = BatchSearchItem(
+                    index=index,
+                    query=search_request.queries[index],
+                    results=[SearchResult(**result) for result in results],
+                    total_results=len(results)
+                )
+                yield item.model_dump_json(exclude=exclude) + "\n"
+
+            execution_time = (time.time() - start_time) * 1000
+            logger.info(
+                f"Batch search completed for user {current_user.id}: "
+                f"queries={len(search_request.queries)}, time={execution_time:.2f}ms, "
+                f"timings={_round_timings(timings)}"
+            )
+
+        except Exception as e:
+            logger.error(f"Batch search failed: {str(e)}")
+            yield json.dumps({"error": f"Batch search failed: {str(e)}"}) + "\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/x-ndjson",
+        headers={"X-Accel-Buffering": "no"}  # Disable Nginx buffering
+    )
+
+
 @router.post("/reranked", response_model=SearchResponse)
 async def search_with_reranking(
     search_request: RerankSearchRequest,
@@ -422,13 +584,19 @@ async def search_with_reranking(
     - `min_similarity`: Minimum similarity for dense search (default: 0.5)
     - `min_bm25_score`: Minimum BM25 score (default: 0.0)
     - `min_cross_encoder_score`: Minimum cross-encoder score (default: 0.0)
+    - `rerank_stages`: Cascade stage sizes, e.g. [12, 6]: cheap truncated-input
+      passes keep that many candidates before the full cross-encoder pass
     - `dense_weight`: Override dense weight (default: 0.6)
     - `sparse_weight`: Override sparse weight (default: 0.4)
+    - `include_explanations`: Attach a per-result explanation (default: false)
+    - `fields`: Return only these result fields (chunk_id always included)
 
     **Returns:**
     - Reranked results with cross-encoder scores
     - Original ranks for comparison
     - Individual scores for transparency (dense, sparse, RRF, cross-encoder)
+    - Pipeline metadata once per response (`pipeline`: confidence level,
+      reranking skip metrics, query expansion, CRAG evaluation)
     - Execution time and applied filters
 
     **Performance Target**: ~700ms total (500ms hybrid + 200ms reranking)
@@ -453,6 +621,8 @@ async def search_with_reranking(
     try:
         # Perform complete TIER 1 pipeline
         # Perform complete TIER 1+2 pipeline (with query expansion + CRAG)
+        timings = {}
+        pipeline = {}
         results, execution_time = await search_service.search_with_reranking(
             db=db,
             query=search_request.query,
@@ -467,7 +637,13 @@ async def search_with_reranking(
             category_id=search_request.category_id,
             use_query_expansion=search_request.use_query_expansion,
             expansion_strategy=search_request.expansion_strategy,
-            use_crag=search_request.use_crag
+            use_crag=search_request.use_crag,
+            ef_search=search_request.ef_search,
+            sparse_engine=search_request.sparse_engine,
+            rerank_stages=search_request.rerank_stages,
+            include_explanations=search_request.include_explanations,
+            timings=timings,
+            pipeline=pipeline
         )
 
         # Format response
@@ -485,14 +661,20 @@ async def search_with_reranking(
             "sparse_weight": search_request.sparse_weight or 0.4,
             "search_type": "TIER 1 complete (hybrid + reranking)",
             "pipeline_stages": ["dense", "sparse", "RRF", "cross-encoder"],
+            "rerank_stages": (
+                search_request.rerank_stages
+                if search_request.rerank_stages is not None else settings.RERANK_CASCADE_STAGES
+            ),
+            "include_explanations": search_request.include_explanations,
         }
 
         # TIER 2 Phase 2: Generate pipeline summary
-        pipeline_summary = explainability_service.generate_pipeline_summary(
-            results=results,
-            pipeline_type="reranked",
-            execution_time_ms=execution_time
-        )
+        with stage_timer("pipeline_summary", timings):
+            pipeline_summary = explainability_service.generate_pipeline_summary(
+                results=results,
+                pipeline_type="reranked",
+                execution_time_ms=execution_time
+            )
 
         logger.info(
             f"TIER 1 Complete search for user {current_user.id}: "
@@ -501,14 +683,17 @@ async def search_with_reranking(
             f"time={execution_time:.2f}ms"
         )
 
-        return SearchResponse(
+        response = SearchResponse(
             query=search_request.query,
             results=search_results,
             total_results=len(search_results),
             execution_time_ms=round(execution_time, 2),
             filters_applied=filters_applied,
-            pipeline_summary=pipeline_summary
+            pipeline_summary=pipeline_summary,
+            timings=_round_timings(timings),
+            pipeline=pipeline
         )
+        return _project(response, search_request.fields)
 
     except Exception as e:
         logger.error(f"Reranked search failed: {str(e)}")
@@ -0,0 +1,137 @@
+"""
+Backfill BGE-M3 lexical weights for existing chunks
+
+Fills chunks.lexical_weights after migration 2d7f3a9b8e15. New chunks get
+their weights at ingestion from the same forward pass as the dense vector;
+rows written before the migration have to be encoded once more. The
+chunk_sparse_terms postings are expanded from the column by a trigger.
+
+Weights are computed from the same "[BEFORE] ... [MAIN] ... [AFTER] ..."
+text as contextual embeddings (dense vectors are not touched). Rows are
+processed in id ranges with one commit per batch, so the script can be
+interrupted and re-run safely (only rows without weights are touched).
+
+Usage:
+    python backfill_lexical_weights.py                  # All projects
+    python backfill_lexical_weights.py --project-id 1   # One project
+    python backfill_lexical_weights.py --batch-size 256
+    python backfill_lexical_weights.py --dry-run        # Count rows only
+"""
+
+import sys
+import os
+import asyncio
+import argparse
+import json
+import time
+from sqlalchemy import text
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.database import AsyncSessionLocal
+from services.chunk_writer import ChunkWriter
+from services.embedding_generator import embedding_generator
+
+
+PENDING_FILTER = """
+    embedding IS NOT NULL
+    AND lexical_weights IS NULL
+    AND (CAST(:project_id AS integer) IS NULL OR project_id = :project_id)
+"""
+
+
+async def count_pending(project_id: int = None) -> int:
+    """Count chunks that still have no lexical weights"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            text(f"SELECT count(*) FROM chunks WHERE {PENDING_FILTER}"),
+            {"project_id": project_id}
+        )
+        return result.scalar() or 0
+
+
+async def backfill(project_id: int = None, batch_size: int = 256) -> int:
+    """
+    Encode pending rows in id-ordered batches
+
+    Returns:
+        Number of rows updated
+    """
+    updated_total = 0
+    last_id = 0
+    start = time.time()
+
+    while True:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                text(
+                    f"""
+                    SELECT id, text, chunk_before, chunk_after FROM chunks
+                    WHERE id > :last_id AND {PENDING_FILTER}
+                    ORDER BY id
+                    LIMIT :batch_size
+                    """
+                ),
+                {"last_id": last_id, "batch_size": batch_size, "project_id": project_id}
+            )
+            rows = result.fetchall()
+            if not rows:
+                break
+
+            lexical_weights = []
+            await asyncio.to_thread(
+                embedding_generator.generate_contextual_embeddings_batch,
+                [{"text": row.text, "chunk_before": row.chunk_before, "chunk_after": row.chunk_after} for row in rows],
+                lexical_weights=lexical_weights
+            )
+
+            updates = [
+                {
+                    "id": row.id,
+                    "weights": json.dumps(ChunkWriter.encode_lexical_weights(weights))
+                }
+                for row, weights in zip(rows, lexical_weights)
+                if weights is not None
+            ]
+            if updates:
+                await db.execute(
+                    text("UPDATE chunks SET lexical_weights = CAST(:weights AS jsonb) WHERE id = :id"),
+                    updates
+                )
+            await db.commit()
+
+        last_id = rows[-1].id
+        updated_total += len(updates)
+        rate = updated_total / max(time.time() - start, 1e-6)
+        print(f"   ✓ {updated_total} rows encoded (last id {last_id}, {rate:.0f} rows/s)")
+
+    return updated_total
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backfill BGE-M3 lexical weights of chunks")
+    parser.add_argument("--project-id", type=int, help="Only backfill chunks of this project")
+    parser.add_argument("--batch-size", type=int, default=256, help="Rows per encode/commit")
+    parser.add_argument("--dry-run", action="store_true", help="Only count pending rows")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("🔤 Lexical weight backfill")
+    print("=" * 80)
+
+    pending = await count_pending(args.project_id)
+    print(f"   Pending rows: {pending}")
+
+    if args.dry_run or pending == 0:
+        return
+
+    updated = await backfill(args.project_id, args.batch_size)
+
+    print(f"\n✅ Backfill completed: {updated} rows")
+    print("   Run VACUUM ANALYZE chunk_sparse_terms before switching SPARSE_ENGINE to lexical")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+"""
+KnowledgeTree - Sparse Index Scoring Benchmark
+==============================================
+
+Purpose: Measure BM25 query latency against corpus size for:
+
+1. okapi - rank_bm25.BM25Okapi.get_scores + full argsort (previous engine)
+2. dict  - BM25Index delta segment only (dict postings + heapq)
+3. csr   - BM25Index compacted base segment (CSR weights + argpartition)
+4. batch - BM25Index.top_k_many over groups of --batch-size queries
+           (/search/batch); latency is per query, amortized over its group
+
+The corpus is synthetic: chunk lengths and term frequencies follow a Zipf
+distribution (as natural text does), queries mix frequent and rare terms.
+No database is needed.
+
+Usage:
+    python benchmarks/bench_bm25_index.py
+    python benchmarks/bench_bm25_index.py --sizes 10000 100000 1000000 --okapi-max 100000
+"""
+
+import argparse
+import heapq
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from services.bm25_index import BM25Index
+
+
+def make_corpus(size: int, vocabulary: int, seed: int = 0) -> List[List[str]]:
+    """Zipf-distributed token lists, 40-200 tokens per chunk"""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(40, 200, size=size)
+    term_ids = (rng.zipf(1.2, size=int(lengths.sum())) - 1) % vocabulary
+    words = [f"t{i}" for i in range(vocabulary)]
+    corpus, offset = [], 0
+    for length in lengths:
+        corpus.append([words[t] for t in term_ids[offset:offset + length]])
+        offset += length
+    return corpus
+
+
+def make_queries(count: int, vocabulary: int, seed: int = 1) -> List[List[str]]:
+    """Queries of 2-6 terms: mostly mid-frequency, some head and tail terms"""
+    rng = np.random.default_rng(seed)
+    queries = []
+    for _ in range(count):
+        terms = rng.integers(0, min(vocabulary, 5000), size=rng.integers(2, 7))
+        queries.append([f"t{t}" for t in terms])
+    return queries
+
+
+def time_queries(search, queries) -> List[float]:
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        search(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def time_batches(search_many, queries, batch_size: int) -> List[float]:
+    """Per-query latencies, each group's wall time split evenly over its queries"""
+    latencies = []
+    for offset in range(0, len(queries), batch_size):
+        group = queries[offset:offset + batch_size]
+        started = time.perf_counter()
+        search_many(group)
+        latencies.extend([(time.perf_counter() - started) * 1000 / len(group)] * len(group))
+    return latencies
+
+
+def report(engine: str, size: int, build_seconds: float, latencies: List[float]) -> None:
+    p50 = statistics.median(latencies)
+    p95 = sorted(latencies)[int(len(latencies) * 0.95) - 1]
+    print(f"{engine:<7} {size:>9} {build_seconds:>10.1f} {p50:>10.2f} {p95:>10.2f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="BM25 scoring latency vs corpus size")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--vocabulary", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=16, help="Queries per top_k_many() call")
+    parser.add_argument("--okapi-max", type=int, default=100_000, help="Skip BM25Okapi above this size")
+    parser.add_argument("--dict-max", type=int, default=100_000, help="Skip the dict segment above this size")
+    args = parser.parse_args()
+
+    queries = make_queries(args.queries, args.vocabulary)
+    k = args.top_k
+    print(f"🔬 {args.queries} queries, top_k={k}")
+    print(f"\n{'engine':<7} {'chunks':>9} {'build s':>10} {'p50 ms':>10} {'p95 ms':>10}")
+
+    for size in args.sizes:
+        corpus = make_corpus(size, args.vocabulary)
+
+        if size <= args.okapi_max:
+            try:
+                from rank_bm25 import BM25Okapi
+            except ImportError:
+                BM25Okapi = None
+            if BM25Okapi is not None:
+                started = time.perf_counter()
+                okapi = BM25Okapi(corpus)
+                build = time.perf_counter() - started
+                report("okapi", size, build, time_queries(
+                    lambda q: np.argsort(okapi.get_scores(q))[::-1][:k], queries
+                ))
+                del okapi
+
+        if size <= args.dict_max:
+            index = BM25Index(compact_min_delta=size + 1)
+            started = time.perf_counter()
+            for doc_id, tokens in enumerate(corpus):
+                index.add_document(doc_id, tokens)
+            build = time.perf_counter() - started
+            report("dict", size, build, time_queries(
+                lambda q: heapq.nlargest(k, index.get_scores(q).items(), key=lambda item: item[1]), queries
+            ))
+            del index
+
+        index = BM25Index()
+        started = time.perf_counter()
+        index.load_documents(enumerate(corpus))
+        build = time.perf_counter() - started
+        report("csr", size, build, time_queries(lambda q: index.top_k(q, k), queries))
+        report("batch", size, build, time_batches(lambda group: index.top_k_many(group, k), queries, args.batch_size))
+        del index, corpus
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+KnowledgeTree - Chunk Persistence Benchmark
+===========================================
+
+Purpose: Measure rows/sec for storing document chunks (1024-dim embedding +
+text columns) with the three strategies:
+
+1. orm    - db.add(Chunk(...)) per row + flush (previous behaviour)
+2. insert - ChunkWriter executemany INSERT (multi-row VALUES)
+3. copy   - ChunkWriter binary COPY via asyncpg
+
+Rows are attached to an existing document and every run is rolled back, so
+the database is left unchanged.
+
+Usage:
+    python benchmarks/bench_chunk_writer.py --document-id 42
+    python benchmarks/bench_chunk_writer.py --document-id 42 --rows 2000
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from core.database import AsyncSessionLocal
+from models.chunk import Chunk
+from services.chunk_writer import ChunkWriter
+
+
+def make_rows(document_id: int, count: int) -> List[Dict]:
+    """Synthetic rows shaped like real ingestion output (~1000-char chunks)"""
+    rng = np.random.default_rng(0)
+    text = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 18
+    rows = []
+    for i in range(count):
+        embedding = rng.standard_normal(1024).astype(np.float32)
+        embedding /= np.linalg.norm(embedding)
+        rows.append(ChunkWriter.make_row(
+            document_id=document_id,
+            text=text,
+            embedding=embedding.tolist(),
+            chunk_index=i,
+            chunk_metadata={"page": i // 4, "chunk_index": i},
+            chunk_before=text[:200],
+            chunk_after=text[:200]
+        ))
+    return rows
+
+
+async def run_strategy(strategy: str, rows: List[Dict]) -> float:
+    """Write rows with one strategy inside a rolled-back transaction, return seconds"""
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+
+        if strategy == "orm":
+            for row in rows:
+                db.add(Chunk(**row))
+            await db.flush()
+        else:
+            writer = ChunkWriter(use_copy=(strategy == "copy"))
+            await writer.write(db, rows)
+
+        elapsed = time.perf_counter() - started
+        await db.rollback()
+        return elapsed
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Chunk persistence rows/sec benchmark")
+    parser.add_argument("--document-id", type=int, required=True, help="Existing document to attach rows to")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = make_rows(args.document_id, args.rows)
+    print(f"🔬 {args.rows} rows per run, best of {args.repeat}")
+    print(f"\n{'strategy':<10} {'seconds':>10} {'rows/sec':>12}")
+
+    for strategy in ("orm", "insert", "copy"):
+        best = min([await run_strategy(strategy, rows) for _ in range(args.repeat)])
+        print(f"{strategy:<10} {best:>10.3f} {args.rows / best:>12.0f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,149 @@
+"""
+KnowledgeTree - Cascade Reranking Benchmark
+===========================================
+
+Purpose: Compare cascade reranking configurations (RERANK_CASCADE_STAGES /
+the rerank_stages request field) against the single-stage path, which
+scores every candidate with the full cross-encoder.
+
+For each query, hybrid retrieval runs once and every configuration
+reranks the same candidates, so differences come from reranking only.
+Reported per configuration:
+
+- p50/p95 rerank latency and model pairs scored per query
+- agreement@k: overlap of the top-k with the single-stage top-k
+- hit@k / MRR of the chunk each query was sampled from (pseudo label)
+
+The score cache is disabled so every configuration pays for its own model
+calls.
+
+Usage:
+    python benchmarks/bench_rerank_cascade.py --project-id 1
+    python benchmarks/bench_rerank_cascade.py --project-id 1 --stages 12 8,4 --queries 100
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from core.database import AsyncSessionLocal
+from services.cross_encoder_service import CrossEncoderService
+from services.rerank_score_cache import RerankScoreCache
+from services.search_service import SearchService
+
+
+async def sample_queries(project_id: int, count: int) -> List[Tuple[int, str]]:
+    """First sentence of random chunks as (source chunk id, query text)"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            text(
+                "SELECT id, left(text, 200) FROM chunks "
+                "WHERE project_id = :project_id AND has_embedding = 1 "
+                "ORDER BY random() LIMIT :count"
+            ),
+            {"project_id": project_id, "count": count}
+        )
+        return [(row[0], row[1].split(". ")[0]) for row in result.fetchall() if row[1]]
+
+
+def parse_stages(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+async def run_config(
+    reranker: CrossEncoderService,
+    stages: List[int],
+    candidates: List[Tuple[int, str, List[dict]]],
+    limit: int
+) -> Tuple[Dict[str, float], List[List[int]]]:
+    latencies, pairs, rankings = [], [], []
+    hits, reciprocal_ranks = 0, []
+
+    for source_id, query, results in candidates:
+        scored_before = reranker.pairs_scored
+        started = time.perf_counter()
+        reranked = await reranker.rerank(
+            query, [dict(r) for r in results], top_k=limit, stages=stages
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+        pairs.append(reranker.pairs_scored - scored_before)
+
+        ranking = [r["chunk_id"] for r in reranked]
+        rankings.append(ranking)
+        if source_id in ranking:
+            hits += 1
+            reciprocal_ranks.append(1 / (ranking.index(source_id) + 1))
+        else:
+            reciprocal_ranks.append(0.0)
+
+    return {
+        "p50": statistics.median(latencies),
+        "p95": sorted(latencies)[int(len(latencies) * 0.95) - 1],
+        "pairs": statistics.mean(pairs),
+        "hit": hits / len(candidates),
+        "mrr": statistics.mean(reciprocal_ranks),
+    }, rankings
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Cascade vs single-stage cross-encoder reranking")
+    parser.add_argument("--project-id", type=int, required=True)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--retrieval-limit", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument(
+        "--stages", nargs="+", default=["12", "10,6", "8"],
+        help="Cascade configurations to compare, comma-separated stage sizes"
+    )
+    args = parser.parse_args()
+
+    queries = await sample_queries(args.project_id, args.queries)
+    if not queries:
+        print(f"❌ Project {args.project_id} has no embedded chunks")
+        return 1
+
+    service = SearchService()
+    candidates = []
+    for source_id, query in queries:
+        async with AsyncSessionLocal() as db:
+            results, _ = await service.hybrid_search(
+                db=db, query=query, project_id=args.project_id,
+                limit=args.retrieval_limit, top_k_retrieve=args.retrieval_limit, min_similarity=0.0
+            )
+        if results:
+            candidates.append((source_id, query, results))
+
+    reranker = CrossEncoderService(score_cache=RerankScoreCache(enabled=False))
+    reranker.initialize()
+    await run_config(reranker, [], candidates[:3], args.limit)  # warm up
+
+    print(f"🔬 {len(candidates)} queries, {args.retrieval_limit} candidates -> top {args.limit}")
+    print(f"\n{'stages':<12} {'p50 ms':>8} {'p95 ms':>8} {'pairs':>7} {'agree@k':>8} {'hit@k':>7} {'MRR':>6}")
+
+    baseline, baseline_rankings = await run_config(reranker, [], candidates, args.limit)
+    print(f"{'single':<12} {baseline['p50']:>8.1f} {baseline['p95']:>8.1f} {baseline['pairs']:>7.1f} "
+          f"{1.0:>8.1%} {baseline['hit']:>7.1%} {baseline['mrr']:>6.3f}")
+
+    for config in args.stages:
+        stages = parse_stages(config)
+        stats, rankings = await run_config(reranker, stages, candidates, args.limit)
+        agreement = statistics.mean(
+            len(set(a) & set(b)) / max(len(b), 1) for a, b in zip(rankings, baseline_rankings)
+        )
+        print(f"{config:<12} {stats['p50']:>8.1f} {stats['p95']:>8.1f} {stats['pairs']:>7.1f} "
+              f"{agreement:>8.1%} {stats['hit']:>7.1%} {stats['mrr']:>6.3f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,123 @@
+"""
+KnowledgeTree - Sparse Engine Comparison Benchmark
+==================================================
+
+Purpose: Compare the sparse retrieval engines of SearchService.search_sparse
+on a real project:
+
+1. bm25     - in-memory per-project BM25 shard (per API replica)
+2. postgres - chunks.text_search tsvector + GIN index, ranked with ts_rank_cd
+3. lexical  - BGE-M3 lexical weights in chunk_sparse_terms (latency includes
+              the query's sparse encode)
+
+Reports p50/p95 latency per engine, the BM25 shard's memory, and the overlap
+of each engine's top-k lists with bm25's (the engines rank differently;
+overlap shows how far apart they are, not which one is right). The lexical
+engine needs lexical weights (ingested after migration 2d7f3a9b8e15 or
+filled by backfill_lexical_weights.py).
+
+Queries are sampled from the project's own chunk text (2-4 consecutive words),
+so every query has at least one match.
+
+Usage:
+    python benchmarks/bench_sparse_engines.py --project-id 1
+    python benchmarks/bench_sparse_engines.py --project-id 1 --queries 200 --limit 20
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+from pathlib import Path
+from typing import List
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import select
+
+from core.database import AsyncSessionLocal
+from models.chunk import Chunk
+from services.bm25_service import bm25_service
+from services.search_service import SearchService
+
+
+async def sample_queries(project_id: int, count: int) -> List[str]:
+    """Short word sequences taken from random chunks of the project"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Chunk.text)
+            .where(Chunk.project_id == project_id, Chunk.has_embedding == 1)
+            .limit(5000)
+        )
+        texts = [row[0] for row in result.fetchall() if row[0]]
+
+    rng = random.Random(0)
+    queries = []
+    while texts and len(queries) < count:
+        words = rng.choice(texts).split()
+        if len(words) < 4:
+            continue
+        length = rng.randint(2, 4)
+        start = rng.randrange(len(words) - length)
+        queries.append(" ".join(words[start:start + length]))
+    return queries
+
+
+async def run_engine(service: SearchService, engine: str, project_id: int, queries: List[str], limit: int):
+    latencies, hits = [], []
+    async with AsyncSessionLocal() as db:
+        for query in queries:
+            results, elapsed_ms = await service.search_sparse(
+                db=db, query=query, project_id=project_id, limit=limit, engine=engine
+            )
+            latencies.append(elapsed_ms)
+            hits.append([result["chunk_id"] for result in results])
+    return latencies, hits
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="In-memory BM25 vs PostgreSQL full-text vs BGE-M3 lexical search")
+    parser.add_argument("--project-id", type=int, required=True)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    queries = await sample_queries(args.project_id, args.queries)
+    if not queries:
+        print(f"❌ Project {args.project_id} has no embedded chunks")
+        return 1
+
+    async with AsyncSessionLocal() as db:
+        await bm25_service.initialize(db)
+        await bm25_service.prepare(db, args.project_id)  # shard load is not part of query latency
+
+    service = SearchService()
+    print(f"🔬 {len(queries)} queries, limit={args.limit}, project={args.project_id}")
+    print(f"\n{'engine':<10} {'p50 ms':>10} {'p95 ms':>10}")
+
+    hits = {}
+    for engine in ("bm25", "postgres", "lexical"):
+        await run_engine(service, engine, args.project_id, queries[:5], args.limit)  # warm up
+        latencies, hits[engine] = await run_engine(service, engine, args.project_id, queries, args.limit)
+        p95 = sorted(latencies)[int(len(latencies) * 0.95) - 1]
+        print(f"{engine:<10} {statistics.median(latencies):>10.2f} {p95:>10.2f}")
+
+    print()
+    for engine in ("postgres", "lexical"):
+        overlaps = [
+            len(set(a) & set(b)) / max(len(a), len(b), 1)
+            for a, b in zip(hits["bm25"], hits[engine])
+        ]
+        print(f"Top-{args.limit} overlap with bm25 ({engine}, mean): {statistics.mean(overlaps):.1%}")
+
+    stats = bm25_service.get_stats()
+    print(f"BM25 shard memory per replica: {stats['memory_bytes'] / 1024 / 1024:.1f} MB "
+          f"({stats['num_documents']} chunks); postgres / lexical engines: 0 MB per replica")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
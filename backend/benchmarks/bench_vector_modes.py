@@ -0,0 +1,143 @@
+"""
+KnowledgeTree - Vector Storage Mode Benchmark
+=============================================
+
+Purpose: Compare recall and latency of the dense search storage modes
+(see VECTOR_SEARCH_MODE in core/config.py):
+
+1. float32 - HNSW over chunks.embedding vector(1024)
+2. halfvec - HNSW over chunks.embedding halfvec(1024)
+3. binary  - Hamming HNSW over chunks.embedding_bin + halfvec rescoring
+
+Only one storage exists at a time, so each run measures the mode the
+database was built for (migration 0b6e2f9a1c57 / convert_vector_storage.py).
+Ground truth is an exact scan (index scans disabled) over the stored
+embeddings. Query texts are sampled from the project's own chunks, so every
+query has relevant neighbours. Convert the storage and re-run to compare
+modes.
+
+Usage:
+    python benchmarks/bench_vector_modes.py --project-id 1
+    python benchmarks/bench_vector_modes.py --project-id 1 --mode binary --queries 200 --limit 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from core.config import settings
+from core.database import AsyncSessionLocal
+from services.search_service import SearchService
+
+MODES = ["float32", "halfvec", "binary"]
+
+# Exact-scan mode over each storage: binary mode stores halfvec embeddings
+EXACT_MODES = {"float32": "float32", "halfvec": "halfvec", "binary": "halfvec"}
+
+
+async def sample_queries(project_id: int, count: int) -> List[str]:
+    """Use the first sentence of random chunks as query texts"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            text(
+                "SELECT left(text, 200) FROM chunks "
+                "WHERE project_id = :project_id AND has_embedding = 1 "
+                "ORDER BY random() LIMIT :count"
+            ),
+            {"project_id": project_id, "count": count}
+        )
+        return [row[0].split(". ")[0] for row in result.fetchall() if row[0]]
+
+
+async def exact_neighbours(
+    service: SearchService,
+    mode: str,
+    query: str,
+    project_id: int,
+    limit: int
+) -> List[int]:
+    """Exact top-k over the stored embeddings via sequential scan"""
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SET LOCAL enable_indexscan = off"))
+        results, _ = await service.search(
+            db=db, query=query, project_id=project_id, limit=limit,
+            min_similarity=0.0, vector_mode=EXACT_MODES[mode]
+        )
+        return [r["chunk_id"] for r in results]
+
+
+async def run_mode(
+    service: SearchService,
+    mode: str,
+    queries: List[str],
+    truth: Dict[str, List[int]],
+    project_id: int,
+    limit: int
+) -> Dict[str, float]:
+    latencies = []
+    recalls = []
+
+    for query in queries:
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            results, _ = await service.search(
+                db=db, query=query, project_id=project_id, limit=limit,
+                min_similarity=0.0, vector_mode=mode
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        expected = set(truth[query])
+        if expected:
+            found = {r["chunk_id"] for r in results}
+            recalls.append(len(found & expected) / len(expected))
+
+    latencies.sort()
+    return {
+        "recall": statistics.mean(recalls) if recalls else 0.0,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+    }
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Dense search storage mode benchmark")
+    parser.add_argument("--project-id", type=int, required=True)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument(
+        "--mode", choices=MODES, default=settings.VECTOR_SEARCH_MODE,
+        help="Storage mode the database was built for (default: VECTOR_SEARCH_MODE)"
+    )
+    args = parser.parse_args()
+
+    service = SearchService()
+    queries = await sample_queries(args.project_id, args.queries)
+    if not queries:
+        print("⚠️  No embedded chunks found for this project")
+        return 1
+
+    print(f"🔬 {len(queries)} queries, k={args.limit}, project={args.project_id}, mode={args.mode}")
+
+    # Warm up the embedding model and query cache so timings measure the database
+    truth = {}
+    for query in queries:
+        truth[query] = await exact_neighbours(service, args.mode, query, args.project_id, args.limit)
+
+    stats = await run_mode(service, args.mode, queries, truth, args.project_id, args.limit)
+    print(f"\n{'mode':<10} {'recall@k':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    print(f"{args.mode:<10} {stats['recall']:>10.3f} {stats['p50_ms']:>10.1f} {stats['p95_ms']:>10.1f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,126 @@
+"""
+KnowledgeTree - Celery Worker Memory Benchmark
+===============================================
+
+Purpose: Measure per-worker memory for the embedding model with and without
+preloading it in the parent process before forking (see core/celery_app.py).
+
+Modes:
+1. lazy    - every forked child loads its own BGE-M3 copy (previous behaviour)
+2. preload - parent loads the model, children inherit it copy-on-write
+
+For each child the script reports RSS (includes shared pages), PSS (shared
+pages split between sharers) and USS (pages private to the child). USS is
+what each extra worker really costs; with preloading it should drop from
+the full model size to a few hundred MB of per-process state.
+
+Usage:
+    python benchmarks/bench_worker_memory.py --workers 4
+    python benchmarks/bench_worker_memory.py --workers 4 --mode lazy
+
+Linux only (reads /proc/<pid>/smaps_rollup).
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+
+def read_memory_mb(pid: int) -> Dict[str, float]:
+    """Read RSS/PSS/USS for a process from /proc/<pid>/smaps_rollup"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":"):
+                values[parts[0][:-1]] = int(parts[1]) / 1024  # kB -> MB
+
+    uss = values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)
+    return {
+        "rss_mb": values.get("Rss", 0.0),
+        "pss_mb": values.get("Pss", 0.0),
+        "uss_mb": uss,
+    }
+
+
+def run_child(load_in_child: bool, ready_fd: int, release_fd: int) -> None:
+    """Body of a forked worker: optionally load, encode once, report ready, wait"""
+    from services.embedding_generator import embedding_generator
+
+    if load_in_child:
+        embedding_generator.load_model()
+
+    # One small encode so the child's working set matches a real worker
+    embedding_generator.generate_embedding("warm-up query", use_cache=False)
+
+    os.write(ready_fd, b"1")
+    os.read(release_fd, 1)
+    os._exit(0)
+
+
+def measure(mode: str, workers: int) -> List[Dict[str, float]]:
+    """Fork workers in the given mode and return per-child memory readings"""
+    from services.embedding_generator import embedding_generator
+
+    if mode == "preload":
+        embedding_generator.load_model()
+        gc.freeze()
+
+    ready_r, ready_w = os.pipe()
+    release_r, release_w = os.pipe()
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            run_child(load_in_child=(mode == "lazy"), ready_fd=ready_w, release_fd=release_r)
+        children.append(pid)
+
+    for _ in children:
+        os.read(ready_r, 1)
+    time.sleep(1)  # Let allocators settle
+
+    readings = [read_memory_mb(pid) for pid in children]
+
+    os.write(release_w, b"1" * len(children))
+    for pid in children:
+        os.waitpid(pid, 0)
+
+    return readings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Celery worker embedding-model memory benchmark")
+    parser.add_argument("--workers", type=int, default=4, help="Number of forked workers")
+    parser.add_argument("--mode", choices=["lazy", "preload"], default="preload")
+    args = parser.parse_args()
+
+    if not Path("/proc/self/smaps_rollup").exists():
+        print("⚠️  /proc/<pid>/smaps_rollup not available - Linux only")
+        return 1
+
+    print(f"🔬 Mode: {args.mode}, workers: {args.workers}")
+    readings = measure(args.mode, args.workers)
+
+    print(f"{'worker':>6} {'RSS MB':>10} {'PSS MB':>10} {'USS MB':>10}")
+    for i, r in enumerate(readings):
+        print(f"{i:>6} {r['rss_mb']:>10.1f} {r['pss_mb']:>10.1f} {r['uss_mb']:>10.1f}")
+
+    total_pss = sum(r["pss_mb"] for r in readings)
+    parent = read_memory_mb(os.getpid())
+    print(f"\nParent PSS: {parent['pss_mb']:.1f} MB")
+    print(f"Total PSS (parent + workers): {total_pss + parent['pss_mb']:.1f} MB")
+    print(f"Avg USS per worker: {sum(r['uss_mb'] for r in readings) / len(readings):.1f} MB")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
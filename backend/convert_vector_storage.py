@@ -0,0 +1,121 @@
+"""
+Convert chunk embedding storage between vector search modes
+
+Migration 0b6e2f9a1c57 builds the storage of VECTOR_SEARCH_MODE at upgrade
+time. This script switches an existing database to another mode:
+
+- float32: chunks.embedding vector(1024) + vector_cosine_ops HNSW
+- halfvec: chunks.embedding halfvec(1024) + halfvec_cosine_ops HNSW
+- binary:  chunks.embedding halfvec(1024) (rescoring only, not indexed)
+           + generated chunks.embedding_bin bit(1024) + bit_hamming_ops HNSW
+
+The conversion runs in one transaction and rewrites the chunks table, so it
+holds an exclusive lock for its duration; run it in a maintenance window,
+then set VECTOR_SEARCH_MODE and restart the API. Converting to float32 does
+not restore precision lost by an earlier halfvec conversion.
+
+Usage:
+    python convert_vector_storage.py --mode halfvec
+    python convert_vector_storage.py --mode binary --dry-run   # Show current storage only
+"""
+
+import sys
+import os
+import asyncio
+import argparse
+import time
+from sqlalchemy import text
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.database import AsyncSessionLocal
+
+
+MODES = ("float32", "halfvec", "binary")
+
+HNSW_WITH = "WITH (m = 16, ef_construction = 64)"
+
+TO_FLOAT32 = [
+    "DROP INDEX IF EXISTS ix_chunks_embedding_bin_hnsw",
+    "ALTER TABLE chunks DROP COLUMN IF EXISTS embedding_bin",
+    "DROP INDEX IF EXISTS ix_chunks_embedding_hnsw",
+    "ALTER TABLE chunks ALTER COLUMN embedding TYPE vector(1024) USING embedding::vector(1024)",
+]
+
+FROM_FLOAT32 = {
+    "float32": [
+        f"CREATE INDEX ix_chunks_embedding_hnsw ON chunks USING hnsw (embedding vector_cosine_ops) {HNSW_WITH}",
+    ],
+    "halfvec": [
+        "ALTER TABLE chunks ALTER COLUMN embedding TYPE halfvec(1024) USING embedding::halfvec(1024)",
+        f"CREATE INDEX ix_chunks_embedding_hnsw ON chunks USING hnsw (embedding halfvec_cosine_ops) {HNSW_WITH}",
+    ],
+    "binary": [
+        "ALTER TABLE chunks ALTER COLUMN embedding TYPE halfvec(1024) USING embedding::halfvec(1024)",
+        "ALTER TABLE chunks ADD COLUMN embedding_bin bit(1024) "
+        "GENERATED ALWAYS AS (binary_quantize(embedding)::bit(1024)) STORED",
+        f"CREATE INDEX ix_chunks_embedding_bin_hnsw ON chunks USING hnsw (embedding_bin bit_hamming_ops) {HNSW_WITH}",
+    ],
+}
+
+
+async def current_mode() -> str:
+    """Detect the storage mode from the chunks.embedding type and embedding_bin column"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            text(
+                """
+                SELECT a.attname, format_type(a.atttypid, a.atttypmod)
+                FROM pg_attribute a
+                WHERE a.attrelid = 'chunks'::regclass
+                  AND a.attname IN ('embedding', 'embedding_bin')
+                  AND NOT a.attisdropped
+                """
+            )
+        )
+        columns = dict(result.fetchall())
+
+    if "embedding_bin" in columns:
+        return "binary"
+    if columns.get("embedding", "").startswith("halfvec"):
+        return "halfvec"
+    return "float32"
+
+
+async def convert(mode: str) -> None:
+    """Rebuild chunk embedding storage for mode in one transaction"""
+    start = time.time()
+    async with AsyncSessionLocal() as db:
+        for statement in TO_FLOAT32 + FROM_FLOAT32[mode]:
+            print(f"   → {statement}")
+            await db.execute(text(statement))
+        await db.commit()
+    print(f"   ✓ Converted in {time.time() - start:.1f}s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Convert chunk embedding storage between vector search modes")
+    parser.add_argument("--mode", choices=MODES, required=True, help="Target VECTOR_SEARCH_MODE")
+    parser.add_argument("--dry-run", action="store_true", help="Only show the current storage mode")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("🔢 Vector storage conversion")
+    print("=" * 80)
+
+    mode = await current_mode()
+    print(f"   Current storage: {mode}")
+
+    if args.dry_run or mode == args.mode:
+        return
+
+    await convert(args.mode)
+
+    print(f"\n✅ Storage converted to {args.mode}")
+    print(f"   Run VACUUM ANALYZE chunks and set VECTOR_SEARCH_MODE={args.mode}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
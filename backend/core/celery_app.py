@@ -3,8 +3,15 @@ KnowledgeTree - Celery Configuration
 Background task processing for agent workflows
 """
 
+import gc
+import logging
 import os
 from celery import Celery
+from celery.signals import worker_init, worker_process_init
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
 
 # Get Redis URL from environment
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -57,7 +64,7 @@ celery_app.conf.update(
 
     # Worker settings
     worker_prefetch_multiplier=4,
-    worker_concurrency=4,
+    worker_concurrency=settings.CELERY_WORKER_CONCURRENCY,
 
     # Retry settings
     task_acks_late=True,
@@ -69,6 +76,50 @@ celery_app.conf.update(
 )
 
 
+@worker_init.connect
+def preload_embedding_model(**kwargs):
+    """
+    Load BGE-M3 in the parent worker process before the prefork pool forks
+
+    Children inherit the model's weights copy-on-write, so N pool processes
+    share one multi-GB copy instead of each loading their own. gc.freeze()
+    moves everything allocated so far into a permanent generation so the
+    cyclic GC never writes to (and thereby un-shares) those pages.
+
+    Only the weights are loaded here - no inference runs in the parent, so
+    no OpenMP/intra-op thread pools exist at fork time.
+    """
+    if not settings.CELERY_PRELOAD_EMBEDDING_MODEL:
+        return
+
+    from services.embedding_generator import embedding_generator
+
+    try:
+        embedding_generator.load_model()
+        gc.freeze()
+        logger.info("Preloaded embedding model in Celery parent process (shared copy-on-write)")
+    except Exception as e:
+        logger.error(f"Failed to preload embedding model, children will load lazily: {e}")
+
+
+@worker_process_init.connect
+def configure_worker_process(**kwargs):
+    """
+    Limit PyTorch intra-op threads per pool process
+
+    Without a limit every forked child starts one thread per core and the
+    pool oversubscribes the CPU as soon as several documents embed at once.
+    """
+    threads = settings.CELERY_TORCH_THREADS_PER_WORKER or max(
+        1, (os.cpu_count() or 1) // max(1, settings.CELERY_WORKER_CONCURRENCY)
+    )
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
 # Periodic tasks (if needed later)
 # from celery.schedules import crontab
 #
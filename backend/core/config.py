@@ -86,6 +86,49 @@ class Settings(BaseSettings):
     EMBEDDING_DIMENSIONS: int = 1024
     EMBEDDING_DEVICE: str = "cpu"  # or "cuda" for GPU
     HF_HOME: str = "./models"  # HuggingFace cache directory
+    EMBEDDING_MAX_LENGTH: int = 8192  # BGE-M3 maximum sequence length (tokens)
+    EMBEDDING_BATCH_SIZE: int = 16  # Max texts per length bucket during ingestion
+    EMBEDDING_MAX_TOKENS_PER_BATCH: int = 32768  # Padded token budget per bucket
+    EMBEDDING_CACHE_ENABLED: bool = True  # Content-addressed cache shared by all ingestion paths
+    EMBEDDING_CACHE_PATH: str = "./cache/embeddings.sqlite3"
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 500000  # ~2 GB of float32 1024-dim vectors
+    EMBEDDING_CACHE_TOUCH_INTERVAL_SECONDS: int = 3600  # Min age of last_used before a hit refreshes it (LRU granularity)
+    QUERY_EMBEDDING_CACHE_SIZE: int = 10000  # In-process query embeddings (~40 MB)
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: int = 3600
+    QUERY_EMBEDDING_CACHE_USE_REDIS: bool = False  # Share query embeddings across API replicas
+    INFERENCE_EXECUTOR_WORKERS: int = 2  # Threads for model calls made from async handlers
+    MICROBATCH_ENABLED: bool = True  # Coalesce concurrent query encodes / rerank pairs
+    MICROBATCH_MAX_WAIT_MS: float = 5.0  # Max time the first request waits for company
+    MICROBATCH_MAX_BATCH_SIZE: int = 32  # Query embeddings per batched encode() call
+    CROSS_ENCODER_MICROBATCH_MAX_PAIRS: int = 128  # Query/chunk pairs per predict() call
+    RERANK_SCORE_CACHE_ENABLED: bool = True  # Reuse cross-encoder scores of repeated (query, chunk) pairs
+    RERANK_SCORE_CACHE_SIZE: int = 200000  # In-process (query, chunk) scores
+    RERANK_SCORE_CACHE_TTL_SECONDS: int = 3600
+    RERANK_CASCADE_STAGES: List[int] = []  # Candidates kept per cheap rerank stage, e.g. [12, 6] ([] = single full pass)
+    RERANK_CASCADE_FIRST_STAGE_MAX_CHARS: int = 400  # Chunk chars scored by the first cheap stage (doubles per stage)
+    SEARCH_RESULT_CACHE_ENABLED: bool = True  # Cache final /search/reranked results per project index version
+    SEARCH_RESULT_CACHE_SIZE: int = 2000  # In-process cached result lists
+    SEARCH_RESULT_CACHE_TTL_SECONDS: int = 600
+    SEARCH_RESULT_CACHE_USE_REDIS: bool = False  # Share cached results across API replicas
+    HNSW_EF_SEARCH: int = 40  # HNSW candidate list size per dense query (higher = better recall, slower)
+    HNSW_ITERATIVE_SCAN: str = "relaxed_order"  # pgvector >= 0.8: keep scanning until filtered k found ("off" to disable)
+    VECTOR_SEARCH_MODE: str = "float32"  # float32 | halfvec | binary (Hamming candidates + halfvec rescoring); must match the storage built by convert_vector_storage.py
+    BINARY_RESCORE_FACTOR: int = 10  # Binary mode: candidates fetched per requested result
+    MULTI_QUERY_MAX_REFORMULATIONS: int = 3  # Query expansion reformulations searched by the dense leg with the original query
+    BATCH_SEARCH_GROUP_SIZE: int = 16  # /search/batch: queries embedded, searched (one SQL statement) and streamed per group
+    SPARSE_ENGINE: str = "bm25"  # bm25 (in-memory, per replica) | postgres (tsvector + GIN, shared) | lexical (BGE-M3 lexical weights)
+    BM25_SYNC_INTERVAL_SECONDS: float = 5.0  # Min time between BM25 delta syncs of new chunks
+    BM25_SYNC_GAP_TIMEOUT_SECONDS: float = 600.0  # Stop waiting for missing chunk ids (rollbacks) after this
+    BM25_MAX_LOADED_CHUNKS: int = 2_000_000  # Evict least recently queried project shards above this
+    BM25_SNAPSHOT_ENABLED: bool = True  # Persist shards as memory-mapped snapshots for fast startup
+    BM25_SNAPSHOT_DIR: str = "./cache/bm25"
+
+    # ========================================================================
+    # Celery Worker Settings
+    # ========================================================================
+    CELERY_WORKER_CONCURRENCY: int = 4
+    CELERY_PRELOAD_EMBEDDING_MODEL: bool = True  # Load BGE-M3 once in the parent, share via fork
+    CELERY_TORCH_THREADS_PER_WORKER: int = 0  # 0 = cpu_count // concurrency
 
     # ========================================================================
     # PDF Processing Settings
@@ -3,9 +3,10 @@ KnowledgeTree Backend - FastAPI Application
 Main entry point for the application
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from core.config import settings
 from core.database import AsyncSessionLocal
@@ -23,6 +24,7 @@ from api.routes.graph import router as graph_router
 # Import services for initialization
 from services.bm25_service import bm25_service
 from services.cross_encoder_service import cross_encoder_service
+from services.inference_executor import inference_executor
 
 
 @asynccontextmanager
@@ -58,6 +60,7 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     print("🛑 KnowledgeTree backend shutting down...")
+    inference_executor.shutdown(wait=False)
 
 
 # Create FastAPI application
@@ -93,6 +96,15 @@ async def health_check():
     }
 
 
+# Prometheus metrics endpoint
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+async def metrics():
+    """
+    Prometheus metrics (search pipeline stage latency histograms)
+    """
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 # Root endpoint
 @app.get("/", tags=["Root"])
 async def root():
@@ -3,18 +3,45 @@ KnowledgeTree Backend - Search Schemas
 Pydantic models for semantic search requests and responses
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, field_validator
+from typing import Annotated, Dict, Optional, List
 from datetime import datetime
 
 
-class SearchRequest(BaseModel):
+def validate_result_fields(fields: Optional[List[str]]) -> Optional[List[str]]:
+    """Reject unknown SearchResult field names in a `fields` projection"""
+    if fields is None:
+        return None
+    unknown = sorted(set(fields) - set(SearchResult.model_fields))
+    if unknown:
+        raise ValueError(f"Unknown result fields: {', '.join(unknown)}")
+    return fields
+
+
+class ResultProjection(BaseModel):
+    """Optional projection of the returned result fields"""
+    fields: Optional[List[str]] = Field(
+        None,
+        description="Result fields to return, e.g. [\"chunk_id\", \"document_title\", \"cross_encoder_score\"] "
+                    "(chunk_id is always included; default: all fields)"
+    )
+
+    @field_validator('fields')
+    @classmethod
+    def validate_fields(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        """Validate projected field names against SearchResult"""
+        return validate_result_fields(v)
+
+
+class SearchRequest(ResultProjection):
     """Search request with query and filters"""
     query: str = Field(..., min_length=1, max_length=1000, description="Search query text")
     project_id: int = Field(..., description="Project to search within")
     category_id: Optional[int] = Field(None, description="Optional category filter")
     limit: int = Field(10, ge=1, le=100, description="Maximum number of results")
     min_similarity: float = Field(0.5, ge=0.0, le=1.0, description="Minimum similarity threshold")
+    ef_search: Optional[int] = Field(None, ge=1, le=1000, description="HNSW ef_search for dense retrieval (recall vs latency, default: 40)")
+    sparse_engine: Optional[str] = Field(None, pattern="^(bm25|postgres|lexical)$", description="Sparse engine: bm25 (in-memory), postgres (full-text search) or lexical (BGE-M3 lexical weights)")
 
 
 class SearchResult(BaseModel):
@@ -39,21 +66,10 @@ class SearchResult(BaseModel):
     cross_encoder_score: Optional[float] = Field(None, description="Cross-encoder relevance score (0-1)")
     original_rank: Optional[int] = Field(None, description="Original rank before reranking")
 
-    # TIER 2 Enhanced RAG - Conditional Reranking fields
-    confidence_level: Optional[str] = Field(None, description="Confidence level: high, medium, or low")
-    skip_metrics: Optional[dict] = Field(None, description="Conditional reranking skip metrics")
-
-    # TIER 2 Enhanced RAG - Explainability fields
+    # TIER 2 Enhanced RAG - Explainability fields (include_explanations=true)
     explanation: Optional[dict] = Field(None, description="Detailed explanation of retrieval and ranking")
     rank: Optional[int] = Field(None, description="Result rank in final list")
 
-    # TIER 2 Enhanced RAG - Query Expansion fields
-    query_expansion: Optional[dict] = Field(None, description="Query expansion metadata")
-
-    # TIER 2 Enhanced RAG - CRAG fields
-    crag_evaluation: Optional[dict] = Field(None, description="CRAG retrieval quality evaluation")
-    crag_improvement: Optional[dict] = Field(None, description="CRAG improvement metrics after correction")
-
     class Config:
         from_attributes = True
 
@@ -68,6 +84,15 @@ class SearchResponse(BaseModel):
 
     # TIER 2 Enhanced RAG - Pipeline summary
     pipeline_summary: Optional[dict] = Field(None, description="Summary of retrieval pipeline performance")
+    pipeline: Optional[dict] = Field(
+        None,
+        description="Pipeline-level metadata shared by all results (confidence level, reranking skip "
+                    "metrics, query expansion, CRAG evaluation/improvement)"
+    )
+    timings: Optional[Dict[str, float]] = Field(
+        None,
+        description="Per-stage wall times in ms (query embedding, SQL, BM25, RRF, CRAG, cross-encoder, explanations)"
+    )
 
 
 class SearchStatistics(BaseModel):
@@ -79,7 +104,7 @@ class SearchStatistics(BaseModel):
     total_storage_mb: float = Field(..., description="Total vector storage size in MB")
 
 
-class HybridSearchRequest(BaseModel):
+class HybridSearchRequest(ResultProjection):
     """
     Hybrid search request with dense + sparse retrieval (TIER 1 Advanced RAG)
 
@@ -94,9 +119,39 @@ class HybridSearchRequest(BaseModel):
     min_bm25_score: float = Field(0.0, ge=0.0, description="Minimum BM25 score for sparse search")
     dense_weight: Optional[float] = Field(None, ge=0.0, le=1.0, description="Dense retrieval weight (default: 0.6)")
     sparse_weight: Optional[float] = Field(None, ge=0.0, le=1.0, description="Sparse retrieval weight (default: 0.4)")
+    ef_search: Optional[int] = Field(None, ge=1, le=1000, description="HNSW ef_search for dense retrieval (recall vs latency, default: 40)")
+    sparse_engine: Optional[str] = Field(None, pattern="^(bm25|postgres|lexical)$", description="Sparse engine: bm25 (in-memory), postgres (full-text search) or lexical (BGE-M3 lexical weights)")
+
 
+class BatchSearchRequest(ResultProjection):
+    """
+    Hybrid search for many queries of one project in one request
 
-class RerankSearchRequest(BaseModel):
+    Every query is searched with the same parameters as /search/hybrid; results
+    are streamed as NDJSON, one BatchSearchItem line per query.
+    """
+    queries: List[Annotated[str, Field(min_length=1, max_length=1000)]] = Field(..., min_length=1, max_length=100, description="Search query texts (1-100)")
+    project_id: int = Field(..., description="Project to search within")
+    category_id: Optional[int] = Field(None, description="Optional category filter")
+    limit: int = Field(10, ge=1, le=100, description="Final number of results per query")
+    top_k_retrieve: int = Field(20, ge=1, le=100, description="Number of candidates from each method per query")
+    min_similarity: float = Field(0.5, ge=0.0, le=1.0, description="Minimum similarity for dense search")
+    min_bm25_score: float = Field(0.0, ge=0.0, description="Minimum BM25 score for sparse search")
+    dense_weight: Optional[float] = Field(None, ge=0.0, le=1.0, description="Dense retrieval weight (default: 0.6)")
+    sparse_weight: Optional[float] = Field(None, ge=0.0, le=1.0, description="Sparse retrieval weight (default: 0.4)")
+    ef_search: Optional[int] = Field(None, ge=1, le=1000, description="HNSW ef_search for dense retrieval (recall vs latency, default: 40)")
+    sparse_engine: Optional[str] = Field(None, pattern="^(bm25|postgres|lexical)$", description="Sparse engine: bm25 (in-memory), postgres (full-text search) or lexical (BGE-M3 lexical weights)")
+
+
+class BatchSearchItem(BaseModel):
+    """Results of one query of a batch search (one NDJSON line)"""
+    index: int = Field(..., description="Position of the query in the request")
+    query: str = Field(..., description="Search query text")
+    results: List[SearchResult] = Field(..., description="Search results")
+    total_results: int = Field(..., description="Number of results returned")
+
+
+class RerankSearchRequest(ResultProjection):
     """
     Complete TIER 1 Advanced RAG search with cross-encoder reranking
 
@@ -115,8 +170,11 @@ class RerankSearchRequest(BaseModel):
     min_similarity: float = Field(0.5, ge=0.0, le=1.0, description="Minimum similarity for dense search")
     min_bm25_score: float = Field(0.0, ge=0.0, description="Minimum BM25 score for sparse search")
     min_cross_encoder_score: float = Field(0.0, ge=-10.0, le=10.0, description="Minimum cross-encoder score")
+    rerank_stages: Optional[List[Annotated[int, Field(ge=1, le=100)]]] = Field(None, max_length=3, description="Cascade reranking: candidates kept by each cheap truncated-input stage before the full cross-encoder pass, e.g. [12, 6] ([] = single full pass, default from settings)")
     dense_weight: Optional[float] = Field(None, ge=0.0, le=1.0, description="Dense retrieval weight (default: 0.6)")
     sparse_weight: Optional[float] = Field(None, ge=0.0, le=1.0, description="Sparse retrieval weight (default: 0.4)")
+    ef_search: Optional[int] = Field(None, ge=1, le=1000, description="HNSW ef_search for dense retrieval (recall vs latency, default: 40)")
+    sparse_engine: Optional[str] = Field(None, pattern="^(bm25|postgres|lexical)$", description="Sparse engine: bm25 (in-memory), postgres (full-text search) or lexical (BGE-M3 lexical weights)")
 
     # TIER 2 Enhanced RAG - Query Expansion parameters
     use_query_expansion: bool = Field(True, description="Enable query expansion with synonyms")
@@ -124,3 +182,6 @@ class RerankSearchRequest(BaseModel):
 
     # TIER 2 Enhanced RAG - CRAG parameters
     use_crag: bool = Field(True, description="Enable CRAG (Corrective RAG) with self-reflection")
+
+    # TIER 2 Enhanced RAG - Explainability parameters
+    include_explanations: bool = Field(False, description="Generate a per-result explanation (score breakdown, matched keywords)")
@@ -14,12 +14,12 @@ import logging
 from models.crawl_job import CrawlJob, CrawlStatus
 from models.document import Document, DocumentType, ProcessingStatus
 from models.category import Category
-from models.chunk import Chunk
 from models.agent_workflow import AgentWorkflow, WorkflowStatus, WorkflowTemplate
 from services.agents import get_agent, ScraperAgent, AnalyzerAgent, OrganizerAgent
 from services.youtube_transcriber import YouTubeTranscriber
 from services.text_chunker import TextChunker
-from services.embedding_generator import EmbeddingGenerator
+from services.embedding_generator import embedding_generator
+from services.chunk_writer import chunk_writer
 from services.crawler_orchestrator import CrawlEngine
 from services.intelligent_crawler_selector import IntelligentCrawlerSelector
 from services.agentic_browser import AgenticBrowser
@@ -58,7 +58,7 @@ class AgenticCrawlWorkflow:
         self.organizer_agent: OrganizerAgent = get_agent("organizer")
         self.youtube_transcriber = YouTubeTranscriber(anthropic_api_key=settings.ANTHROPIC_API_KEY)
         self.text_chunker = TextChunker()
-        self.embedding_generator = EmbeddingGenerator()
+        self.embedding_generator = embedding_generator
 
         # Intelligent engine selector (auto-detect Firecrawl availability)
         firecrawl_available = bool(settings.FIRECRAWL_API_KEY)
@@ -867,6 +867,7 @@ Focus on insights that directly address the user's extraction goal.
 
         # Create chunks from actual article content (PRIMARY)
         chunks_created = 0
+        chunk_rows = []
 
         logger.info(f"📝 Creating chunks from {len(scraped_content)} scraped articles...")
 
@@ -887,34 +888,39 @@ Focus on insights that directly address the user's extraction goal.
 
             logger.info(f"📄 Artykuł '{article_title}': podzielony na {len(text_chunks)} fragmentów")
 
-            for chunk_idx, chunk_dict in enumerate(text_chunks):
-                # Extract text from chunk dictionary
-                chunk_text = chunk_dict["text"]
-                # Add title and URL context to each chunk for better searchability
-                full_chunk_text = f"# {article_title}\n\nŹródło: {article_url}\n\n{chunk_text}"
+            # Add title and URL context to each chunk for better searchability
+            full_chunk_texts = [
+                f"# {article_title}\n\nŹródło: {article_url}\n\n{chunk_dict['text']}"
+                for chunk_dict in text_chunks
+            ]
 
-                # Generate embedding for semantic search
-                embedding = self.embedding_generator.generate_embedding(full_chunk_text)
+            # Dense embeddings and lexical weights for the whole article in one pass
+            lexical_weights = []
+            embeddings = self.embedding_generator.generate_embeddings_batch(
+                full_chunk_texts, lexical_weights=lexical_weights
+            )
 
-                chunk = Chunk(
+            for chunk_idx, full_chunk_text in enumerate(full_chunk_texts):
+                chunk_rows.append(chunk_writer.make_row(
+                    document_id=document.id,
                     text=full_chunk_text,
-                    embedding=embedding,
+                    embedding=embeddings[chunk_idx],
                     chunk_index=chunks_created,
-                    chunk_metadata=json.dumps({
+                    chunk_metadata={
                         "source_url": article_url,
                         "article_title": article_title,
                         "chunk_in_article": chunk_idx,
                         "total_chunks_in_article": len(text_chunks),
                         "type": "article_content",
                         "language": "pl"
-                    }),
-                    document_id=document.id,
-                    has_embedding=1
-                )
-
-                db.add(chunk)
+                    },
+                    lexical_weights=lexical_weights[chunk_idx]
+                ))
                 chunks_created += 1
 
+        # Single bulk COPY for all article chunks
+        await chunk_writer.write(db, chunk_rows)
+
         logger.info(f"✅ Utworzono {chunks_created} fragmentów z treści artykułów")
 
         # Update document status
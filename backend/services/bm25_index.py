@@ -0,0 +1,569 @@
+"""
+KnowledgeTree Backend - Incremental BM25 Index
+Inverted index with add / remove / update deltas for sparse retrieval
+
+rank_bm25.BM25Okapi is immutable: making one new document searchable meant
+re-querying and re-tokenizing the whole corpus. BM25Index keeps postings,
+document lengths and collection statistics (N, document frequency, average
+length) up to date per delta, so an update costs O(tokens of the changed
+document) and scoring touches only the postings of the query terms.
+
+The index has two segments:
+- base: a CSR term-document matrix (numpy) with precomputed BM25 term
+  weights, built by compact(). A query adds idf * weight for the postings of
+  its terms into a score buffer and selects the top k with argpartition.
+- delta: dict postings for documents added since the last compaction.
+
+Removing a base document only tombstones it. As in Lucene segments, the
+base weights keep the average length and the document frequencies keep the
+tombstoned documents until the next compaction folds the delta in.
+
+A compacted base segment can be saved as .npy arrays plus a JSON term list
+and loaded memory-mapped (save() / load()).
+"""
+
+import json
+import math
+import sys
+from array import array
+from collections import Counter
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Base segment arrays written by save() (one .npy file each)
+SNAPSHOT_ARRAYS = ("indptr", "indices", "term_frequencies", "weights", "base_df", "base_ids", "base_lengths")
+
+
+class BM25Index:
+    """
+    Incremental Okapi BM25 inverted index
+
+    IDF uses the non-negative form log(1 + (N - df + 0.5) / (df + 0.5)), which
+    needs no corpus-wide average IDF and therefore stays exact under deltas.
+
+    Usage:
+        index = BM25Index()
+        index.add_document(42, ["jwt", "authentication"])
+        index.compact()
+        hits = index.top_k(["jwt"], k=10)   # [(42, 0.28)]
+        index.remove_document(42)
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.5,
+        b: float = 0.75,
+        compact_min_delta: int = 1000,
+        compact_ratio: float = 0.1
+    ):
+        self.k1 = k1
+        self.b = b
+        self.compact_min_delta = compact_min_delta
+        self.compact_ratio = compact_ratio
+
+        # Delta segment
+        self.postings: Dict[str, Dict[int, int]] = {}  # term -> {doc_id: term frequency}
+        self.doc_lengths: Dict[int, int] = {}
+        self.doc_terms: Dict[int, Tuple[str, ...]] = {}  # unique terms per doc, for O(doc) removal
+
+        # Base segment (CSR, rows = terms, columns = document slots)
+        self.vocabulary: Dict[str, int] = {}
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.empty(0, dtype=np.int32)
+        self.term_frequencies = np.empty(0, dtype=np.int32)
+        self.weights = np.empty(0, dtype=np.float32)
+        self.base_df = np.empty(0, dtype=np.int32)
+        self.base_ids = np.empty(0, dtype=np.int64)  # sorted, slot -> doc id
+        self.base_lengths = np.empty(0, dtype=np.int32)
+        self.alive = np.empty(0, dtype=bool)
+        self.base_alive = 0
+
+        self.total_length = 0  # live documents of both segments
+
+    @property
+    def num_documents(self) -> int:
+        return self.base_alive + len(self.doc_lengths)
+
+    @property
+    def avgdl(self) -> float:
+        return self.total_length / self.num_documents if self.num_documents else 0.0
+
+    @property
+    def num_terms(self) -> int:
+        return len(self.vocabulary) + sum(1 for term in self.postings if term not in self.vocabulary)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory held by the index: numpy arrays (memory-mapped ones count as
+        page cache) plus the Python containers of the vocabulary and delta
+        """
+        arrays = sum(getattr(self, name).nbytes for name in SNAPSHOT_ARRAYS) + self.alive.nbytes
+        vocabulary = sys.getsizeof(self.vocabulary) + sum(sys.getsizeof(term) for term in self.vocabulary)
+        delta = (
+            sys.getsizeof(self.postings)
+            + sum(sys.getsizeof(term_postings) for term_postings in self.postings.values())
+            + sys.getsizeof(self.doc_lengths)
+            + sys.getsizeof(self.doc_terms)
+            + sum(sys.getsizeof(terms) for terms in self.doc_terms.values())
+        )
+        return arrays + vocabulary + delta
+
+    @property
+    def needs_compaction(self) -> bool:
+        """Delta or tombstones have grown large relative to the base segment"""
+        threshold = max(self.compact_min_delta, self.compact_ratio * len(self.base_ids))
+        dead = len(self.base_ids) - self.base_alive
+        return len(self.doc_lengths) + dead >= threshold
+
+    def _base_slot(self, doc_id: int) -> Optional[int]:
+        slot = int(np.searchsorted(self.base_ids, doc_id))
+        if slot < len(self.base_ids) and self.base_ids[slot] == doc_id and self.alive[slot]:
+            return slot
+        return None
+
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self.doc_lengths or self._base_slot(doc_id) is not None
+
+    def document_frequency(self, term: str) -> int:
+        row = self.vocabulary.get(term)
+        base = int(self.base_df[row]) if row is not None else 0
+        return base + len(self.postings.get(term, ()))
+
+    def idf(self, term: str) -> float:
+        df = self.document_frequency(term)
+        n = len(self.base_ids) + len(self.doc_lengths)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def add_document(self, doc_id: int, tokens: List[str]) -> None:
+        """
+        Index a document (replaces it if already present)
+
+        Args:
+            doc_id: Document identifier (chunk id)
+            tokens: Tokenized document text
+        """
+        self.remove_document(doc_id)
+
+        counts = Counter(tokens)
+        for term, tf in counts.items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+
+        self.doc_terms[doc_id] = tuple(counts)
+        self.doc_lengths[doc_id] = len(tokens)
+        self.total_length += len(tokens)
+
+    def remove_document(self, doc_id: int) -> bool:
+        """
+        Remove a document from the index
+
+        Args:
+            doc_id: Document identifier
+
+        Returns:
+            True if the document was indexed
+        """
+        length = self.doc_lengths.pop(doc_id, None)
+        if length is None:
+            slot = self._base_slot(doc_id)
+            if slot is None:
+                return False
+            self.alive[slot] = False
+            self.base_alive -= 1
+            self.total_length -= int(self.base_lengths[slot])
+            return True
+
+        for term in self.doc_terms.pop(doc_id, ()):
+            term_postings = self.postings.get(term)
+            if term_postings is None:
+                continue
+            term_postings.pop(doc_id, None)
+            if not term_postings:
+                del self.postings[term]
+
+        self.total_length -= length
+        return True
+
+    def update_document(self, doc_id: int, tokens: List[str]) -> None:
+        """Replace a document's tokens (same as add_document on an existing id)"""
+        self.add_document(doc_id, tokens)
+
+    def load_documents(self, documents: Iterable[Tuple[int, List[str]]]) -> int:
+        """
+        Bulk-index documents straight into the base segment (and compact)
+
+        Used to build a shard: postings are collected as flat arrays instead of
+        per-term dicts, which keeps peak memory close to the final CSR size.
+
+        Args:
+            documents: (doc_id, tokens) pairs; existing ids are replaced
+
+        Returns:
+            Number of documents loaded
+        """
+        term_rows = dict(self.vocabulary)
+        terms = list(self.vocabulary)
+        rows = array("q")
+        ids = array("q")
+        tfs = array("i")
+        doc_ids = array("q")
+        lengths = array("i")
+
+        for doc_id, tokens in documents:
+            self.remove_document(doc_id)
+            counts = Counter(tokens)
+            for term, tf in counts.items():
+                row = term_rows.get(term)
+                if row is None:
+                    row = term_rows[term] = len(terms)
+                    terms.append(term)
+                rows.append(row)
+                tfs.append(tf)
+            ids.extend(repeat(doc_id, len(counts)))
+            doc_ids.append(doc_id)
+            lengths.append(len(tokens))
+
+        self._merge(
+            terms,
+            np.asarray(rows, dtype=np.int64),
+            np.asarray(ids, dtype=np.int64),
+            np.asarray(tfs, dtype=np.int32),
+            np.asarray(doc_ids, dtype=np.int64),
+            np.asarray(lengths, dtype=np.int32),
+        )
+        return len(doc_ids)
+
+    def compact(self) -> None:
+        """
+        Merge the delta segment and drop tombstones into a new CSR base segment
+
+        BM25 weights are precomputed with the average length of the merged
+        collection.
+        """
+        empty_int = np.empty(0, dtype=np.int64)
+        self._merge(
+            list(self.vocabulary), empty_int, empty_int,
+            np.empty(0, dtype=np.int32), empty_int, np.empty(0, dtype=np.int32)
+        )
+
+    def _merge(
+        self,
+        terms: List[str],
+        rows: np.ndarray,
+        ids: np.ndarray,
+        tfs: np.ndarray,
+        doc_ids: np.ndarray,
+        lengths: np.ndarray
+    ) -> None:
+        """
+        Rebuild the base segment from live base postings, the delta segment and
+        extra postings in COO form
+
+        Args:
+            terms: Row -> term; starts with the current vocabulary (extra rows appended)
+            rows, ids, tfs: Extra postings (term row, doc id, term frequency)
+            doc_ids, lengths: Extra documents
+        """
+        terms = list(terms)
+
+        # Live base postings in COO form
+        base_rows = np.repeat(np.arange(len(self.vocabulary), dtype=np.int64), np.diff(self.indptr))
+        live = self.alive[self.indices]
+        row_parts = [base_rows[live], rows]
+        id_parts = [self.base_ids[self.indices[live]], ids]
+        tf_parts = [self.term_frequencies[live], tfs]
+
+        # Delta postings
+        term_rows = {term: row for row, term in enumerate(terms)}
+        delta_rows: List[int] = []
+        delta_ids: List[int] = []
+        delta_tfs: List[int] = []
+        for term, term_postings in self.postings.items():
+            row = term_rows.get(term)
+            if row is None:
+                row = term_rows[term] = len(terms)
+                terms.append(term)
+            delta_rows.extend([row] * len(term_postings))
+            delta_ids.extend(term_postings)
+            delta_tfs.extend(term_postings.values())
+        row_parts.append(np.asarray(delta_rows, dtype=np.int64))
+        id_parts.append(np.asarray(delta_ids, dtype=np.int64))
+        tf_parts.append(np.asarray(delta_tfs, dtype=np.int32))
+
+        rows = np.concatenate(row_parts)
+        ids = np.concatenate(id_parts)
+        tfs = np.concatenate(tf_parts)
+
+        # Documents, sorted by id so that slots can be found with searchsorted
+        doc_ids = np.concatenate([
+            self.base_ids[self.alive],
+            doc_ids,
+            np.fromiter(self.doc_lengths, dtype=np.int64, count=len(self.doc_lengths)),
+        ])
+        lengths = np.concatenate([
+            self.base_lengths[self.alive],
+            lengths,
+            np.fromiter(self.doc_lengths.values(), dtype=np.int32, count=len(self.doc_lengths)),
+        ])
+        order = np.argsort(doc_ids, kind="stable")
+        doc_ids, lengths = doc_ids[order], lengths[order].astype(np.int32)
+        slots = np.searchsorted(doc_ids, ids)
+
+        # Drop terms without live postings and renumber rows
+        df = np.bincount(rows, minlength=len(terms))
+        used = np.flatnonzero(df)
+        new_rows = np.full(len(terms), -1, dtype=np.int64)
+        new_rows[used] = np.arange(len(used))
+        rows = new_rows[rows]
+
+        order = np.lexsort((slots, rows))
+        slots, tfs = slots[order], tfs[order]
+
+        avgdl = float(lengths.mean()) if len(lengths) else 1.0
+        norms = self.k1 * (1 - self.b + self.b * lengths / (avgdl or 1.0))
+        weights = tfs * (self.k1 + 1) / (tfs + norms[slots])
+
+        self.vocabulary = {terms[row]: new_row for new_row, row in enumerate(used.tolist())}
+        self.indptr = np.zeros(len(used) + 1, dtype=np.int64)
+        np.cumsum(df[used], out=self.indptr[1:])
+        self.indices = slots.astype(np.int32)
+        self.term_frequencies = tfs.astype(np.int32)
+        self.weights = weights.astype(np.float32)
+        self.base_df = df[used].astype(np.int32)
+        self.base_ids = doc_ids
+        self.base_lengths = lengths
+        self.alive = np.ones(len(doc_ids), dtype=bool)
+        self.base_alive = len(doc_ids)
+        self.total_length = int(lengths.sum())
+
+        self.postings = {}
+        self.doc_lengths = {}
+        self.doc_terms = {}
+
+    def _score(
+        self,
+        query_tokens: Iterable[str],
+        doc_filter: Optional[Iterable[int]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Doc ids and scores of live documents containing at least one query term"""
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+        if not self.num_documents:
+            return empty
+
+        query_tokens = list(query_tokens)  # walked once per segment
+        buffer: Optional[np.ndarray] = None
+        touched: List[np.ndarray] = []
+        for term in query_tokens:
+            row = self.vocabulary.get(term)
+            if row is None:
+                continue
+            start, end = self.indptr[row], self.indptr[row + 1]
+            slots = self.indices[start:end]
+            if buffer is None:
+                buffer = np.zeros(len(self.base_ids), dtype=np.float64)
+            # Slots are unique within a row, so fancy-index accumulation is exact
+            buffer[slots] += self.idf(term) * self.weights[start:end]
+            touched.append(slots)
+
+        if touched:
+            candidates = np.unique(np.concatenate(touched))
+            candidates = candidates[self.alive[candidates]]
+            ids = self.base_ids[candidates]
+            scores = buffer[candidates]
+        else:
+            ids, scores = empty
+
+        ids, scores = self._add_delta_scores(query_tokens, ids, scores)
+
+        if doc_filter is not None:
+            allowed = np.fromiter(doc_filter, dtype=np.int64)
+            mask = np.isin(ids, allowed)
+            ids, scores = ids[mask], scores[mask]
+
+        return ids, scores
+
+    def _add_delta_scores(
+        self,
+        query_tokens: Iterable[str],
+        ids: np.ndarray,
+        scores: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Append the delta segment documents containing at least one query term"""
+        if not self.postings:
+            return ids, scores
+
+        k1 = self.k1
+        avgdl = self.avgdl or 1.0
+        norm_a = k1 * (1 - self.b)
+        norm_b = k1 * self.b / avgdl
+
+        delta_scores: Dict[int, float] = {}
+        for term in query_tokens:
+            term_postings = self.postings.get(term)
+            if not term_postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, tf in term_postings.items():
+                denominator = tf + norm_a + norm_b * self.doc_lengths[doc_id]
+                delta_scores[doc_id] = delta_scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / denominator
+
+        if not delta_scores:
+            return ids, scores
+        return (
+            np.concatenate([ids, np.fromiter(delta_scores, dtype=np.int64, count=len(delta_scores))]),
+            np.concatenate([scores, np.fromiter(delta_scores.values(), dtype=np.float64, count=len(delta_scores))])
+        )
+
+    def get_scores(
+        self,
+        query_tokens: Iterable[str],
+        doc_filter: Optional[Iterable[int]] = None
+    ) -> Dict[int, float]:
+        """
+        BM25 scores for documents containing at least one query term
+
+        Args:
+            query_tokens: Tokenized query (duplicates count once per occurrence)
+            doc_filter: Optional set of doc ids to restrict scoring to
+
+        Returns:
+            Mapping doc_id -> score (documents with no matching term are absent)
+        """
+        ids, scores = self._score(query_tokens, doc_filter)
+        return dict(zip(ids.tolist(), scores.tolist()))
+
+    def top_k(
+        self,
+        query_tokens: Iterable[str],
+        k: int,
+        doc_filter: Optional[Iterable[int]] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Best k documents by BM25 score
+
+        Selection is argpartition over the matching documents only (O(matches)),
+        followed by sorting the k winners.
+
+        Returns:
+            (doc_id, score) pairs, best first
+        """
+        ids, scores = self._score(query_tokens, doc_filter)
+        return self._select(ids, scores, k)
+
+    def top_k_many(self, queries: List[List[str]], k: int) -> List[List[Tuple[int, float]]]:
+        """
+        Best k documents for each of several queries in one vectorized pass
+
+        The base segment postings of all query terms are gathered into flat
+        (query, slot, weight) arrays and summed per (query, slot) with a single
+        bincount, instead of filling and scanning a corpus-sized score buffer
+        per query. Each distinct term's IDF is computed once for the batch.
+        Delta postings are scored per query, as in top_k().
+
+        Returns:
+            (doc_id, score) pairs per query, best first (same scores as top_k())
+        """
+        results: List[List[Tuple[int, float]]] = [[] for _ in queries]
+        if k <= 0 or not self.num_documents:
+            return results
+
+        idfs: Dict[str, float] = {}
+        query_parts: List[np.ndarray] = []
+        slot_parts: List[np.ndarray] = []
+        weight_parts: List[np.ndarray] = []
+        for position, query_tokens in enumerate(queries):
+            for term in query_tokens:
+                row = self.vocabulary.get(term)
+                if row is None:
+                    continue
+                idf = idfs.get(term)
+                if idf is None:
+                    idf = idfs[term] = self.idf(term)
+                start, end = self.indptr[row], self.indptr[row + 1]
+                query_parts.append(np.full(end - start, position, dtype=np.int64))
+                slot_parts.append(self.indices[start:end])
+                weight_parts.append(idf * self.weights[start:end])
+
+        # (query, slot) keys are sorted by np.unique, so each query is one contiguous run
+        bounds = np.zeros(len(queries) + 1, dtype=np.int64)
+        if slot_parts:
+            num_slots = len(self.base_ids)
+            keys = np.concatenate(query_parts) * num_slots + np.concatenate(slot_parts)
+            keys, inverse = np.unique(keys, return_inverse=True)
+            totals = np.bincount(inverse, weights=np.concatenate(weight_parts))
+            positions, slots = np.divmod(keys, num_slots)
+            live = self.alive[slots]
+            positions, base_ids, totals = positions[live], self.base_ids[slots[live]], totals[live]
+            bounds = np.searchsorted(positions, np.arange(len(queries) + 1))
+        else:
+            base_ids, totals = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        for position, query_tokens in enumerate(queries):
+            start, end = bounds[position], bounds[position + 1]
+            ids, scores = self._add_delta_scores(query_tokens, base_ids[start:end], totals[start:end])
+            results[position] = self._select(ids, scores, k)
+        return results
+
+    @staticmethod
+    def _select(ids: np.ndarray, scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """Top k (doc_id, score) pairs by argpartition over the candidates, best first"""
+        if k <= 0 or not len(ids):
+            return []
+        if len(ids) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+            ids, scores = ids[best], scores[best]
+        order = np.argsort(-scores, kind="stable")
+        return list(zip(ids[order].tolist(), scores[order].tolist()))
+
+    def state(self) -> Dict[str, Any]:
+        """
+        References to the base segment for save_state()
+
+        Taking the references is cheap, so it can happen on the event loop while
+        the file writes run in a thread; compaction replaces arrays, it never
+        mutates them.
+        """
+        if self.postings or self.base_alive != len(self.base_ids):
+            raise ValueError("compact() the index before saving it")
+
+        state: Dict[str, Any] = {name: getattr(self, name) for name in SNAPSHOT_ARRAYS}
+        state["params"] = {"k1": self.k1, "b": self.b, "terms": list(self.vocabulary)}
+        return state
+
+    @staticmethod
+    def save_state(state: Dict[str, Any], directory: Path) -> None:
+        """Write a state() to a directory"""
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in SNAPSHOT_ARRAYS:
+            np.save(directory / f"{name}.npy", state[name])
+        (directory / "index.json").write_text(json.dumps(state["params"]))
+
+    def save(self, directory: Path) -> None:
+        """Write the compacted base segment to a directory"""
+        self.save_state(self.state(), directory)
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "BM25Index":
+        """
+        Load a saved base segment
+
+        Args:
+            directory: Directory written by save()
+            mmap: Memory-map the arrays read-only instead of reading them
+
+        Returns:
+            Index with the snapshot as its base segment and an empty delta
+        """
+        params = json.loads((directory / "index.json").read_text())
+        index = cls(k1=params["k1"], b=params["b"])
+        for name in SNAPSHOT_ARRAYS:
+            setattr(index, name, np.load(directory / f"{name}.npy", mmap_mode="r" if mmap else None))
+
+        index.vocabulary = {term: row for row, term in enumerate(params["terms"])}
+        index.alive = np.ones(len(index.base_ids), dtype=bool)
+        index.base_alive = len(index.base_ids)
+        index.total_length = int(index.base_lengths.sum())
+        return index
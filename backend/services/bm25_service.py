@@ -1,90 +1,504 @@
 """
 BM25 Sparse Retrieval Service for KnowledgeTree
 
-Implements BM25Okapi keyword-based search to complement dense vector retrieval.
+Implements BM25 keyword-based search to complement dense vector retrieval.
 Part of TIER 1 Advanced RAG implementation.
 
 Key Features:
 - Polish-aware tokenization (simple word splitting for MVP)
-- In-memory BM25 index for fast keyword matching
+- Incremental in-memory inverted index with a CSR base segment (services/bm25_index.py)
+- One shard per project (per-project IDF), loaded lazily, LRU-evicted
+- Delta sync of newly ingested chunks (no full rebuilds)
+- Memory-mapped on-disk shard snapshots, replayed from their corpus version
 - Async interface compatible with FastAPI
 - Returns results with BM25 scores
 
 Reference: ALURON project hybrid RAG implementation
 """
 
-from typing import List, Dict, Any, Optional
-from rank_bm25 import BM25Okapi
-import numpy as np
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+import asyncio
+import heapq
+import json
 import logging
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
 
+from core.config import settings
 from models.chunk import Chunk
+from services.bm25_index import BM25Index
 
 logger = logging.getLogger(__name__)
 
 
+SNAPSHOT_FORMAT = 1
+SNAPSHOT_VERSIONS_DIR = "versions"
+
+
+class BM25Shard:
+    """
+    Sparse index of a single project
+
+    Chunk -> document ids are stored as an int64 array aligned with the
+    index's base segment (plus a small dict for the delta segment); chunk
+    text and metadata are read from the database for returned hits.
+
+    Queries score and sync compacts shards on worker threads while the event
+    loop may apply deltas, so every read and write goes through the shard's lock.
+    """
+
+    def __init__(
+        self,
+        project_id: int,
+        index: Optional[BM25Index] = None,
+        version: int = 0,
+        base_document_ids: Optional[np.ndarray] = None
+    ):
+        self.project_id = project_id
+        self.index = index or BM25Index()
+        self.version = version  # chunk id watermark the base segment is complete up to
+        self.base_document_ids = (
+            base_document_ids if base_document_ids is not None else np.empty(0, dtype=np.int64)
+        )
+        self.delta_documents: Dict[int, int] = {}
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return self.index.num_documents
+
+    def __contains__(self, chunk_id: int) -> bool:
+        return chunk_id in self.index
+
+    def add(self, chunk_id: int, document_id: int, tokens: List[str]) -> None:
+        with self.lock:
+            self.index.add_document(chunk_id, tokens)
+            self.delta_documents[chunk_id] = document_id
+
+    def load(self, rows: List[Tuple[int, int, List[str]]]) -> None:
+        """Bulk-load (chunk_id, document_id, tokens) rows into the base segment"""
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        document_ids = np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows))
+        self._rebuild(lambda: self.index.load_documents((row[0], row[2]) for row in rows), ids, document_ids)
+
+    def compact(self) -> None:
+        """Fold the delta segment into the base segment"""
+        empty = np.empty(0, dtype=np.int64)
+        self._rebuild(self.index.compact, empty, empty)
+
+    def _rebuild(self, merge, extra_ids: np.ndarray, extra_document_ids: np.ndarray) -> None:
+        # Compaction runs on a worker thread: hold the lock from reading the
+        # live documents to the merge, so a concurrent add / remove can
+        # neither be lost nor misalign base_document_ids
+        with self.lock:
+            # Live documents before the merge, re-sorted like the new base_ids
+            alive = self.index.alive
+            ids = np.concatenate([
+                self.index.base_ids[alive],
+                np.fromiter(self.delta_documents, dtype=np.int64, count=len(self.delta_documents)),
+                extra_ids,
+            ])
+            document_ids = np.concatenate([
+                self.base_document_ids[alive],
+                np.fromiter(self.delta_documents.values(), dtype=np.int64, count=len(self.delta_documents)),
+                extra_document_ids,
+            ])
+            # Later entries win for re-added ids, as they do in the index
+            ids, first = np.unique(ids[::-1], return_index=True)
+            document_ids = document_ids[::-1][first]
+
+            merge()
+            self.base_document_ids = document_ids
+            self.delta_documents = {}
+
+    def top_k(self, tokens: List[str], k: int) -> List[Tuple[int, int, float]]:
+        """Top-k (chunk_id, document_id, score) for query tokens (thread-safe)"""
+        with self.lock:
+            hits = self.index.top_k(tokens, k)
+            document_ids = self.document_ids([chunk_id for chunk_id, _ in hits])
+        return [(chunk_id, document_id, score) for (chunk_id, score), document_id in zip(hits, document_ids)]
+
+    def top_k_many(self, queries: List[List[str]], k: int) -> List[List[Tuple[int, int, float]]]:
+        """Top-k (chunk_id, document_id, score) for each tokenized query, one vectorized pass (thread-safe)"""
+        with self.lock:
+            hits_per_query = self.index.top_k_many(queries, k)
+            document_ids = [self.document_ids([chunk_id for chunk_id, _ in hits]) for hits in hits_per_query]
+        return [
+            [(chunk_id, document_id, score) for (chunk_id, score), document_id in zip(hits, ids)]
+            for hits, ids in zip(hits_per_query, document_ids)
+        ]
+
+    def document_ids(self, chunk_ids: List[int]) -> List[int]:
+        """Document id of each (indexed) chunk id (thread-safe)"""
+        with self.lock:
+            slots = np.searchsorted(self.index.base_ids, chunk_ids)
+            result = []
+            for chunk_id, slot in zip(chunk_ids, slots.tolist()):
+                document_id = self.delta_documents.get(chunk_id)
+                result.append(document_id if document_id is not None else int(self.base_document_ids[slot]))
+            return result
+
+    def remove(self, chunk_id: int) -> bool:
+        with self.lock:
+            self.delta_documents.pop(chunk_id, None)
+            return self.index.remove_document(chunk_id)
+
+    def remove_document(self, document_id: int) -> int:
+        """Remove all chunks of a document (vectorized scan of the base segment, thread-safe)"""
+        # One critical section, so a compaction can't swap the base segment
+        # between the scan and the removals
+        with self.lock:
+            chunk_ids = [chunk_id for chunk_id, doc_id in self.delta_documents.items() if doc_id == document_id]
+            slots = np.flatnonzero((self.base_document_ids == document_id) & self.index.alive)
+            chunk_ids.extend(self.index.base_ids[slots].tolist())
+            return sum(self.remove(chunk_id) for chunk_id in chunk_ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.index.nbytes + self.base_document_ids.nbytes + sys.getsizeof(self.delta_documents)
+
+
 class BM25Service:
     """
-    BM25Okapi sparse retrieval service.
+    BM25 sparse retrieval service.
 
     Provides keyword-based search using BM25 algorithm to capture exact term matches
     that semantic embeddings might miss.
 
+    The index is sharded per project: IDF and average length are computed
+    within the project, and a query scores only the requested project's
+    shard, so large tenants neither crowd out nor slow down small ones.
+    Shards are loaded on first use and evicted least-recently-used once the
+    loaded chunk count exceeds BM25_MAX_LOADED_CHUNKS.
+
+    Chunks are ingested by Celery workers in another process, so the index
+    pulls them itself: sync() fetches chunks above a watermark (every chunk id
+    at or below it is known to be indexed or absent). Ids above the watermark
+    that are still missing may belong to uncommitted transactions and are
+    re-checked until BM25_SYNC_GAP_TIMEOUT_SECONDS. Deleted documents are
+    removed with remove_document().
+
+    Whenever a shard's base segment is (re)built it is saved under
+    BM25_SNAPSHOT_DIR, stamped with the watermark it is complete up to.
+    Loading a shard memory-maps its snapshot and replays only the chunks
+    above that version (plus drops chunks deleted meanwhile).
+
     Usage:
         bm25 = BM25Service()
         await bm25.initialize(db_session)
-        results = await bm25.search("JWT authentication API", top_k=20)
+        await bm25.prepare(db_session, project_id=1)
+        results = await bm25.search("JWT authentication API", top_k=20, project_id=1)
     """
 
-    def __init__(self):
-        """Initialize BM25 service (index built during initialize())."""
-        self.bm25_index: Optional[BM25Okapi] = None
-        self.doc_ids: List[int] = []
-        self.documents: List[Chunk] = []
+    def __init__(self, max_loaded_chunks: Optional[int] = None, snapshot_dir: Optional[str] = None):
+        """Initialize BM25 service (shards are loaded on demand)."""
+        self.max_loaded_chunks = max_loaded_chunks or settings.BM25_MAX_LOADED_CHUNKS
+        if snapshot_dir is None and settings.BM25_SNAPSHOT_ENABLED:
+            snapshot_dir = settings.BM25_SNAPSHOT_DIR
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir else None
+        self.shards: "OrderedDict[int, BM25Shard]" = OrderedDict()
+        self.watermark = 0
         self.is_initialized = False
 
+        self._gaps: Dict[int, float] = {}  # missing chunk id -> first seen
+        self._last_sync = 0.0
+        self._sync_lock = asyncio.Lock()
+        self._load_locks: Dict[int, asyncio.Lock] = {}
+        self.chunks_added = 0
+        self.chunks_removed = 0
+        self.shard_loads = 0
+        self.shard_evictions = 0
+        self.snapshot_loads = 0
+        self.snapshot_saves = 0
+
     async def initialize(self, db_session: AsyncSession) -> None:
         """
-        Build BM25 index from all document chunks in database.
+        Prepare the sharded BM25 index.
 
-        This should be called once at application startup.
+        Called once at application startup. Reads the chunk id watermark and
+        memory-maps the most recently saved shard snapshots (within the loaded
+        chunk budget); other shards are built on first query (prepare()).
 
         Args:
-            db_session: Database session for fetching chunks
+            db_session: Database session
         """
         logger.info("🔄 Initializing BM25 index...")
 
         try:
-            # Fetch all document chunks with embeddings
-            stmt = select(Chunk).where(Chunk.has_embedding == 1).order_by(Chunk.id)
-            result = await db_session.execute(stmt)
-            chunks = result.scalars().all()
-
-            if not chunks:
-                logger.warning("⚠️ No chunks found in database - BM25 index empty")
-                self.is_initialized = True
-                return
-
-            # Tokenize corpus for BM25
-            tokenized_corpus = [
-                self._tokenize(chunk.text)  # Use 'text' field from Chunk model
-                for chunk in chunks
-            ]
-
-            # Build BM25 index
-            self.bm25_index = BM25Okapi(tokenized_corpus)
-            self.doc_ids = [chunk.id for chunk in chunks]
-            self.documents = list(chunks)  # Store chunks for retrieval
+            result = await db_session.execute(select(func.max(Chunk.id)))
+            self.watermark = result.scalar() or 0
+            self._last_sync = time.time()
 
             self.is_initialized = True
-            logger.info(f"✅ BM25 index built with {len(chunks)} chunks")
+            await self._preload_snapshots(db_session)
+            logger.info(
+                f"✅ BM25 index ready (watermark={self.watermark}, "
+                f"{len(self.shards)} shards from snapshots)"
+            )
 
         except Exception as e:
             logger.error(f"❌ Failed to initialize BM25 index: {e}")
             raise
 
+    async def prepare(self, db_session: AsyncSession, project_id: int) -> None:
+        """
+        Make a project's shard current: apply pending deltas, load it if needed.
+
+        Args:
+            db_session: Database session
+            project_id: Project about to be searched
+        """
+        await self.sync(db_session)
+        if project_id in self.shards:
+            self.shards.move_to_end(project_id)
+            return
+
+        lock = self._load_locks.setdefault(project_id, asyncio.Lock())
+        async with lock:
+            if project_id not in self.shards:
+                await self._load_shard(db_session, project_id)
+        self._load_locks.pop(project_id, None)
+
+    async def _load_shard(self, db_session: AsyncSession, project_id: int) -> BM25Shard:
+        """Load a project's shard (snapshot + replay, else full build) and evict LRU shards over budget"""
+        started = time.time()
+        shard = self._load_snapshot(project_id)
+        if shard is not None:
+            await self._replay(db_session, shard)
+            source = "snapshot"
+        else:
+            shard = await self._build_shard(db_session, project_id)
+            source = "database"
+
+        self.shards[project_id] = shard
+        self.shard_loads += 1
+        logger.info(
+            f"📥 BM25 shard loaded from {source}: project={project_id}, chunks={len(shard)}, "
+            f"{(time.time() - started) * 1000:.0f}ms"
+        )
+        self._evict_if_needed(keep=project_id)
+        return shard
+
+    async def _build_shard(self, db_session: AsyncSession, project_id: int) -> BM25Shard:
+        """Tokenize all of a project's chunks into a new shard and snapshot it"""
+        version = self.watermark
+        result = await db_session.execute(
+            select(Chunk.id, Chunk.document_id, Chunk.text)
+            .where(Chunk.project_id == project_id, Chunk.has_embedding == 1)
+            .order_by(Chunk.id)
+        )
+        rows = result.all()
+
+        # Tokenizing and building the CSR base segment are CPU-bound: keep
+        # them off the event loop (the shard is not published yet)
+        shard = BM25Shard(project_id, version=version)
+        await asyncio.to_thread(self._load_rows, shard, rows)
+        self.chunks_added += len(rows)
+
+        await self._save_snapshot(shard)
+        return shard
+
+    async def _replay(self, db_session: AsyncSession, shard: BM25Shard) -> None:
+        """Bring a snapshot up to date: add chunks above its version, drop deleted ones"""
+        result = await db_session.execute(
+            select(Chunk.id, Chunk.document_id, Chunk.text)
+            .where(
+                Chunk.project_id == shard.project_id,
+                Chunk.has_embedding == 1,
+                Chunk.id > shard.version
+            )
+            .order_by(Chunk.id)
+        )
+        rows = result.all()
+        await asyncio.to_thread(self._add_rows, shard, rows)
+        added = len(rows)
+
+        result = await db_session.execute(
+            select(Chunk.id).where(
+                Chunk.project_id == shard.project_id,
+                Chunk.has_embedding == 1,
+                Chunk.id <= shard.version
+            )
+        )
+        present = np.fromiter((row[0] for row in result.all()), dtype=np.int64)
+        removed = await asyncio.to_thread(self._remove_missing, shard, present)
+
+        self.chunks_added += added
+        self.chunks_removed += removed
+        if added or removed:
+            logger.info(f"🔄 BM25 snapshot replay: project={shard.project_id}, +{added}/-{removed} chunks")
+
+    def _load_rows(self, shard: BM25Shard, rows: List[Any]) -> None:
+        """Tokenize (id, document_id, text) rows into the shard's base segment (worker thread)"""
+        shard.load([(row.id, row.document_id, self._tokenize(row.text or "")) for row in rows])
+
+    def _add_rows(self, shard: BM25Shard, rows: List[Any]) -> None:
+        """Tokenize (id, document_id, text) rows into the shard's delta segment (worker thread)"""
+        for row in rows:
+            shard.add(row.id, row.document_id, self._tokenize(row.text or ""))
+
+    @staticmethod
+    def _remove_missing(shard: BM25Shard, present: np.ndarray) -> int:
+        """Drop snapshot chunks up to the shard version that are no longer present (worker thread)"""
+        snapshot_ids = shard.index.base_ids
+        removed = 0
+        for chunk_id in np.setdiff1d(snapshot_ids[snapshot_ids <= shard.version], present).tolist():
+            removed += shard.remove(chunk_id)
+        return removed
+
+    def _snapshot_path(self, project_id: int) -> Path:
+        return self.snapshot_dir / f"project_{project_id}"
+
+    def _load_snapshot(self, project_id: int) -> Optional[BM25Shard]:
+        """Memory-map a project's snapshot, or None if there is no usable one"""
+        if self.snapshot_dir is None:
+            return None
+
+        # Resolve the published version once, so a concurrent swap can't mix
+        # files of two versions
+        path = self._snapshot_path(project_id).resolve()
+        try:
+            manifest = json.loads((path / "manifest.json").read_text())
+            if manifest.get("format") != SNAPSHOT_FORMAT:
+                return None
+
+            index = BM25Index.load(path)
+            document_ids = np.load(path / "document_ids.npy", mmap_mode="r")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring unreadable BM25 snapshot {path}: {e}")
+            return None
+
+        shard = BM25Shard(project_id, index=index, version=manifest["version"], base_document_ids=document_ids)
+        self.snapshot_loads += 1
+        return shard
+
+    async def _save_snapshot(self, shard: BM25Shard) -> None:
+        """Write a shard's (compacted) base segment; failures only cost startup time"""
+        if self.snapshot_dir is None:
+            return
+
+        try:
+            state = shard.index.state()
+            document_ids = shard.base_document_ids
+            manifest = {
+                "format": SNAPSHOT_FORMAT,
+                "project_id": shard.project_id,
+                "version": shard.version,
+                "num_chunks": len(document_ids),
+                "created_at": datetime.utcnow().isoformat(),
+            }
+            await asyncio.to_thread(
+                self._write_snapshot, self._snapshot_path(shard.project_id), state, document_ids, manifest
+            )
+            self.snapshot_saves += 1
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to save BM25 snapshot for project {shard.project_id}: {e}")
+
+    @staticmethod
+    def _write_snapshot(path: Path, state: Dict[str, Any], document_ids: np.ndarray, manifest: Dict[str, Any]) -> None:
+        """
+        Write a new snapshot version, then publish it atomically
+
+        Each save goes to its own directory under versions/ and path is a
+        symlink swapped with os.replace, so other workers and replicas sharing
+        the directory see either the old or the new version, never a partial
+        or missing one.
+        """
+        versions_dir = path.parent / SNAPSHOT_VERSIONS_DIR
+        versions_dir.mkdir(parents=True, exist_ok=True)
+        version_name = f"{path.name}.{uuid.uuid4().hex}"
+        version_path = versions_dir / version_name
+        link_path = versions_dir / f"{version_name}.link"
+        try:
+            BM25Index.save_state(state, version_path)
+            np.save(version_path / "document_ids.npy", document_ids)
+            (version_path / "manifest.json").write_text(json.dumps(manifest))
+
+            previous = BM25Service._snapshot_target(path)
+            if path.is_dir() and not path.is_symlink():
+                # Snapshot written before versioned publishing
+                shutil.rmtree(path)
+            os.symlink(Path(SNAPSHOT_VERSIONS_DIR) / version_name, link_path)
+            os.replace(link_path, path)
+        except BaseException:
+            shutil.rmtree(version_path, ignore_errors=True)
+            if link_path.is_symlink():
+                link_path.unlink()
+            raise
+
+        # Readers that resolved the old version keep their memory maps
+        if previous is not None:
+            shutil.rmtree(previous, ignore_errors=True)
+
+    @staticmethod
+    def _snapshot_target(path: Path) -> Optional[Path]:
+        """Version directory a published snapshot link points to"""
+        if not path.is_symlink():
+            return None
+        return path.parent / os.readlink(path)
+
+    @staticmethod
+    def _remove_snapshot(path: Path) -> None:
+        """Unpublish a snapshot and delete its version directory"""
+        target = BM25Service._snapshot_target(path)
+        if target is not None:
+            path.unlink(missing_ok=True)
+            shutil.rmtree(target, ignore_errors=True)
+        else:
+            shutil.rmtree(path, ignore_errors=True)
+
+    async def _preload_snapshots(self, db_session: AsyncSession) -> None:
+        """Load the most recently saved snapshots that fit the chunk budget"""
+        if self.snapshot_dir is None or not self.snapshot_dir.is_dir():
+            return
+
+        manifests: List[Tuple[float, Dict[str, Any]]] = []
+        for manifest_path in self.snapshot_dir.glob("project_*/manifest.json"):
+            try:
+                manifests.append((manifest_path.stat().st_mtime, json.loads(manifest_path.read_text())))
+            except Exception:
+                continue
+
+        budget = self.max_loaded_chunks
+        for _, manifest in sorted(manifests, key=lambda item: item[0], reverse=True):
+            if manifest.get("num_chunks", 0) > budget:
+                continue
+            shard = self._load_snapshot(manifest["project_id"])
+            if shard is None:
+                continue
+            await self._replay(db_session, shard)
+            self.shards[shard.project_id] = shard
+            budget -= len(shard)
+
+    def _evict_if_needed(self, keep: Optional[int] = None) -> None:
+        """Drop least recently used shards while over the loaded chunk budget"""
+        loaded = sum(len(shard) for shard in self.shards.values())
+        for project_id in list(self.shards):
+            if loaded <= self.max_loaded_chunks:
+                break
+            if project_id == keep:
+                continue
+            loaded -= len(self.shards.pop(project_id))
+            self.shard_evictions += 1
+            logger.info(f"📤 BM25 shard evicted: project={project_id}")
+
+    def remove_project(self, project_id: int) -> None:
+        """Drop a deleted project's shard and snapshot."""
+        self.shards.pop(project_id, None)
+        if self.snapshot_dir is not None:
+            self._remove_snapshot(self._snapshot_path(project_id))
+
     def _tokenize(self, text: str) -> List[str]:
         """
         Tokenize text for BM25 indexing.
@@ -107,11 +521,163 @@ class BM25Service:
         tokens = text.split()
         return tokens
 
+    def add_chunks(self, chunks: Iterable[Chunk]) -> int:
+        """
+        Add (or replace) chunks in their projects' loaded shards.
+
+        Chunks of projects without a loaded shard are skipped; the shard will
+        read them when it is loaded. Cost is proportional to the tokens of the
+        given chunks only.
+
+        Args:
+            chunks: Chunk rows (id, document_id, project_id, text)
+
+        Returns:
+            Number of chunks indexed
+        """
+        added = 0
+        for chunk in chunks:
+            shard = self.shards.get(chunk.project_id)
+            if shard is None:
+                continue
+            shard.add(chunk.id, chunk.document_id, self._tokenize(chunk.text or ""))
+            added += 1
+
+        self.chunks_added += added
+        return added
+
+    def remove_chunks(self, chunk_ids: Iterable[int]) -> int:
+        """
+        Remove chunks from the index.
+
+        Args:
+            chunk_ids: Chunk ids to remove
+
+        Returns:
+            Number of chunks that were indexed and got removed
+        """
+        removed = 0
+        for chunk_id in set(chunk_ids):
+            for shard in self.shards.values():
+                if shard.remove(chunk_id):
+                    removed += 1
+                    break
+
+        self.chunks_removed += removed
+        return removed
+
+    def remove_document(self, document_id: int) -> int:
+        """
+        Remove all chunks of a deleted document.
+
+        Args:
+            document_id: Document id
+
+        Returns:
+            Number of chunks removed
+        """
+        removed = sum(shard.remove_document(document_id) for shard in self.shards.values())
+        self.chunks_removed += removed
+        if removed:
+            logger.info(f"🗑️ BM25: removed {removed} chunks of document {document_id}")
+        return removed
+
+    def update_document(self, document_id: int, chunks: Iterable[Chunk]) -> None:
+        """
+        Replace the indexed chunks of a reprocessed document.
+
+        Args:
+            document_id: Document id
+            chunks: The document's current chunks
+        """
+        self.remove_document(document_id)
+        self.add_chunks(chunks)
+
+    async def sync(self, db_session: AsyncSession, force: bool = False) -> int:
+        """
+        Index chunks committed since the last sync (delta only).
+
+        Throttled to once per BM25_SYNC_INTERVAL_SECONDS unless force=True.
+
+        Args:
+            db_session: Database session
+            force: Sync even if the interval has not elapsed
+
+        Returns:
+            Number of chunks added
+        """
+        if not self.is_initialized:
+            return 0
+        if not force and time.time() - self._last_sync < settings.BM25_SYNC_INTERVAL_SECONDS:
+            return 0
+
+        async with self._sync_lock:
+            if not force and time.time() - self._last_sync < settings.BM25_SYNC_INTERVAL_SECONDS:
+                return 0
+            self._last_sync = time.time()
+
+            id_result = await db_session.execute(
+                select(Chunk.id, Chunk.project_id)
+                .where(Chunk.id > self.watermark, Chunk.has_embedding == 1)
+                .order_by(Chunk.id)
+            )
+            visible = id_result.fetchall()
+            visible_ids = [row[0] for row in visible]
+
+            # Unloaded projects read their chunks when their shard is loaded
+            new_ids = [
+                chunk_id for chunk_id, project_id in visible
+                if project_id in self.shards and chunk_id not in self.shards[project_id]
+            ]
+            added = 0
+            if new_ids:
+                chunk_result = await db_session.execute(
+                    select(Chunk.id, Chunk.document_id, Chunk.project_id, Chunk.text)
+                    .where(Chunk.id.in_(new_ids))
+                    .order_by(Chunk.id)
+                )
+                added = self.add_chunks(chunk_result.all())
+                logger.info(f"🔄 BM25 delta sync: +{added} chunks")
+
+            self._advance_watermark(visible_ids)
+
+            # Fold large deltas into the base segment (a full CSR merge, so on
+            # a worker thread); the snapshot is then complete up to the
+            # current watermark
+            for shard in list(self.shards.values()):
+                if shard.index.needs_compaction:
+                    await asyncio.to_thread(shard.compact)
+                    shard.version = self.watermark
+                    await self._save_snapshot(shard)
+
+            return added
+
+    def _advance_watermark(self, visible_ids: List[int]) -> None:
+        """Move the watermark over present ids and gaps older than the timeout"""
+        if not visible_ids:
+            return
+
+        now = time.time()
+        visible = set(visible_ids)
+        watermark = self.watermark
+        for chunk_id in range(self.watermark + 1, visible_ids[-1] + 1):
+            if chunk_id in visible:
+                if watermark == chunk_id - 1:
+                    watermark = chunk_id
+                continue
+            first_seen = self._gaps.setdefault(chunk_id, now)
+            if watermark == chunk_id - 1 and now - first_seen > settings.BM25_SYNC_GAP_TIMEOUT_SECONDS:
+                watermark = chunk_id
+
+        self.watermark = watermark
+        self._gaps = {chunk_id: seen for chunk_id, seen in self._gaps.items() if chunk_id > watermark}
+
     async def search(
         self,
         query: str,
         top_k: int = 20,
-        min_score: float = 0.0
+        min_score: float = 0.0,
+        project_id: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Search documents using BM25 keyword matching.
@@ -120,17 +686,21 @@ class BM25Service:
             query: Search query string
             top_k: Number of top results to return
             min_score: Minimum BM25 score threshold (optional filter)
+            project_id: Project shard to search (call prepare() first); None
+                searches every loaded shard, each with its own IDF
 
         Returns:
-            List of search results with BM25 scores, sorted by relevance
+            List of search results with BM25 scores, sorted by relevance.
+            Chunk text and metadata are not held in memory ("content" and
+            "chunk_metadata" are None); fetch them for the returned ids.
 
         Example:
             results = await bm25.search("JWT authentication", top_k=20)
             # [
             #     {
             #         "id": 123,
-            #         "chunk_id": "chunk_abc",
-            #         "content": "JWT authentication...",
+            #         "chunk_id": 123,
+            #         "document_id": 7,
             #         "score": 15.42,
             #         "source": "sparse"
             #     },
@@ -141,58 +711,26 @@ class BM25Service:
             logger.warning("⚠️ BM25 not initialized - returning empty results")
             return []
 
-        if not self.bm25_index:
-            logger.warning("⚠️ BM25 index is empty - returning empty results")
+        shards = self._search_shards(project_id)
+        if not any(len(shard) for shard in shards):
             return []
 
         try:
-            # Tokenize query
-            query_tokens = self._tokenize(query)
+            # Tokenizing and scoring are CPU-bound: keep them off the event loop
+            query_tokens, top_hits = await asyncio.to_thread(self._score_shards, query, shards, top_k)
 
             if not query_tokens:
                 logger.warning(f"⚠️ Query tokenization resulted in empty tokens: {query}")
                 return []
 
-            # Get BM25 scores for all documents
-            scores = self.bm25_index.get_scores(query_tokens)
-
-            # Get top-k indices sorted by score (descending)
-            top_indices = np.argsort(scores)[-top_k:][::-1]
-
             # Build results
-            results = []
-            for idx in top_indices:
-                score = float(scores[idx])
-
-                # Apply min_score filter
-                if score < min_score:
-                    continue
-
-                # Get document chunk
-                chunk = self.documents[idx]
-
-                result = {
-                    "id": chunk.id,
-                    "chunk_id": chunk.id,  # Use chunk.id as chunk_id
-                    "document_id": chunk.document_id,
-                    "document_type": None,  # Not available in Chunk model
-                    "title": None,  # Not available in Chunk model
-                    "content": chunk.text,  # Use 'text' field from Chunk model
-                    "page_number": None,  # Not available in Chunk model
-                    "section_name": None,  # Not available in Chunk model
-                    "product_codes": None,  # Not available in Chunk model
-                    "parameters": None,  # Not available in Chunk model
-                    "standards": None,  # Not available in Chunk model
-                    "chunk_metadata": chunk.chunk_metadata,  # Metadata JSON string
-                    "score": score,
-                    "source": "sparse",  # Mark as BM25 result
-                }
-                results.append(result)
+            results = self._build_results(top_hits, min_score)
 
+            top_score = results[0]["score"] if results else 0.0
             logger.info(
                 f"🔍 BM25 search: query='{query[:50]}...', "
                 f"tokens={len(query_tokens)}, results={len(results)}, "
-                f"top_score={results[0]['score']:.2f if results else 0:.2f}"
+                f"top_score={top_score:.2f}"
             )
 
             return results
@@ -201,20 +739,138 @@ class BM25Service:
             logger.error(f"❌ BM25 search failed: {e}")
             return []
 
+    async def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 20,
+        min_score: float = 0.0,
+        project_id: Optional[int] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        BM25 search for several queries at once (batch search).
+
+        All queries are tokenized and scored in one worker thread call, with
+        one vectorized pass over each shard (BM25Index.top_k_many), instead of
+        a thread hop and a score buffer per query.
+
+        Args:
+            queries: Search query strings
+            top_k: Number of top results per query
+            min_score: Minimum BM25 score threshold
+            project_id: Project shard to search (call prepare() first); None
+                searches every loaded shard
+
+        Returns:
+            One result list per query, in the format of search()
+        """
+        empty: List[List[Dict[str, Any]]] = [[] for _ in queries]
+        if not self.is_initialized:
+            logger.warning("⚠️ BM25 not initialized - returning empty results")
+            return empty
+
+        shards = self._search_shards(project_id)
+        if not queries or not any(len(shard) for shard in shards):
+            return empty
+
+        try:
+            hits_per_query = await asyncio.to_thread(self._score_shards_many, queries, shards, top_k)
+        except Exception as e:
+            logger.error(f"❌ BM25 batch search failed: {e}")
+            return empty
+
+        results = [self._build_results(top_hits, min_score) for top_hits in hits_per_query]
+        logger.info(
+            f"🔍 BM25 batch search: queries={len(queries)}, "
+            f"results={sum(len(query_results) for query_results in results)}"
+        )
+        return results
+
+    def _search_shards(self, project_id: Optional[int]) -> List[BM25Shard]:
+        """Shards searched for a project (every loaded shard for None)"""
+        if project_id is None:
+            return list(self.shards.values())
+        shard = self.shards.get(project_id)
+        return [shard] if shard is not None else []
+
+    @staticmethod
+    def _build_results(top_hits: List[Tuple[int, int, float]], min_score: float) -> List[Dict[str, Any]]:
+        """Result dicts for (chunk_id, document_id, score) hits scoring at least min_score"""
+        results = []
+        for chunk_id, document_id, score in top_hits:
+            # Apply min_score filter
+            if score < min_score:
+                continue
+
+            result = {
+                "id": chunk_id,
+                "chunk_id": chunk_id,
+                "document_id": document_id,
+                "document_type": None,  # Not available in Chunk model
+                "title": None,  # Not available in Chunk model
+                "content": None,  # Fetched from the database for the final hits
+                "page_number": None,  # Not available in Chunk model
+                "section_name": None,  # Not available in Chunk model
+                "product_codes": None,  # Not available in Chunk model
+                "parameters": None,  # Not available in Chunk model
+                "standards": None,  # Not available in Chunk model
+                "chunk_metadata": None,  # Fetched from the database for the final hits
+                "score": float(score),
+                "source": "sparse",  # Mark as BM25 result
+            }
+            results.append(result)
+        return results
+
+    def _score_shards(
+        self,
+        query: str,
+        shards: List[BM25Shard],
+        top_k: int
+    ) -> Tuple[List[str], List[Tuple[int, int, float]]]:
+        """Tokenize the query and merge the top-k hits of the given shards (worker thread)"""
+        query_tokens = self._tokenize(query)
+        if not query_tokens:
+            return query_tokens, []
+
+        # Score only postings of the query terms in the project's shard
+        scored = []
+        for shard in shards:
+            scored.extend(shard.top_k(query_tokens, top_k))
+
+        return query_tokens, heapq.nlargest(top_k, scored, key=lambda item: item[2])
+
+    def _score_shards_many(
+        self,
+        queries: List[str],
+        shards: List[BM25Shard],
+        top_k: int
+    ) -> List[List[Tuple[int, int, float]]]:
+        """Tokenize the queries and merge each query's top-k hits of the given shards (worker thread)"""
+        query_tokens = [self._tokenize(query) for query in queries]
+        scored: List[List[Tuple[int, int, float]]] = [[] for _ in queries]
+        for shard in shards:
+            for hits, shard_hits in zip(scored, shard.top_k_many(query_tokens, top_k)):
+                hits.extend(shard_hits)
+
+        return [heapq.nlargest(top_k, hits, key=lambda item: item[2]) for hits in scored]
+
     async def rebuild_index(self, db_session: AsyncSession) -> None:
         """
         Rebuild BM25 index from scratch.
 
-        Use this when documents are added/updated/deleted.
+        Only needed after bulk changes outside the application (e.g. manual SQL);
+        normal ingestion and deletion are applied incrementally. Drops all
+        shards and snapshots; shards are rebuilt on their next query.
 
         Args:
-            db_session: Database session for fetching chunks
+            db_session: Database session
         """
         logger.info("🔄 Rebuilding BM25 index...")
         self.is_initialized = False
-        self.bm25_index = None
-        self.doc_ids = []
-        self.documents = []
+        self.shards = OrderedDict()
+        self.watermark = 0
+        self._gaps = {}
+        if self.snapshot_dir is not None:
+            shutil.rmtree(self.snapshot_dir, ignore_errors=True)
 
         await self.initialize(db_session)
 
@@ -227,8 +883,19 @@ class BM25Service:
         """
         return {
             "initialized": self.is_initialized,
-            "num_documents": len(self.documents),
-            "index_size_mb": len(str(self.doc_ids)) / (1024 * 1024) if self.doc_ids else 0,
+            "loaded_shards": len(self.shards),
+            "num_documents": sum(len(shard) for shard in self.shards.values()),
+            "num_terms": sum(shard.index.num_terms for shard in self.shards.values()),
+            "memory_bytes": sum(shard.nbytes for shard in self.shards.values()),
+            "max_loaded_chunks": self.max_loaded_chunks,
+            "shard_loads": self.shard_loads,
+            "shard_evictions": self.shard_evictions,
+            "snapshot_loads": self.snapshot_loads,
+            "snapshot_saves": self.snapshot_saves,
+            "watermark": self.watermark,
+            "pending_gaps": len(self._gaps),
+            "chunks_added": self.chunks_added,
+            "chunks_removed": self.chunks_removed,
         }
 
 
@@ -0,0 +1,220 @@
+"""
+KnowledgeTree Backend - Bulk Chunk Writer
+Stream chunk rows into PostgreSQL with COPY instead of per-row ORM adds
+
+Every ingestion path used to db.add(Chunk(...)) one object at a time and let
+the unit of work flush row by row; for a 2,000-chunk document (each row
+carrying a 1024-float embedding) that dominated the storage step. ChunkWriter
+sends all rows of a document in one binary COPY through the session's own
+asyncpg connection, so the rows are part of the caller's transaction and
+commit or roll back with it. Database triggers (chunks.project_id) and
+generated columns (binary-quantized embeddings) apply to COPY exactly as
+to INSERT.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import settings
+from models.chunk import Chunk
+
+logger = logging.getLogger(__name__)
+
+
+# Columns written by ingestion; id and created_at use their database defaults
+CHUNK_COLUMNS = (
+    "text",
+    "chunk_metadata",
+    "chunk_before",
+    "chunk_after",
+    "embedding",
+    "has_embedding",
+    "chunk_index",
+    "document_id",
+    "category_id",
+    "lexical_weights",
+)
+
+# JSONB columns: bound as dicts by INSERT, sent as JSON text by COPY
+JSON_COLUMNS = frozenset({"lexical_weights"})
+
+
+class ChunkWriter:
+    """
+    Bulk writer for chunk rows
+
+    Uses asyncpg copy_records_to_table with pgvector's binary encoding when
+    the session runs on asyncpg, and falls back to a single executemany
+    INSERT (SQLAlchemy batches it into multi-row VALUES) otherwise.
+
+    Usage:
+        rows = [chunk_writer.make_row(document_id=doc.id, text=t, embedding=e, chunk_index=i) ...]
+        written = await chunk_writer.write(db, rows)
+        await db.commit()
+    """
+
+    def __init__(self, use_copy: bool = True):
+        """
+        Initialize chunk writer
+
+        Args:
+            use_copy: Use COPY when the driver supports it (False forces INSERT)
+        """
+        self.use_copy = use_copy
+        self.rows_written = 0
+        self.copy_calls = 0
+        self.insert_calls = 0
+
+    @staticmethod
+    def make_row(
+        document_id: int,
+        text: str,
+        embedding: Optional[Sequence[float]],
+        chunk_index: int,
+        chunk_metadata: Any = None,
+        chunk_before: Optional[str] = None,
+        chunk_after: Optional[str] = None,
+        category_id: Optional[int] = None,
+        lexical_weights: Optional[Dict[int, float]] = None
+    ) -> Dict[str, Any]:
+        """
+        Build one chunk row
+
+        Args:
+            document_id: Owning document
+            text: Chunk text
+            embedding: Embedding vector (None stores the chunk without one)
+            chunk_index: Position in document
+            chunk_metadata: dict (JSON-encoded here) or pre-encoded string
+            chunk_before: Previous chunk text (contextual embeddings)
+            chunk_after: Next chunk text (contextual embeddings)
+            category_id: Optional chunk-level category
+            lexical_weights: BGE-M3 {token_id: weight} (expanded into
+                chunk_sparse_terms by a database trigger)
+
+        Returns:
+            Row dictionary keyed by CHUNK_COLUMNS
+        """
+        if chunk_metadata is not None and not isinstance(chunk_metadata, str):
+            chunk_metadata = json.dumps(chunk_metadata)
+
+        return {
+            "text": text,
+            "chunk_metadata": chunk_metadata,
+            "chunk_before": chunk_before,
+            "chunk_after": chunk_after,
+            "embedding": list(embedding) if embedding is not None else None,
+            "has_embedding": 1 if embedding is not None else 0,
+            "chunk_index": chunk_index,
+            "document_id": document_id,
+            "category_id": category_id,
+            "lexical_weights": ChunkWriter.encode_lexical_weights(lexical_weights),
+        }
+
+    @staticmethod
+    def encode_lexical_weights(lexical_weights: Optional[Dict[int, float]]) -> Optional[Dict[str, float]]:
+        """{token_id: weight} -> JSON object for chunks.lexical_weights (4 decimals)"""
+        if lexical_weights is None:
+            return None
+        return {str(token_id): round(float(weight), 4) for token_id, weight in lexical_weights.items()}
+
+    async def write(self, db: AsyncSession, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Write chunk rows within the session's current transaction
+
+        Args:
+            db: Database session (not committed here)
+            rows: Rows from make_row()
+
+        Returns:
+            Number of rows written
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+
+        # Pending ORM changes (e.g. a new Document) must reach the database first
+        await db.flush()
+
+        driver_connection = await self._get_asyncpg_connection(db) if self.use_copy else None
+        if driver_connection is not None:
+            await self._copy(driver_connection, rows)
+            self.copy_calls += 1
+        else:
+            await db.execute(insert(Chunk), rows)
+            self.insert_calls += 1
+
+        self.rows_written += len(rows)
+        return len(rows)
+
+    async def _get_asyncpg_connection(self, db: AsyncSession):
+        """Return the session's asyncpg connection, or None for other drivers"""
+        connection = await db.connection()
+        if connection.dialect.driver != "asyncpg":
+            return None
+        raw_connection = await connection.get_raw_connection()
+        return raw_connection.driver_connection
+
+    async def _copy(self, driver_connection, rows: List[Dict[str, Any]]) -> None:
+        """
+        Binary COPY of rows into chunks
+
+        The binary vector codec is registered only for the duration of the
+        COPY: SQLAlchemy's pgvector type binds vectors as text, so a codec left
+        on the pooled connection would break later ORM queries. halfvec and
+        binary modes store chunks.embedding as halfvec (migration
+        0b6e2f9a1c57), which has its own binary format.
+        """
+        from pgvector import HalfVector, Vector
+
+        if settings.VECTOR_SEARCH_MODE in ("halfvec", "binary"):
+            type_name, vector_class = "halfvec", HalfVector
+        else:
+            type_name, vector_class = "vector", Vector
+
+        records = [
+            tuple(
+                json.dumps(row[column])
+                if column in JSON_COLUMNS and row.get(column) is not None
+                else row.get(column)
+                for column in CHUNK_COLUMNS
+            )
+            for row in rows
+        ]
+
+        await driver_connection.set_type_codec(
+            type_name,
+            schema="public",
+            encoder=lambda v: (v if isinstance(v, vector_class) else vector_class(v)).to_binary(),
+            decoder=vector_class.from_binary,
+            format="binary"
+        )
+        try:
+            await driver_connection.copy_records_to_table(
+                "chunks",
+                records=records,
+                columns=list(CHUNK_COLUMNS)
+            )
+        finally:
+            await driver_connection.reset_type_codec(type_name, schema="public")
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get writer statistics
+
+        Returns:
+            Dictionary with rows written and COPY / INSERT call counts
+        """
+        return {
+            "rows_written": self.rows_written,
+            "copy_calls": self.copy_calls,
+            "insert_calls": self.insert_calls,
+        }
+
+
+# Global singleton instance shared by all ingestion paths
+chunk_writer = ChunkWriter()
@@ -8,6 +8,9 @@ Key Features:
 - Multilingual cross-encoder model (mmarco-mMiniLMv2)
 - Two-stage pipeline: retrieve (top-k) → rerank (top-n)
 - Batch processing for efficiency
+- Score cache: repeated (query, chunk) pairs skip the model
+- Optional cascade: cheap truncated-input passes prune candidates before
+  the full-length pass
 - Relevance scoring (0-1 scale)
 
 Reference: RAG 2025 best practices + ALURON project
@@ -18,6 +21,11 @@ from typing import List, Dict, Any, Optional
 from sentence_transformers import CrossEncoder
 import numpy as np
 
+from core.config import settings
+from services.micro_batcher import MicroBatcher
+from services.rerank_score_cache import RerankScoreCache, rerank_score_cache
+from services.pipeline_metrics import stage_timer
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,6 +42,14 @@ class CrossEncoderService:
         3. Rerank by cross-encoder scores
         4. Return top-n results
 
+    Cascade (stages=[12, 6], for example):
+        Attention cost grows with the square of the sequence length, so a
+        pass over the first RERANK_CASCADE_FIRST_STAGE_MAX_CHARS characters
+        of each chunk is several times cheaper than the full 512-token pass.
+        Each cheap stage keeps its best N candidates (the character budget
+        doubles from stage to stage); only the survivors of the last stage
+        are scored on full text. Final scores always come from the full pass.
+
     Model: cross-encoder/mmarco-mMiniLMv2-L12-H384-v1
     - Multilingual (supports Polish)
     - Size: 471MB
@@ -49,16 +65,33 @@ class CrossEncoderService:
         )
     """
 
-    def __init__(self, model_name: str = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"):
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1",
+        score_cache: Optional[RerankScoreCache] = None
+    ):
         """
         Initialize cross-encoder service.
 
         Args:
             model_name: Cross-encoder model identifier (HuggingFace)
+            score_cache: (query, chunk) score cache (default: shared instance)
         """
         self.model_name = model_name
         self.model: Optional[CrossEncoder] = None
         self.is_initialized = False
+        self.score_cache = score_cache if score_cache is not None else rerank_score_cache
+
+        self.pairs_scored = 0  # Pairs sent to the model (cache misses), all stages
+        self.cascade_pairs_scored = 0  # Of which in cheap (truncated) cascade stages
+        self.cascade_pruned = 0  # Candidates dropped by cascade stages
+
+        # Pairs from concurrent rerank calls are scored in one predict() call
+        self.batcher = MicroBatcher(
+            name="cross_encoder",
+            batch_fn=self._predict_batch,
+            max_batch_size=settings.CROSS_ENCODER_MICROBATCH_MAX_PAIRS
+        )
 
     def initialize(self) -> None:
         """
@@ -84,12 +117,65 @@ class CrossEncoderService:
             logger.error(f"❌ Failed to load cross-encoder model: {e}")
             raise
 
+    def _predict_batch(self, pairs: List[List[str]]) -> List[float]:
+        """
+        Score [query, document] pairs with the cross-encoder (runs on the inference executor)
+        """
+        scores = self.model.predict(pairs, show_progress_bar=False)
+        if isinstance(scores, np.ndarray):
+            scores = scores.tolist()
+        return scores
+
+    async def _score(
+        self,
+        query: str,
+        results: List[Dict[str, Any]],
+        max_chars: Optional[int] = None
+    ) -> List[float]:
+        """
+        Score candidates against a query, serving repeats from the score cache
+
+        Args:
+            query: Query text as the user wrote it (the scored text; only its
+                normalized form is used as the cache key)
+            results: Candidates with "chunk_id" and "chunk_text"
+            max_chars: Score only the first max_chars characters of each chunk
+                (cached under the truncated text's content version)
+
+        Returns:
+            Scores aligned with results
+        """
+        if max_chars is not None:
+            results = [dict(result, chunk_text=result.get("chunk_text", "")[:max_chars]) for result in results]
+
+        normalized = self.score_cache.normalize(query)
+        cached = self.score_cache.get_many(normalized, results)
+        misses = [result for i, result in enumerate(results) if i not in cached]
+        if not misses:
+            return [cached[i] for i in range(len(results))]
+
+        # Only cache misses are scored, via the micro-batcher on the
+        # inference executor, so the event loop stays responsive and
+        # concurrent requests share a batch
+        miss_scores = await self.batcher.submit(
+            [[query, result.get("chunk_text", "")] for result in misses]
+        )
+        self.score_cache.put_many(normalized, misses, miss_scores)
+        self.pairs_scored += len(misses)
+        if max_chars is not None:
+            self.cascade_pairs_scored += len(misses)
+
+        miss_scores = iter(miss_scores)
+        return [cached[i] if i in cached else next(miss_scores) for i in range(len(results))]
+
     async def rerank(
         self,
         query: str,
         results: List[Dict[str, Any]],
         top_k: int = 5,
-        min_score: float = 0.0
+        min_score: float = 0.0,
+        stages: Optional[List[int]] = None,
+        timings: Optional[Dict[str, float]] = None
     ) -> List[Dict[str, Any]]:
         """
         Rerank search results using cross-encoder scoring.
@@ -99,6 +185,10 @@ class CrossEncoderService:
             results: List of search results (from hybrid/dense/sparse search)
             top_k: Number of top results to return after reranking
             min_score: Minimum cross-encoder score threshold (0-1)
+            stages: Candidates kept by each cheap cascade stage, e.g. [12, 6]
+                (default: settings.RERANK_CASCADE_STAGES; [] = single full pass)
+            timings: Optional dict, filled with "rerank_cascade_ms" (cheap
+                stages) and "cross_encoder_ms" (full-length pass)
 
         Returns:
             Reranked results with cross-encoder scores, sorted by relevance
@@ -115,29 +205,38 @@ class CrossEncoderService:
             logger.warning("⚠️ Empty results list - nothing to rerank")
             return []
 
+        stages = settings.RERANK_CASCADE_STAGES if stages is None else stages
+
         try:
-            # Prepare [query, document] pairs for scoring
-            pairs = []
-            for result in results:
-                chunk_text = result.get("chunk_text", "")
-                pairs.append([query, chunk_text])
+            for i, result in enumerate(results):
+                result["original_rank"] = i + 1  # Store original ranking
 
-            # Batch scoring with cross-encoder
             logger.info(
                 f"🔍 Cross-encoder reranking: query='{query[:50]}...', "
-                f"candidates={len(pairs)}, top_k={top_k}"
+                f"candidates={len(results)}, top_k={top_k}, stages={stages or 'single'}"
             )
 
-            scores = self.model.predict(pairs, show_progress_bar=False)
-
-            # Convert numpy array to list of floats
-            if isinstance(scores, np.ndarray):
-                scores = scores.tolist()
+            # Cheap stages: truncated text, keep the best N (never fewer than top_k)
+            candidates = results
+            max_chars = settings.RERANK_CASCADE_FIRST_STAGE_MAX_CHARS
+            for keep in stages:
+                keep = max(keep, top_k)
+                if len(candidates) > keep:
+                    with stage_timer("rerank_cascade", timings):
+                        stage_scores = await self._score(query, candidates, max_chars=max_chars)
+                    best = sorted(range(len(candidates)), key=lambda j: stage_scores[j], reverse=True)[:keep]
+                    self.cascade_pruned += len(candidates) - keep
+                    candidates = [candidates[j] for j in sorted(best)]
+                max_chars *= 2
+
+            # Full-length pass on the survivors
+            with stage_timer("cross_encoder", timings):
+                scores = await self._score(query, candidates)
 
             # Add cross-encoder scores to results
-            for i, result in enumerate(results):
-                result["cross_encoder_score"] = float(scores[i])
-                result["original_rank"] = i + 1  # Store original ranking
+            for result, score in zip(candidates, scores):
+                result["cross_encoder_score"] = float(score)
+            results = candidates
 
             # Filter by min_score
             filtered_results = [
@@ -155,10 +254,11 @@ class CrossEncoderService:
             # Return top-k
             top_results = reranked[:top_k]
 
+            top_score = top_results[0]["cross_encoder_score"] if top_results else 0.0
             logger.info(
                 f"✅ Cross-encoder reranking completed: "
                 f"{len(top_results)} results, "
-                f"top_score={top_results[0]['cross_encoder_score']:.4f if top_results else 0:.4f}"
+                f"top_score={top_score:.4f}"
             )
 
             return top_results
@@ -181,6 +281,11 @@ class CrossEncoderService:
             "max_sequence_length": 512,
             "supports_multilingual": True,
             "supports_polish": True,
+            "score_cache": self.score_cache.get_stats(),
+            "cascade_stages": settings.RERANK_CASCADE_STAGES,
+            "pairs_scored": self.pairs_scored,
+            "cascade_pairs_scored": self.cascade_pairs_scored,
+            "cascade_pruned": self.cascade_pruned,
         }
 
 
@@ -4,7 +4,6 @@ Celery tasks for background document processing
 """
 
 import asyncio
-import json
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, List, Optional
@@ -19,7 +18,8 @@ from models.chunk import Chunk
 from models.crawl_job import CrawlJob, CrawlStatus
 from services.pdf_processor import PDFProcessor
 from services.text_chunker import TextChunker
-from services.embedding_generator import EmbeddingGenerator
+from services.embedding_generator import embedding_generator
+from services.chunk_writer import chunk_writer
 from services.web_content_processor import web_content_processor
 from services.agentic_crawl_workflow import agentic_crawl_workflow
 from services.crawler_orchestrator import CrawlEngine
@@ -27,10 +27,10 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-# Initialize services
+# Initialize services (embedding_generator is the process-wide shared instance,
+# preloaded in the Celery parent process - see core.celery_app)
 pdf_processor = PDFProcessor()
 text_chunker = TextChunker()
-embedding_generator = EmbeddingGenerator()
 
 
 @celery_app.task(name="services.document_tasks.process_document_task", bind=True)
@@ -147,37 +147,33 @@ async def _process_document_async(task, document_id: int) -> Dict[str, Any]:
             )
 
             # Step 3: Generate contextual embeddings for chunks
+            # All contextual texts are encoded together in length-bucketed batches
             logger.info(f"Document {document_id}: Generating embeddings...")
-            embeddings = []
-            for i, chunk_data in enumerate(chunks_data):
-                try:
-                    # Generate contextual embedding (5-7 seconds per chunk)
-                    embedding = embedding_generator.generate_contextual_embedding(
-                        text=chunk_data["text"],
-                        chunk_before=chunk_data.get("chunk_before"),
-                        chunk_after=chunk_data.get("chunk_after")
-                    )
-                    embeddings.append(embedding)
-
-                    # Update progress every chunk (embedding is the longest step: 15-90%)
-                    # Calculate percentage: 15% (start) + 75% * (progress / total)
-                    percentage = 15 + int(75 * (i + 1) / len(chunks_data))
-                    task.update_state(
-                        state='PROGRESS',
-                        meta={
-                            'current': 2,
-                            'total': 3,
-                            'status': 'Generating embeddings',
-                            'step': 'embeddings',
-                            'percentage': percentage,
-                            'chunks_processed': i + 1,
-                            'chunks_total': len(chunks_data),
-                            'message': f'Generated {i+1}/{len(chunks_data)} embeddings ({percentage}%)'
-                        }
-                    )
-                except Exception as e:
-                    logger.error(f"Document {document_id}: Failed to generate embedding for chunk {i}: {e}")
-                    embeddings.append(None)
+
+            def report_embedding_progress(chunks_processed: int, chunks_total: int):
+                # Embedding is the longest step: 15-90%, reported once per batch
+                percentage = 15 + int(75 * chunks_processed / chunks_total)
+                task.update_state(
+                    state='PROGRESS',
+                    meta={
+                        'current': 2,
+                        'total': 3,
+                        'status': 'Generating embeddings',
+                        'step': 'embeddings',
+                        'percentage': percentage,
+                        'chunks_processed': chunks_processed,
+                        'chunks_total': chunks_total,
+                        'message': f'Generated {chunks_processed}/{chunks_total} embeddings ({percentage}%)'
+                    }
+                )
+
+            # Lexical weights come from the same forward pass as the dense vectors
+            lexical_weights = []
+            embeddings = embedding_generator.generate_contextual_embeddings_batch(
+                chunks_data,
+                progress_callback=report_embedding_progress,
+                lexical_weights=lexical_weights
+            )
 
             logger.info(f"Document {document_id}: Generated {len([e for e in embeddings if e])} embeddings")
 
@@ -194,7 +190,7 @@ async def _process_document_async(task, document_id: int) -> Dict[str, Any]:
                 }
             )
             
-            chunks_created = 0
+            chunk_rows = []
             for i, chunk_data in enumerate(chunks_data):
                 embedding = embeddings[i]
 
@@ -203,18 +199,19 @@ async def _process_document_async(task, document_id: int) -> Dict[str, Any]:
                     logger.warning(f"Document {document_id}: Skipping chunk {i} - embedding generation failed")
                     continue
 
-                chunk = Chunk(
+                chunk_rows.append(chunk_writer.make_row(
+                    document_id=document.id,
                     text=chunk_data["text"],
-                    chunk_metadata=json.dumps(chunk_data["chunk_metadata"]),
-                    chunk_before=chunk_data.get("chunk_before"),
-                    chunk_after=chunk_data.get("chunk_after"),
                     embedding=embedding,
-                    has_embedding=1,
                     chunk_index=chunk_data["chunk_index"],
-                    document_id=document.id
-                )
-                db.add(chunk)
-                chunks_created += 1
+                    chunk_metadata=chunk_data["chunk_metadata"],
+                    chunk_before=chunk_data.get("chunk_before"),
+                    chunk_after=chunk_data.get("chunk_after"),
+                    lexical_weights=lexical_weights[i]
+                ))
+
+            # Single bulk COPY in the same transaction as the status update
+            chunks_created = await chunk_writer.write(db, chunk_rows)
 
             # Update document status to completed
             document.page_count = page_count
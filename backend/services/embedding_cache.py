@@ -0,0 +1,295 @@
+"""
+KnowledgeTree Backend - Embedding Cache
+Content-addressed persistent cache for BGE-M3 vectors
+
+Embeddings are keyed by a hash of (model name, context mode, text), so any
+byte-identical chunk (re-uploads, re-crawls of unchanged pages, the same PDF
+in two projects) is embedded only once. Vectors are stored as float32 blobs
+in a SQLite file that is shared by the API process and every Celery worker.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache with LRU eviction
+
+    Storage:
+        - SQLite table (key -> float32 vector blob, last_used timestamp)
+        - WAL mode so several worker processes can read/write concurrently
+
+    Eviction:
+        When the number of entries exceeds max_entries, the least recently
+        used entries are removed (evict_fraction of the cache at a time).
+        Lookups stay read-only: a hit refreshes last_used only if it is
+        older than touch_interval_seconds, and the refresh is buffered in
+        memory and written with the next put_many() (or once 1000 are
+        pending), so plain lookups never contend for SQLite's single writer.
+
+    Usage:
+        cache = EmbeddingCache()
+        cached = cache.get_many(texts, model_name, "contextual")
+        cache.put_many(texts, embeddings, model_name, "contextual")
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        evict_fraction: float = 0.1,
+        enabled: Optional[bool] = None,
+        touch_interval_seconds: Optional[float] = None
+    ):
+        self.path = Path(path or settings.EMBEDDING_CACHE_PATH)
+        self.max_entries = max_entries or settings.EMBEDDING_CACHE_MAX_ENTRIES
+        self.evict_fraction = evict_fraction
+        self.enabled = settings.EMBEDDING_CACHE_ENABLED if enabled is None else enabled
+        self.touch_interval_seconds = (
+            settings.EMBEDDING_CACHE_TOUCH_INTERVAL_SECONDS
+            if touch_interval_seconds is None else touch_interval_seconds
+        )
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._pending_touches: Dict[str, float] = {}  # key -> last_used not yet written
+
+    @staticmethod
+    def make_key(text: str, model_name: str, context_mode: str) -> str:
+        """
+        Build the content address for a text
+
+        Args:
+            text: Exact text that is passed to the model
+            model_name: Embedding model identifier
+            context_mode: "plain" or "contextual"
+
+        Returns:
+            SHA-256 hex digest
+        """
+        payload = f"{model_name}\x00{context_mode}\x00{text}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open (or reuse) the SQLite connection for the current process
+
+        Connections must not cross fork() boundaries, so a new connection
+        is opened whenever the PID changes (e.g. inside a Celery child).
+        """
+        pid = os.getpid()
+        if self._conn is not None and self._conn_pid == pid:
+            return self._conn
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_embeddings_last_used ON embeddings (last_used)")
+        conn.commit()
+
+        self._conn = conn
+        self._conn_pid = pid
+        return conn
+
+    def get_many(
+        self,
+        texts: List[str],
+        model_name: str,
+        context_mode: str
+    ) -> Dict[int, List[float]]:
+        """
+        Look up cached embeddings for a list of texts
+
+        Args:
+            texts: Texts to look up
+            model_name: Embedding model identifier
+            context_mode: "plain" or "contextual"
+
+        Returns:
+            Mapping of position in texts -> cached embedding (hits only)
+        """
+        if not self.enabled or not texts:
+            return {}
+
+        keys = [self.make_key(text, model_name, context_mode) for text in texts]
+        found: Dict[str, List[float]] = {}
+        now = time.time()
+        stale_before = now - self.touch_interval_seconds
+
+        try:
+            with self._lock:
+                conn = self._connect()
+                unique_keys = list(dict.fromkeys(keys))
+                # Stay well below SQLite's bound-parameter limit
+                for start in range(0, len(unique_keys), 500):
+                    batch = unique_keys[start:start + 500]
+                    placeholders = ",".join("?" * len(batch))
+                    rows = conn.execute(
+                        f"SELECT key, vector, last_used FROM embeddings WHERE key IN ({placeholders})",
+                        batch
+                    ).fetchall()
+                    for key, blob, last_used in rows:
+                        found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+                        if last_used <= stale_before:
+                            self._pending_touches[key] = now
+
+                if len(self._pending_touches) >= 1000:
+                    self._flush_touches(conn)
+                    conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache lookup failed, treating as miss: {e}")
+            self.misses += len(texts)
+            return {}
+
+        hits = {i: found[key] for i, key in enumerate(keys) if key in found}
+        self.hits += len(hits)
+        self.misses += len(texts) - len(hits)
+        return hits
+
+    def put_many(
+        self,
+        texts: List[str],
+        embeddings: List[Optional[List[float]]],
+        model_name: str,
+        context_mode: str
+    ) -> None:
+        """
+        Store embeddings for a list of texts (None embeddings are skipped)
+
+        Args:
+            texts: Texts that were embedded
+            embeddings: Embeddings aligned with texts
+            model_name: Embedding model identifier
+            context_mode: "plain" or "contextual"
+        """
+        if not self.enabled:
+            return
+
+        now = time.time()
+        rows = [
+            (
+                self.make_key(text, model_name, context_mode),
+                len(embedding),
+                np.asarray(embedding, dtype=np.float32).tobytes(),
+                now
+            )
+            for text, embedding in zip(texts, embeddings)
+            if embedding is not None
+        ]
+        if not rows:
+            return
+
+        try:
+            with self._lock:
+                conn = self._connect()
+                # Buffered hit refreshes share the write transaction (and
+                # land before eviction picks its victims)
+                self._flush_touches(conn)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, dim, vector, last_used) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                conn.commit()
+                self._evict_if_needed(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    def _flush_touches(self, conn: sqlite3.Connection) -> None:
+        """Write buffered last_used refreshes (caller holds the lock and commits)"""
+        if not self._pending_touches:
+            return
+        conn.executemany(
+            "UPDATE embeddings SET last_used = ? WHERE key = ?",
+            [(last_used, key) for key, last_used in self._pending_touches.items()]
+        )
+        self._pending_touches = {}
+
+    def _evict_if_needed(self, conn: sqlite3.Connection) -> None:
+        """Remove least recently used entries once the cache exceeds max_entries"""
+        count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        if count <= self.max_entries:
+            return
+
+        to_remove = count - self.max_entries + int(self.max_entries * self.evict_fraction)
+        conn.execute(
+            "DELETE FROM embeddings WHERE key IN "
+            "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+            (to_remove,)
+        )
+        conn.commit()
+        self.evictions += to_remove
+        logger.info(f"Embedding cache evicted {to_remove} least recently used entries")
+
+    def clear(self) -> None:
+        """Remove all cached embeddings and reset counters"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM embeddings")
+            conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_stats(self) -> Dict[str, object]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with hit/miss counters, entry count and on-disk size
+        """
+        entries = 0
+        size_mb = 0.0
+        if self.enabled:
+            try:
+                with self._lock:
+                    conn = self._connect()
+                    entries = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                size_mb = self.path.stat().st_size / (1024 * 1024) if self.path.exists() else 0.0
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Failed to read embedding cache stats: {e}")
+
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "path": str(self.path),
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "size_mb": round(size_mb, 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+# Global singleton instance (opened lazily, one connection per process)
+embedding_cache = EmbeddingCache()
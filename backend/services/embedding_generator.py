@@ -5,12 +5,16 @@ Generate BGE-M3 embeddings for text chunks
 
 import logging
 import numpy as np
-from typing import List, Union
+from typing import List, Union, Optional, Callable, Dict, Any
 from FlagEmbedding import BGEM3FlagModel
 from core.config import settings
+from services.embedding_cache import EmbeddingCache, embedding_cache
 
 logger = logging.getLogger(__name__)
 
+# Cache namespace suffix for BGE-M3 lexical weights ("contextual" -> "contextual_lexical")
+LEXICAL_CACHE_SUFFIX = "_lexical"
+
 
 class EmbeddingGenerator:
     """
@@ -19,13 +23,21 @@ class EmbeddingGenerator:
     TIER 1 Advanced RAG - Phase 4: Contextual Embeddings
     - Supports generating embeddings with surrounding context
     - Improves semantic understanding by including chunk_before + text + chunk_after
+
+    All generate_* methods consult the persistent EmbeddingCache first, so
+    byte-identical texts are only ever encoded once.
+
+    The batch methods can also return BGE-M3 lexical weights (learned sparse
+    token weights) from the same forward pass as the dense vectors; they feed
+    the "lexical" sparse engine of SearchService.
     """
 
-    def __init__(self):
+    def __init__(self, cache: Optional[EmbeddingCache] = None):
         self.model_name = settings.EMBEDDING_MODEL
         self.dimensions = settings.EMBEDDING_DIMENSIONS
         self.device = settings.EMBEDDING_DEVICE
         self.model = None
+        self.cache = cache if cache is not None else embedding_cache
 
     def load_model(self):
         """
@@ -42,12 +54,19 @@ class EmbeddingGenerator:
             )
             logger.info(f"Model loaded successfully on {self.device}")
 
-    def generate_embedding(self, text: str) -> List[float]:
+    def generate_embedding(
+        self,
+        text: str,
+        context_mode: str = "plain",
+        use_cache: bool = True
+    ) -> List[float]:
         """
         Generate embedding for a single text
 
         Args:
             text: Input text
+            context_mode: Cache namespace ("plain" or "contextual")
+            use_cache: Consult and populate the persistent embedding cache
 
         Returns:
             List of floats (embedding vector)
@@ -55,6 +74,11 @@ class EmbeddingGenerator:
         if not text or not text.strip():
             raise ValueError("Cannot generate embedding for empty text")
 
+        if use_cache:
+            cached = self.cache.get_many([text], self.model_name, context_mode)
+            if cached:
+                return cached[0]
+
         # Load model if not already loaded
         self.load_model()
 
@@ -62,7 +86,7 @@ class EmbeddingGenerator:
         embeddings = self.model.encode(
             [text],
             batch_size=1,
-            max_length=8192  # BGE-M3 supports up to 8192 tokens
+            max_length=settings.EMBEDDING_MAX_LENGTH  # BGE-M3 supports up to 8192 tokens
         )
 
         # Extract dense embedding (1024 dimensions)
@@ -73,7 +97,12 @@ class EmbeddingGenerator:
             raise ValueError(f"Embedding dimension mismatch: {len(embedding)} != {self.dimensions}")
 
         # Convert to list
-        return embedding.tolist()
+        embedding = embedding.tolist()
+
+        if use_cache:
+            self.cache.put_many([text], [embedding], self.model_name, context_mode)
+
+        return embedding
 
     def generate_contextual_embedding(
         self,
@@ -106,7 +135,36 @@ class EmbeddingGenerator:
         if not text or not text.strip():
             raise ValueError("Cannot generate embedding for empty text")
 
-        # Build contextual text
+        contextual_text = self.build_contextual_text(text, chunk_before, chunk_after)
+
+        # Log context usage
+        logger.debug(
+            f"Generating contextual embedding: "
+            f"before={'✓' if chunk_before else '✗'}, "
+            f"after={'✓' if chunk_after else '✗'}, "
+            f"total_length={len(contextual_text)}"
+        )
+
+        # Generate embedding using standard method
+        return self.generate_embedding(contextual_text, context_mode="contextual")
+
+    @staticmethod
+    def build_contextual_text(
+        text: str,
+        chunk_before: str = None,
+        chunk_after: str = None
+    ) -> str:
+        """
+        Build the "[BEFORE] ... [MAIN] ... [AFTER] ..." text used for contextual embeddings
+
+        Args:
+            text: Main chunk text
+            chunk_before: Previous chunk text (optional)
+            chunk_after: Next chunk text (optional)
+
+        Returns:
+            Combined contextual text
+        """
         contextual_parts = []
 
         if chunk_before and chunk_before.strip():
@@ -117,30 +175,273 @@ class EmbeddingGenerator:
         if chunk_after and chunk_after.strip():
             contextual_parts.append(f"[AFTER] {chunk_after.strip()}")
 
-        contextual_text = " ".join(contextual_parts)
+        return " ".join(contextual_parts)
 
-        # Log context usage
-        logger.debug(
-            f"Generating contextual embedding: "
-            f"before={'✓' if chunk_before else '✗'}, "
-            f"after={'✓' if chunk_after else '✗'}, "
-            f"total_length={len(contextual_text)}"
+    @staticmethod
+    def to_lexical_weights(raw: Dict[Any, float]) -> Dict[int, float]:
+        """
+        Convert BGE-M3 lexical weights ({"<token id>": weight}) to {token_id: weight}
+
+        Zero weights are dropped.
+        """
+        return {int(token_id): float(weight) for token_id, weight in raw.items() if weight > 0}
+
+    @staticmethod
+    def pack_lexical_weights(weights: Optional[Dict[int, float]]) -> Optional[List[float]]:
+        """Flatten lexical weights to [id, weight, id, weight, ...] for the embedding cache"""
+        if weights is None:
+            return None
+        # XLM-R token ids (< 250k) are exact in float32
+        return [value for item in weights.items() for value in item]
+
+    @staticmethod
+    def unpack_lexical_weights(packed: List[float]) -> Dict[int, float]:
+        """Inverse of pack_lexical_weights()"""
+        return {int(packed[i]): packed[i + 1] for i in range(0, len(packed), 2)}
+
+    def generate_contextual_embeddings_batch(
+        self,
+        chunks: List[Dict[str, Any]],
+        batch_size: Optional[int] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        lexical_weights: Optional[List[Optional[Dict[int, float]]]] = None
+    ) -> List[Optional[List[float]]]:
+        """
+        Generate contextual embeddings for many chunks using length-bucketed batches
+
+        All contextual texts are built up front, sorted by token length and grouped
+        into buckets. Each bucket is encoded with generate_embeddings_batch() using
+        max_length equal to its longest text, so padding stays close to the real
+        sequence length instead of a fixed 8192 tokens.
+
+        Args:
+            chunks: Chunk dicts with "text" and optional "chunk_before"/"chunk_after"
+            batch_size: Maximum texts per bucket (default: settings.EMBEDDING_BATCH_SIZE)
+            progress_callback: Called as progress_callback(done, total) after each bucket
+            lexical_weights: Optional list, filled in place with each chunk's
+                BGE-M3 lexical weights (None where generation failed)
+
+        Returns:
+            Embeddings in the same order as chunks (None where generation failed)
+        """
+        want_lexical = lexical_weights is not None
+        if want_lexical:
+            lexical_weights[:] = [None] * len(chunks)
+
+        if not chunks:
+            return []
+
+        batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        total = len(chunks)
+        results: List[Optional[List[float]]] = [None] * total
+
+        # Build all contextual texts up front (empty chunks are left as None)
+        texts = {}
+        for i, chunk in enumerate(chunks):
+            text = chunk.get("text")
+            if not text or not text.strip():
+                continue
+            texts[i] = self.build_contextual_text(
+                text,
+                chunk.get("chunk_before"),
+                chunk.get("chunk_after")
+            )
+
+        if not texts:
+            logger.warning("All chunks are empty, returning empty embeddings")
+            return results
+
+        # Serve byte-identical chunks (re-uploads, shared PDFs) from the cache
+        cached_indices = list(texts.keys())
+        cached = self.cache.get_many(
+            [texts[i] for i in cached_indices], self.model_name, "contextual"
         )
+        if want_lexical:
+            cached = self._join_cached_lexical(
+                cached, [texts[i] for i in cached_indices], "contextual",
+                lexical_weights, cached_indices
+            )
+        for position, embedding in cached.items():
+            results[cached_indices[position]] = embedding
+            del texts[cached_indices[position]]
 
-        # Generate embedding using standard method
-        return self.generate_embedding(contextual_text)
+        if cached:
+            logger.info(f"Embedding cache: {len(cached)}/{len(cached_indices)} chunks already embedded")
+
+        if not texts:
+            if progress_callback:
+                progress_callback(total, total)
+            return results
+
+        self.load_model()
+
+        # Sort by token length so each bucket pads to a similar length
+        indices = list(texts.keys())
+        lengths = dict(zip(indices, self._count_tokens([texts[i] for i in indices])))
+        indices.sort(key=lambda i: lengths[i])
+
+        buckets = self._build_length_buckets(indices, lengths, batch_size)
+        logger.info(
+            f"Generating {len(indices)} contextual embeddings in {len(buckets)} "
+            f"length buckets (batch_size={batch_size})"
+        )
 
-    def generate_embeddings_batch(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
+        done = total - len(indices)
+        for bucket in buckets:
+            bucket_max_length = self._padded_length(max(lengths[i] for i in bucket))
+            bucket_texts = [texts[i] for i in bucket]
+            bucket_lexical = [] if want_lexical else None
+
+            try:
+                embeddings = self.generate_embeddings_batch(
+                    bucket_texts,
+                    batch_size=len(bucket_texts),
+                    max_length=bucket_max_length,
+                    use_cache=False,
+                    lexical_weights=bucket_lexical
+                )
+            except Exception as e:
+                # Isolate failing chunks instead of losing the whole bucket
+                logger.error(f"Embedding bucket of {len(bucket)} failed, retrying individually: {e}")
+                embeddings = []
+                bucket_lexical = [] if want_lexical else None
+                for bucket_text in bucket_texts:
+                    item_lexical = [] if want_lexical else None
+                    try:
+                        embeddings.extend(self.generate_embeddings_batch(
+                            [bucket_text], batch_size=1, use_cache=False, lexical_weights=item_lexical
+                        ))
+                    except Exception as item_error:
+                        logger.error(f"Failed to generate contextual embedding: {item_error}")
+                        embeddings.append(None)
+                        item_lexical = [None]
+                    if want_lexical:
+                        bucket_lexical.extend(item_lexical)
+
+            self.cache.put_many(bucket_texts, embeddings, self.model_name, "contextual")
+            if want_lexical:
+                self.cache.put_many(
+                    bucket_texts,
+                    [self.pack_lexical_weights(w) for w in bucket_lexical],
+                    self.model_name,
+                    "contextual" + LEXICAL_CACHE_SUFFIX
+                )
+
+            for i, embedding in zip(bucket, embeddings):
+                results[i] = embedding
+            if want_lexical:
+                for i, weights in zip(bucket, bucket_lexical):
+                    lexical_weights[i] = weights
+
+            done += len(bucket)
+            if progress_callback:
+                progress_callback(done, total)
+
+        return results
+
+    def _join_cached_lexical(
+        self,
+        cached: Dict[int, List[float]],
+        texts: List[str],
+        context_mode: str,
+        lexical_weights: List[Optional[Dict[int, float]]],
+        result_indices: List[int]
+    ) -> Dict[int, List[float]]:
+        """
+        Keep only the dense cache hits whose lexical weights are cached too
+
+        Texts cached before lexical weights were stored are encoded again, so
+        both come from one forward pass. Found weights are written to
+        lexical_weights[result_indices[position]].
+        """
+        if not cached:
+            return cached
+
+        positions = list(cached)
+        found = self.cache.get_many(
+            [texts[p] for p in positions], self.model_name, context_mode + LEXICAL_CACHE_SUFFIX
+        )
+        for j, packed in found.items():
+            lexical_weights[result_indices[positions[j]]] = self.unpack_lexical_weights(packed)
+        return {positions[j]: cached[positions[j]] for j in found}
+
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        """
+        Count tokens per text with the model tokenizer (falls back to a character estimate)
+        """
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is not None:
+            try:
+                encoded = tokenizer(texts, add_special_tokens=True, truncation=False)
+                return [len(ids) for ids in encoded["input_ids"]]
+            except Exception as e:
+                logger.warning(f"Tokenizer length estimate failed, using character heuristic: {e}")
+
+        # Roughly 3 characters per XLM-R token for mixed Polish/English text
+        return [len(text) // 3 + 2 for text in texts]
+
+    def _padded_length(self, num_tokens: int) -> int:
+        """Round a bucket length up to a multiple of 8, capped at EMBEDDING_MAX_LENGTH"""
+        padded = ((num_tokens + 7) // 8) * 8
+        return max(8, min(padded, settings.EMBEDDING_MAX_LENGTH))
+
+    def _build_length_buckets(
+        self,
+        sorted_indices: List[int],
+        lengths: Dict[int, int],
+        batch_size: int
+    ) -> List[List[int]]:
+        """
+        Group length-sorted indices into buckets bounded by batch_size and token budget
+        """
+        token_budget = settings.EMBEDDING_MAX_TOKENS_PER_BATCH
+        buckets: List[List[int]] = []
+        current: List[int] = []
+
+        for i in sorted_indices:
+            # Items are sorted ascending, so the newest item sets the bucket's padded length
+            padded = self._padded_length(lengths[i])
+            if current and (
+                len(current) >= batch_size
+                or padded * (len(current) + 1) > token_budget
+            ):
+                buckets.append(current)
+                current = []
+            current.append(i)
+
+        if current:
+            buckets.append(current)
+
+        return buckets
+
+    def generate_embeddings_batch(
+        self,
+        texts: List[str],
+        batch_size: int = 32,
+        max_length: Optional[int] = None,
+        context_mode: str = "plain",
+        use_cache: bool = True,
+        lexical_weights: Optional[List[Optional[Dict[int, float]]]] = None
+    ) -> List[List[float]]:
         """
         Generate embeddings for multiple texts in batches
 
         Args:
             texts: List of input texts
             batch_size: Number of texts to process at once
+            max_length: Max sequence length per batch (default: settings.EMBEDDING_MAX_LENGTH)
+            context_mode: Cache namespace ("plain" or "contextual")
+            use_cache: Consult and populate the persistent embedding cache
+            lexical_weights: Optional list, filled in place with each text's
+                BGE-M3 lexical weights (None for empty texts)
 
         Returns:
             List of embedding vectors
         """
+        want_lexical = lexical_weights is not None
+        if want_lexical:
+            lexical_weights[:] = [None] * len(texts)
+
         if not texts:
             return []
 
@@ -152,32 +453,99 @@ class EmbeddingGenerator:
             logger.warning("All texts are empty, returning empty list")
             return [None] * len(texts)
 
+        # Reconstruct full list with None for empty texts
+        result = [None] * len(texts)
+
+        # Fill cache hits and only encode the misses
+        cached = {}
+        if use_cache:
+            cached = self.cache.get_many(valid_texts, self.model_name, context_mode)
+            if want_lexical:
+                cached = self._join_cached_lexical(
+                    cached, valid_texts, context_mode, lexical_weights, valid_indices
+                )
+            for position, embedding in cached.items():
+                result[valid_indices[position]] = embedding
+
+        missing_positions = [p for p in range(len(valid_texts)) if p not in cached]
+        if not missing_positions:
+            return result
+
+        missing_texts = [valid_texts[p] for p in missing_positions]
+
         # Load model if not already loaded
         self.load_model()
 
+        max_length = max_length or settings.EMBEDDING_MAX_LENGTH
+
         # Generate embeddings in batches
         all_embeddings = []
-        for i in range(0, len(valid_texts), batch_size):
-            batch = valid_texts[i:i + batch_size]
-            logger.info(f"Processing batch {i // batch_size + 1}/{(len(valid_texts) + batch_size - 1) // batch_size}")
+        all_lexical = []
+        for i in range(0, len(missing_texts), batch_size):
+            batch = missing_texts[i:i + batch_size]
+            logger.debug(f"Processing batch {i // batch_size + 1}/{(len(missing_texts) + batch_size - 1) // batch_size}")
 
             embeddings = self.model.encode(
                 batch,
                 batch_size=batch_size,
-                max_length=8192
+                max_length=max_length,
+                return_sparse=want_lexical
             )
 
             # Extract dense embeddings
             batch_embeddings = embeddings['dense_vecs']
             all_embeddings.extend([emb.tolist() for emb in batch_embeddings])
+            if want_lexical:
+                all_lexical.extend(self.to_lexical_weights(w) for w in embeddings['lexical_weights'])
+
+        for position, embedding in zip(missing_positions, all_embeddings):
+            result[valid_indices[position]] = embedding
+        for position, weights in zip(missing_positions, all_lexical):
+            lexical_weights[valid_indices[position]] = weights
+
+        if use_cache:
+            self.cache.put_many(missing_texts, all_embeddings, self.model_name, context_mode)
+            if want_lexical:
+                self.cache.put_many(
+                    missing_texts,
+                    [self.pack_lexical_weights(w) for w in all_lexical],
+                    self.model_name,
+                    context_mode + LEXICAL_CACHE_SUFFIX
+                )
+
+        logger.info(
+            f"Generated {len(all_embeddings)} embeddings from {len(texts)} texts "
+            f"({len(cached)} served from cache)"
+        )
+        return result
 
-        # Reconstruct full list with None for empty texts
-        result = [None] * len(texts)
-        for i, idx in enumerate(valid_indices):
-            result[idx] = all_embeddings[i]
+    def generate_lexical_weights(self, texts: List[str]) -> List[Optional[Dict[int, float]]]:
+        """
+        Generate BGE-M3 lexical weights only (query side of the "lexical" sparse engine)
 
-        logger.info(f"Generated {len(all_embeddings)} embeddings from {len(texts)} texts")
-        return result
+        Args:
+            texts: Input texts
+
+        Returns:
+            {token_id: weight} per text (None for empty texts)
+        """
+        results: List[Optional[Dict[int, float]]] = [None] * len(texts)
+        valid_indices = [i for i, text in enumerate(texts) if text and text.strip()]
+        if not valid_indices:
+            return results
+
+        self.load_model()
+
+        output = self.model.encode(
+            [texts[i] for i in valid_indices],
+            batch_size=len(valid_indices),
+            max_length=settings.EMBEDDING_MAX_LENGTH,
+            return_dense=False,
+            return_sparse=True
+        )
+        for i, weights in zip(valid_indices, output['lexical_weights']):
+            results[i] = self.to_lexical_weights(weights)
+        return results
 
     def get_model_info(self) -> dict:
         """
@@ -190,5 +558,10 @@ class EmbeddingGenerator:
             "model_name": self.model_name,
             "dimensions": self.dimensions,
             "device": self.device,
-            "loaded": self.model is not None
+            "loaded": self.model is not None,
+            "cache": self.cache.get_stats()
         }
+
+
+# Shared instance for the API process (one model copy for every SearchService)
+embedding_generator = EmbeddingGenerator()
@@ -313,7 +313,7 @@ class ExplainabilityService:
         Generate summary of retrieval pipeline performance.
 
         Args:
-            results: Search results with explanations
+            results: Search results (with or without explanations)
             pipeline_type: Type of retrieval pipeline
             execution_time_ms: Total execution time
 
@@ -331,42 +331,47 @@ class ExplainabilityService:
         if results:
             # Dense scores
             dense_scores = [
-                r.get("explanation", {}).get("dense_score")
+                self._result_score(r, "dense_score")
                 for r in results
-                if r.get("explanation", {}).get("dense_score") is not None
+                if self._result_score(r, "dense_score") is not None
             ]
             if dense_scores:
                 summary["average_scores"]["dense"] = sum(dense_scores) / len(dense_scores)
 
             # Sparse scores
             sparse_scores = [
-                r.get("explanation", {}).get("sparse_score")
+                self._result_score(r, "sparse_score")
                 for r in results
-                if r.get("explanation", {}).get("sparse_score") is not None
+                if self._result_score(r, "sparse_score") is not None
             ]
             if sparse_scores:
                 summary["average_scores"]["sparse"] = sum(sparse_scores) / len(sparse_scores)
 
             # RRF scores
             rrf_scores = [
-                r.get("explanation", {}).get("rrf_score")
+                self._result_score(r, "rrf_score")
                 for r in results
-                if r.get("explanation", {}).get("rrf_score") is not None
+                if self._result_score(r, "rrf_score") is not None
             ]
             if rrf_scores:
                 summary["average_scores"]["rrf"] = sum(rrf_scores) / len(rrf_scores)
 
             # Cross-encoder scores
             ce_scores = [
-                r.get("explanation", {}).get("cross_encoder_score")
+                self._result_score(r, "cross_encoder_score")
                 for r in results
-                if r.get("explanation", {}).get("cross_encoder_score") is not None
+                if self._result_score(r, "cross_encoder_score") is not None
             ]
             if ce_scores:
                 summary["average_scores"]["cross_encoder"] = sum(ce_scores) / len(ce_scores)
 
         return summary
 
+    @staticmethod
+    def _result_score(result: Dict[str, Any], field: str) -> Optional[float]:
+        """Score from the result's explanation if present, else from the result itself"""
+        return (result.get("explanation") or result).get(field)
+
 
 # Global singleton instance
 explainability_service = ExplainabilityService()
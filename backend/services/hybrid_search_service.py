@@ -5,9 +5,10 @@ Combines dense (vector) and sparse (BM25) retrieval using weighted RRF.
 Part of TIER 1 Advanced RAG implementation.
 
 Key Features:
-- Parallel execution of dense + sparse search
+- Parallel execution of dense + sparse search (one pooled session per leg)
 - Reciprocal Rank Fusion (RRF) with k=60
 - Configurable weights (default: 0.6 dense, 0.4 sparse)
+- Batch search: many queries per dense SQL statement and BM25 pass
 - Unified result format
 - Async interface
 
@@ -16,8 +17,13 @@ Reference: ALURON project hybrid RAG + RAG 2025 best practices
 
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-from sqlalchemy.ext.asyncio import AsyncSession
+import time
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.config import settings
+from core.database import AsyncSessionLocal
+from services.pipeline_metrics import stage_timer
 
 logger = logging.getLogger(__name__)
 
@@ -38,19 +44,26 @@ class HybridSearchService:
         - Dense: 0.6 (semantic understanding)
         - Sparse: 0.4 (exact keyword matching)
 
+    The legs run concurrently, each on its own session from the pool: one
+    asyncpg connection executes one statement at a time, so sharing the
+    caller's session would serialize them (or fail with "another operation
+    is in progress"). The legs only read, so they need no commit.
+
     Usage:
         service = HybridSearchService(search_service)
         results, time = await service.search(db, query, project_id)
     """
 
-    def __init__(self, search_service):
+    def __init__(self, search_service, session_factory: async_sessionmaker = AsyncSessionLocal):
         """
         Initialize hybrid search service.
 
         Args:
             search_service: SearchService instance with dense & sparse methods
+            session_factory: Opens one session per retrieval leg
         """
         self.search_service = search_service
+        self.session_factory = session_factory
 
         # Default RRF parameters
         self.rrf_k = 60  # Universal constant (from literature)
@@ -68,13 +81,17 @@ class HybridSearchService:
         min_bm25_score: float = 0.0,
         dense_weight: Optional[float] = None,
         sparse_weight: Optional[float] = None,
-        category_id: Optional[int] = None
+        category_id: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        sparse_engine: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+        dense_queries: Optional[List[str]] = None
     ) -> tuple[List[dict], float]:
         """
         Perform hybrid search with dense + sparse retrieval and RRF fusion.
 
         Args:
-            db: Database session
+            db: Caller's database session (the legs open their own)
             query: Search query text
             project_id: Project to search within
             limit: Final number of results to return
@@ -84,12 +101,18 @@ class HybridSearchService:
             dense_weight: Override default dense weight
             sparse_weight: Override default sparse weight
             category_id: Optional category filter
+            ef_search: HNSW candidate list size for the dense leg
+            sparse_engine: Sparse engine ("bm25", "postgres" or "lexical", default from settings)
+            timings: Optional dict, filled with per-stage wall times in ms
+                ("dense_ms", "sparse_ms", "fusion_ms" and the legs' sub-stages)
+            dense_queries: Queries for the dense leg (default: [query]); several
+                are searched in one round trip and fused with RRF first
 
         Returns:
             Tuple of (results list with RRF scores, execution time in ms)
         """
-        import time
         start_time = time.time()
+        timings = timings if timings is not None else {}
 
         # Use custom weights if provided
         d_weight = dense_weight if dense_weight is not None else self.dense_weight
@@ -105,14 +128,14 @@ class HybridSearchService:
         try:
             dense_results, sparse_results = await asyncio.gather(
                 # Dense: Vector similarity search
-                self._dense_search(
-                    db, query, project_id, top_k_retrieve,
-                    min_similarity, category_id
+                self._run_leg(
+                    "dense", timings, self._dense_search,
+                    dense_queries or [query], project_id, top_k_retrieve, min_similarity, category_id, ef_search
                 ),
                 # Sparse: BM25 keyword search
-                self._sparse_search(
-                    db, query, project_id, top_k_retrieve,
-                    min_bm25_score
+                self._run_leg(
+                    "sparse", timings, self._sparse_search,
+                    query, project_id, top_k_retrieve, min_bm25_score, sparse_engine
                 ),
                 return_exceptions=True
             )
@@ -135,15 +158,17 @@ class HybridSearchService:
             return [], 0.0
 
         # Step 2: Reciprocal Rank Fusion
-        fused_results = self._reciprocal_rank_fusion(
-            result_lists=[dense_results, sparse_results],
-            weights=[d_weight, s_weight],
-            k=self.rrf_k
-        )
+        with stage_timer("fusion", timings):
+            fused_results = self._reciprocal_rank_fusion(
+                result_lists=[dense_results, sparse_results],
+                weights=[d_weight, s_weight],
+                k=self.rrf_k
+            )
 
+        top_score = fused_results[0]["rrf_score"] if fused_results else 0.0
         logger.info(
             f"  RRF fusion: {len(fused_results)} unique chunks, "
-            f"top_score={fused_results[0]['rrf_score']:.4f if fused_results else 0:.4f}"
+            f"top_score={top_score:.4f}"
         )
 
         # Step 3: Return top-k results
@@ -151,42 +176,158 @@ class HybridSearchService:
 
         execution_time = (time.time() - start_time) * 1000  # Convert to ms
         logger.info(
-            f"✅ Hybrid search completed: {len(final_results)} results in {execution_time:.2f}ms"
+            f"✅ Hybrid search completed: {len(final_results)} results in {execution_time:.2f}ms "
+            f"(dense={timings.get('dense_ms', 0.0):.1f}ms, sparse={timings.get('sparse_ms', 0.0):.1f}ms)"
         )
 
         return final_results, execution_time
 
+    async def search_batch(
+        self,
+        queries: List[str],
+        project_id: int,
+        limit: int = 10,
+        top_k_retrieve: int = 20,
+        min_similarity: float = 0.5,
+        min_bm25_score: float = 0.0,
+        dense_weight: Optional[float] = None,
+        sparse_weight: Optional[float] = None,
+        category_id: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        sparse_engine: Optional[str] = None,
+        group_size: Optional[int] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> AsyncIterator[Tuple[int, List[dict]]]:
+        """
+        Hybrid search for many queries, yielding results group by group.
+
+        Queries are processed in groups of group_size. Per group, the dense
+        leg embeds all queries in one batched call and searches them in one
+        SQL statement (search_multi), while the sparse leg scores them in one
+        BM25 pass (search_sparse_multi); each query's lists are then fused
+        with RRF as in search(). Groups bound the statement size and let the
+        caller stream the first results while later groups are searched.
+
+        Args:
+            queries: Search query texts
+            project_id: Project to search within
+            group_size: Queries per group (default: settings.BATCH_SEARCH_GROUP_SIZE)
+            timings: Optional dict, filled with per-stage wall times in ms
+                summed over all groups
+            (other arguments as in search(), applied to every query)
+
+        Yields:
+            (query index, results list with RRF scores), in query order
+        """
+        timings = timings if timings is not None else {}
+        group_size = group_size or settings.BATCH_SEARCH_GROUP_SIZE
+        d_weight = dense_weight if dense_weight is not None else self.dense_weight
+        s_weight = sparse_weight if sparse_weight is not None else self.sparse_weight
+
+        logger.info(
+            f"🔀 Hybrid batch search: queries={len(queries)}, group_size={group_size}, "
+            f"weights=[dense={d_weight:.2f}, sparse={s_weight:.2f}]"
+        )
+
+        for offset in range(0, len(queries), group_size):
+            group = queries[offset:offset + group_size]
+            dense_lists, sparse_lists = await asyncio.gather(
+                self._run_leg(
+                    "dense", timings, self._dense_search_multi,
+                    group, project_id, top_k_retrieve, min_similarity, category_id, ef_search
+                ),
+                self._run_leg(
+                    "sparse", timings, self._sparse_search_multi,
+                    group, project_id, top_k_retrieve, min_bm25_score, sparse_engine
+                ),
+                return_exceptions=True
+            )
+
+            if isinstance(dense_lists, Exception):
+                logger.error(f"❌ Dense batch search failed: {dense_lists}")
+                dense_lists = [[] for _ in group]
+
+            if isinstance(sparse_lists, Exception):
+                logger.error(f"❌ Sparse batch search failed: {sparse_lists}")
+                sparse_lists = [[] for _ in group]
+
+            for position, (dense_results, sparse_results) in enumerate(zip(dense_lists, sparse_lists)):
+                with stage_timer("fusion", timings):
+                    fused_results = self._reciprocal_rank_fusion(
+                        result_lists=[dense_results, sparse_results],
+                        weights=[d_weight, s_weight],
+                        k=self.rrf_k
+                    )
+                yield offset + position, fused_results[:limit]
+
+    async def _run_leg(self, stage: str, timings: Dict[str, float], leg, *args) -> List[dict]:
+        """Run one retrieval leg on its own pooled session and record its wall time"""
+        with stage_timer(stage, timings):
+            async with self.session_factory() as db:
+                return await leg(db, *args, timings=timings)
+
     async def _dense_search(
         self,
         db: AsyncSession,
-        query: str,
+        queries: List[str],
         project_id: int,
         top_k: int,
         min_similarity: float,
-        category_id: Optional[int]
+        category_id: Optional[int],
+        ef_search: Optional[int] = None,
+        timings: Optional[Dict[str, float]] = None
     ) -> List[dict]:
         """
         Perform dense vector similarity search.
 
+        A single query runs a plain k-NN search. Several queries (original +
+        reformulations) are embedded in one batch and searched in one SQL
+        statement, and their lists are fused with unweighted RRF.
+
         Args:
             db: Database session
-            query: Search query
+            queries: Search queries (original first)
             project_id: Project ID
             top_k: Number of results
             min_similarity: Minimum similarity threshold
             category_id: Optional category filter
+            ef_search: HNSW candidate list size
+            timings: Optional per-stage timings dict
 
         Returns:
             List of dense search results
         """
-        results, _ = await self.search_service.search(
-            db=db,
-            query=query,
-            project_id=project_id,
-            limit=top_k,
-            min_similarity=min_similarity,
-            category_id=category_id
-        )
+        if len(queries) == 1:
+            results, _ = await self.search_service.search(
+                db=db,
+                query=queries[0],
+                project_id=project_id,
+                limit=top_k,
+                min_similarity=min_similarity,
+                category_id=category_id,
+                ef_search=ef_search,
+                timings=timings
+            )
+        else:
+            result_lists, _ = await self.search_service.search_multi(
+                db=db,
+                queries=queries,
+                project_id=project_id,
+                limit=top_k,
+                min_similarity=min_similarity,
+                category_id=category_id,
+                ef_search=ef_search,
+                timings=timings
+            )
+            with stage_timer("multi_query_fusion", timings):
+                results = self._reciprocal_rank_fusion(
+                    result_lists=result_lists,
+                    weights=[1.0] * len(result_lists),
+                    k=self.rrf_k
+                )[:top_k]
+            # The leg's own fusion score only orders the dense list
+            for result in results:
+                del result["rrf_score"]
 
         # Mark as dense results
         for result in results:
@@ -195,13 +336,45 @@ class HybridSearchService:
 
         return results
 
+    async def _dense_search_multi(
+        self,
+        db: AsyncSession,
+        queries: List[str],
+        project_id: int,
+        top_k: int,
+        min_similarity: float,
+        category_id: Optional[int],
+        ef_search: Optional[int] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> List[List[dict]]:
+        """Dense results of each query: one batched embedding call, one SQL statement"""
+        result_lists, _ = await self.search_service.search_multi(
+            db=db,
+            queries=queries,
+            project_id=project_id,
+            limit=top_k,
+            min_similarity=min_similarity,
+            category_id=category_id,
+            ef_search=ef_search,
+            timings=timings
+        )
+
+        for results in result_lists:
+            for result in results:
+                result["source"] = "dense"
+                result["dense_score"] = result.get("similarity_score", 0.0)
+
+        return result_lists
+
     async def _sparse_search(
         self,
         db: AsyncSession,
         query: str,
         project_id: int,
         top_k: int,
-        min_score: float
+        min_score: float,
+        engine: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None
     ) -> List[dict]:
         """
         Perform sparse BM25 keyword search.
@@ -212,6 +385,8 @@ class HybridSearchService:
             project_id: Project ID
             top_k: Number of results
             min_score: Minimum BM25 score
+            engine: Sparse engine ("bm25", "postgres" or "lexical")
+            timings: Optional per-stage timings dict
 
         Returns:
             List of sparse search results
@@ -221,7 +396,9 @@ class HybridSearchService:
             query=query,
             project_id=project_id,
             limit=top_k,
-            min_score=min_score
+            min_score=min_score,
+            engine=engine,
+            timings=timings
         )
 
         # Mark as sparse results
@@ -231,6 +408,34 @@ class HybridSearchService:
 
         return results
 
+    async def _sparse_search_multi(
+        self,
+        db: AsyncSession,
+        queries: List[str],
+        project_id: int,
+        top_k: int,
+        min_score: float,
+        engine: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> List[List[dict]]:
+        """Sparse results of each query (one BM25 pass and hydration query for the bm25 engine)"""
+        result_lists, _ = await self.search_service.search_sparse_multi(
+            db=db,
+            queries=queries,
+            project_id=project_id,
+            limit=top_k,
+            min_score=min_score,
+            engine=engine,
+            timings=timings
+        )
+
+        for results in result_lists:
+            for result in results:
+                result["source"] = "sparse"
+                result["sparse_score"] = result.get("similarity_score", 0.0)
+
+        return result_lists
+
     def _reciprocal_rank_fusion(
         self,
         result_lists: List[List[dict]],
@@ -0,0 +1,133 @@
+"""
+KnowledgeTree Backend - Inference Executor
+Bounded thread pool for running model inference outside the asyncio event loop
+
+BGE-M3 encoding and cross-encoder scoring are synchronous and take hundreds
+of milliseconds. Called directly from an async handler they freeze the whole
+FastAPI worker (health checks, SSE progress streams, chat tokens). All model
+calls from async code go through this executor instead. PyTorch releases the
+GIL inside its kernels, so a small thread pool gives real parallelism without
+copying the models into extra processes.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceExecutor:
+    """
+    Dedicated, bounded executor for model inference
+
+    Tracks queue depth (submitted but not yet started), in-flight calls,
+    wait time (submit -> start) and run time per call.
+
+    Usage:
+        embedding = await inference_executor.run(generator.generate_embedding, query)
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Initialize inference executor (threads are created lazily)
+
+        Args:
+            max_workers: Thread pool size (default: settings.INFERENCE_EXECUTOR_WORKERS)
+        """
+        self.max_workers = max_workers or settings.INFERENCE_EXECUTOR_WORKERS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        self.queue_depth = 0
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.total_calls = 0
+        self.failed_calls = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.total_run_ms = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="inference"
+            )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a blocking inference call on the executor and await its result
+
+        Args:
+            fn: Synchronous callable (e.g. model.encode / model.predict wrapper)
+            *args, **kwargs: Passed through to fn
+
+        Returns:
+            Whatever fn returns (exceptions are re-raised in the caller)
+        """
+        loop = asyncio.get_running_loop()
+        submitted_at = time.perf_counter()
+
+        with self._lock:
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+        def call() -> Any:
+            started_at = time.perf_counter()
+            wait_ms = (started_at - submitted_at) * 1000
+            with self._lock:
+                self.queue_depth -= 1
+                self.in_flight += 1
+                self.total_wait_ms += wait_ms
+                self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                with self._lock:
+                    self.failed_calls += 1
+                raise
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+                    self.total_calls += 1
+                    self.total_run_ms += (time.perf_counter() - started_at) * 1000
+
+        return await loop.run_in_executor(self._get_executor(), call)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads (called on application shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get executor metrics
+
+        Returns:
+            Dictionary with pool size, queue depth and wait/run timings
+        """
+        calls = self.total_calls
+        return {
+            "max_workers": self.max_workers,
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "max_queue_depth": self.max_queue_depth,
+            "total_calls": calls,
+            "failed_calls": self.failed_calls,
+            "avg_wait_ms": round(self.total_wait_ms / calls, 2) if calls else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 2),
+            "avg_run_ms": round(self.total_run_ms / calls, 2) if calls else 0.0,
+        }
+
+
+# Global singleton instance shared by all async model callers
+inference_executor = InferenceExecutor()
@@ -0,0 +1,190 @@
+"""
+KnowledgeTree Backend - Micro-Batcher
+Coalesce concurrent inference requests into single model calls
+
+Under concurrent search load each request used to encode its own single query
+and score its own ~20 cross-encoder pairs, wasting the batching efficiency of
+both models. A MicroBatcher collects items submitted within a short window
+(max_wait_ms) or until max_batch_size items are pending, runs one batched call
+on the inference executor and fans the results back out to the awaiting
+coroutines.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from core.config import settings
+from services.inference_executor import InferenceExecutor, inference_executor
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Dynamic micro-batcher for a batched, synchronous inference function
+
+    batch_fn receives a flat list of items and must return one result per item,
+    in order. Each submit() call may carry several items (e.g. all query/chunk
+    pairs of one rerank request); they are always kept in the same batch.
+
+    Usage:
+        batcher = MicroBatcher("cross_encoder", lambda pairs: model.predict(pairs))
+        scores = await batcher.submit(pairs)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[List[Any]], Sequence[Any]],
+        max_batch_size: Optional[int] = None,
+        max_wait_ms: Optional[float] = None,
+        executor: Optional[InferenceExecutor] = None,
+        enabled: Optional[bool] = None
+    ):
+        """
+        Initialize micro-batcher
+
+        Args:
+            name: Name used in logs and metrics
+            batch_fn: Synchronous batched function (items -> results)
+            max_batch_size: Flush as soon as this many items are pending
+            max_wait_ms: Flush at the latest this long after the first pending item
+            executor: Executor that runs batch_fn (default: shared inference executor)
+            enabled: When False, every submit() runs batch_fn on its own
+        """
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size or settings.MICROBATCH_MAX_BATCH_SIZE
+        self.max_wait_ms = settings.MICROBATCH_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms
+        self.executor = executor or inference_executor
+        self.enabled = settings.MICROBATCH_ENABLED if enabled is None else enabled
+
+        self._pending: List[Tuple[List[Any], asyncio.Future]] = []
+        self._pending_items = 0
+        self._first_enqueued_at = 0.0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # The loop keeps only weak references to tasks: hold running batches
+        # so none is garbage-collected with its waiters unresolved
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.items = 0
+        self.requests = 0
+        self.max_observed_batch = 0
+        self.total_flush_delay_ms = 0.0
+
+    async def submit(self, items: List[Any]) -> List[Any]:
+        """
+        Submit items and wait for their results
+
+        Args:
+            items: Items for batch_fn (kept together in one batch)
+
+        Returns:
+            Results for the submitted items, in order
+        """
+        if not items:
+            return []
+
+        if not self.enabled or self.max_wait_ms <= 0:
+            results = await self.executor.run(self.batch_fn, list(items))
+            self._record_batch(len(items), 1, 0.0)
+            return list(results)
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Futures are bound to a loop; start fresh if the loop changed
+            self._loop = loop
+            self._pending = []
+            self._pending_items = 0
+            self._flush_handle = None
+            self._tasks = set()
+
+        # A request that would overflow the current batch starts a new one
+        if self._pending and self._pending_items + len(items) > self.max_batch_size:
+            self._flush()
+
+        future = loop.create_future()
+        if not self._pending:
+            self._first_enqueued_at = time.perf_counter()
+        self._pending.append((list(items), future))
+        self._pending_items += len(items)
+
+        if self._pending_items >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Detach the pending requests and run them as one batch"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
+
+        pending = self._pending
+        delay_ms = (time.perf_counter() - self._first_enqueued_at) * 1000
+        self._pending = []
+        self._pending_items = 0
+
+        task = asyncio.create_task(self._run_batch(pending, delay_ms))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, pending: List[Tuple[List[Any], asyncio.Future]], delay_ms: float) -> None:
+        flat_items = [item for items, _ in pending for item in items]
+        self._record_batch(len(flat_items), len(pending), delay_ms)
+
+        try:
+            results = list(await self.executor.run(self.batch_fn, flat_items))
+            if len(results) != len(flat_items):
+                raise RuntimeError(
+                    f"{self.name} batch returned {len(results)} results for {len(flat_items)} items"
+                )
+        except Exception as e:
+            logger.error(f"❌ Micro-batch '{self.name}' failed ({len(flat_items)} items): {e}")
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        offset = 0
+        for items, future in pending:
+            if not future.done():
+                future.set_result(results[offset:offset + len(items)])
+            offset += len(items)
+
+    def _record_batch(self, num_items: int, num_requests: int, delay_ms: float) -> None:
+        self.batches += 1
+        self.items += num_items
+        self.requests += num_requests
+        self.max_observed_batch = max(self.max_observed_batch, num_items)
+        self.total_flush_delay_ms += delay_ms
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get batching metrics
+
+        Returns:
+            Dictionary with configuration, batch counts, sizes and flush delay
+        """
+        return {
+            "name": self.name,
+            "enabled": self.enabled,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches": self.batches,
+            "requests": self.requests,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "avg_requests_per_batch": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size_observed": self.max_observed_batch,
+            "avg_flush_delay_ms": round(self.total_flush_delay_ms / self.batches, 2) if self.batches else 0.0,
+        }
@@ -0,0 +1,55 @@
+"""
+KnowledgeTree Backend - Retrieval Pipeline Metrics
+Per-stage latency of the search pipeline as Prometheus histograms
+
+Every stage (query embedding, pgvector SQL, BM25 scoring, RRF fusion,
+CRAG, cross-encoder, explanations, ...) is timed with stage_timer(). The
+duration is observed in the knowledgetree_search_stage_seconds histogram
+(served on /metrics) and, when the caller passes a timings dict, added to
+it as "<stage>_ms" so a single request can report its own breakdown.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from prometheus_client import Histogram
+
+SEARCH_STAGE_SECONDS = Histogram(
+    "knowledgetree_search_stage_seconds",
+    "Wall time of one retrieval pipeline stage",
+    ["stage"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+
+def record_stage(stage: str, seconds: float, timings: Optional[Dict[str, float]] = None) -> None:
+    """
+    Record one stage duration
+
+    Args:
+        stage: Stage name (histogram label, "<stage>_ms" key in timings)
+        seconds: Measured wall time
+        timings: Optional per-request dict; repeated stages (e.g. cascade
+            rerank passes) accumulate
+    """
+    SEARCH_STAGE_SECONDS.labels(stage=stage).observe(seconds)
+    if timings is not None:
+        key = f"{stage}_ms"
+        timings[key] = timings.get(key, 0.0) + seconds * 1000
+
+
+@contextmanager
+def stage_timer(stage: str, timings: Optional[Dict[str, float]] = None) -> Iterator[None]:
+    """
+    Time the enclosed block (sync or async code) as one pipeline stage
+
+    Usage:
+        with stage_timer("dense_sql", timings):
+            result = await db.execute(stmt)
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started, timings)
@@ -0,0 +1,214 @@
+"""
+KnowledgeTree Backend - Query Embedding Cache
+Process-wide LRU + TTL cache for query embeddings with an optional Redis tier
+
+Dashboard and chat queries repeat constantly, and every repeat used to run a
+full BGE-M3 forward pass. Queries are normalized (Unicode NFKC, collapsed
+whitespace; case is kept since the model is cased) and the normalized string
+is both the cache key and the text that gets embedded, so every replica
+produces identical vectors for it.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryEmbeddingCache:
+    """
+    Two-tier query embedding cache
+
+    Tier 1: in-process OrderedDict LRU bounded by max_size, entries expire after ttl
+    Tier 2: optional Redis (shared by all API replicas), float32 bytes with SETEX
+
+    Usage:
+        embedding = query_embedding_cache.get_or_compute(
+            query, lambda normalized: generator.generate_embedding(normalized)
+        )
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        redis_url: Optional[str] = None,
+        use_redis: Optional[bool] = None,
+        namespace: Optional[str] = None
+    ):
+        self.max_size = max_size or settings.QUERY_EMBEDDING_CACHE_SIZE
+        self.ttl_seconds = ttl_seconds or settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS
+        self.use_redis = settings.QUERY_EMBEDDING_CACHE_USE_REDIS if use_redis is None else use_redis
+        self.redis_url = redis_url or settings.REDIS_URL
+        self.namespace = namespace or settings.EMBEDDING_MODEL
+
+        self._entries: "OrderedDict[str, Tuple[List[float], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        self._redis_retry_at = 0.0
+
+        self.memory_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.redis_errors = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """
+        Normalize a query for cache keying and embedding
+
+        Case is preserved: BGE-M3 is cased ("JWT" and "jwt", Polish proper
+        nouns embed differently), so the cache must not change what the
+        model sees.
+
+        Args:
+            query: Raw query text
+
+        Returns:
+            NFKC-normalized query with collapsed whitespace
+        """
+        return " ".join(unicodedata.normalize("NFKC", query).split())
+
+    def _redis_key(self, normalized: str) -> str:
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        return f"query_embedding:{self.namespace}:{digest}"
+
+    def _get_redis(self):
+        """Return a Redis client, or None while Redis is disabled or backing off"""
+        if not self.use_redis or time.time() < self._redis_retry_at:
+            return None
+        if self._redis is None:
+            import redis
+            self._redis = redis.from_url(self.redis_url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        return self._redis
+
+    def _redis_failed(self, error: Exception) -> None:
+        """Back off from Redis for 30s after an error so searches never wait on it"""
+        self.redis_errors += 1
+        self._redis_retry_at = time.time() + 30
+        logger.warning(f"Query embedding cache: Redis unavailable, using memory tier only ({error})")
+
+    def get(self, normalized: str) -> Optional[List[float]]:
+        """
+        Look up an embedding by normalized query (memory first, then Redis)
+
+        Args:
+            normalized: Output of normalize()
+
+        Returns:
+            Cached embedding or None
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(normalized)
+            if entry is not None:
+                embedding, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(normalized)
+                    self.memory_hits += 1
+                    return embedding
+                del self._entries[normalized]
+
+        client = self._get_redis()
+        if client is not None:
+            try:
+                blob = client.get(self._redis_key(normalized))
+            except Exception as e:
+                self._redis_failed(e)
+                blob = None
+            if blob:
+                embedding = np.frombuffer(blob, dtype=np.float32).tolist()
+                self._store_local(normalized, embedding)
+                self.redis_hits += 1
+                return embedding
+
+        self.misses += 1
+        return None
+
+    def set(self, normalized: str, embedding: List[float]) -> None:
+        """
+        Store an embedding in both tiers
+
+        Args:
+            normalized: Output of normalize()
+            embedding: Query embedding
+        """
+        self._store_local(normalized, embedding)
+
+        client = self._get_redis()
+        if client is not None:
+            try:
+                client.setex(
+                    self._redis_key(normalized),
+                    self.ttl_seconds,
+                    np.asarray(embedding, dtype=np.float32).tobytes()
+                )
+            except Exception as e:
+                self._redis_failed(e)
+
+    def _store_local(self, normalized: str, embedding: List[float]) -> None:
+        with self._lock:
+            self._entries[normalized] = (embedding, time.time() + self.ttl_seconds)
+            self._entries.move_to_end(normalized)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, query: str, compute: Callable[[str], List[float]]) -> List[float]:
+        """
+        Return the cached embedding for query, computing and caching it on a miss
+
+        Args:
+            query: Raw query text
+            compute: Called with the normalized query on a cache miss
+
+        Returns:
+            Query embedding
+        """
+        normalized = self.normalize(query)
+        embedding = self.get(normalized)
+        if embedding is None:
+            embedding = compute(normalized)
+            self.set(normalized, embedding)
+        return embedding
+
+    def clear(self) -> None:
+        """Drop all in-process entries (Redis entries expire on their own)"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, object]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with per-tier hit counters, size and configuration
+        """
+        lookups = self.memory_hits + self.redis_hits + self.misses
+        hits = self.memory_hits + self.redis_hits
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "redis_enabled": self.use_redis,
+            "memory_hits": self.memory_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "redis_errors": self.redis_errors,
+        }
+
+
+# Global singleton instance shared by every SearchService in the process
+query_embedding_cache = QueryEmbeddingCache()
@@ -0,0 +1,230 @@
+"""
+KnowledgeTree Backend - Cross-Encoder Score Cache
+Process-wide LRU + TTL cache of cross-encoder scores per (query, chunk)
+
+Pagination, query refinements and popular queries rerank heavily
+overlapping candidate sets, and every repeat used to re-score all pairs
+with the cross-encoder. Scores are keyed by the normalized query, the
+chunk id and a content version (digest of the scored chunk text), so an
+edited or re-chunked text never hits a stale score. Chunks and documents
+can also be dropped explicitly (e.g. on delete) with invalidate_chunks()
+and invalidate_document().
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from core.config import settings
+from services.query_embedding_cache import QueryEmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+
+# (query digest, chunk id, content version)
+ScoreKey = Tuple[str, int, str]
+
+
+class RerankScoreCache:
+    """
+    In-process cross-encoder score cache
+
+    Entries are bounded by max_size (least recently used evicted first) and
+    expire after ttl. Reverse indexes by chunk and document id make
+    invalidation proportional to the entries of that chunk/document.
+
+    Usage:
+        cached = rerank_score_cache.get_many(query, results)   # {position: score}
+        ...score the misses...
+        rerank_score_cache.put_many(query, missed_results, scores)
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        enabled: Optional[bool] = None
+    ):
+        self.max_size = max_size or settings.RERANK_SCORE_CACHE_SIZE
+        self.ttl_seconds = ttl_seconds or settings.RERANK_SCORE_CACHE_TTL_SECONDS
+        self.enabled = settings.RERANK_SCORE_CACHE_ENABLED if enabled is None else enabled
+
+        self._entries: "OrderedDict[ScoreKey, Tuple[float, float, Optional[int]]]" = OrderedDict()
+        self._by_chunk: Dict[int, Set[ScoreKey]] = {}
+        self._by_document: Dict[int, Set[ScoreKey]] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalize a query the same way as the query embedding cache"""
+        return QueryEmbeddingCache.normalize(query)
+
+    @staticmethod
+    def content_version(text: str) -> str:
+        """Short digest of the chunk text that was scored"""
+        return hashlib.blake2b((text or "").encode("utf-8"), digest_size=8).hexdigest()
+
+    def _key(self, query_digest: str, result: dict) -> Optional[ScoreKey]:
+        chunk_id = result.get("chunk_id")
+        if chunk_id is None:
+            return None
+        return (query_digest, chunk_id, self.content_version(result.get("chunk_text", "")))
+
+    @staticmethod
+    def _query_digest(normalized: str) -> str:
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def get_many(self, normalized: str, results: List[dict]) -> Dict[int, float]:
+        """
+        Look up cached scores for a candidate list
+
+        Args:
+            normalized: Output of normalize()
+            results: Candidates with "chunk_id" and "chunk_text"
+
+        Returns:
+            {position in results: score} for the cache hits
+        """
+        if not self.enabled:
+            return {}
+
+        query_digest = self._query_digest(normalized)
+        now = time.time()
+        found: Dict[int, float] = {}
+
+        with self._lock:
+            for position, result in enumerate(results):
+                key = self._key(query_digest, result)
+                entry = self._entries.get(key) if key is not None else None
+                if entry is None:
+                    continue
+                score, expires_at, _ = entry
+                if expires_at <= now:
+                    self._remove(key)
+                    continue
+                self._entries.move_to_end(key)
+                found[position] = score
+
+            self.hits += len(found)
+            self.misses += len(results) - len(found)
+
+        return found
+
+    def put_many(self, normalized: str, results: List[dict], scores: List[float]) -> None:
+        """
+        Store scores for candidates (aligned lists)
+
+        Args:
+            normalized: Output of normalize()
+            results: Scored candidates
+            scores: Cross-encoder scores aligned with results
+        """
+        if not self.enabled:
+            return
+
+        query_digest = self._query_digest(normalized)
+        expires_at = time.time() + self.ttl_seconds
+
+        with self._lock:
+            for result, score in zip(results, scores):
+                key = self._key(query_digest, result)
+                if key is None:
+                    continue
+                document_id = result.get("document_id")
+                self._entries[key] = (float(score), expires_at, document_id)
+                self._entries.move_to_end(key)
+                self._by_chunk.setdefault(key[1], set()).add(key)
+                if document_id is not None:
+                    self._by_document.setdefault(document_id, set()).add(key)
+
+            while len(self._entries) > self.max_size:
+                key = next(iter(self._entries))
+                self._remove(key)
+                self.evictions += 1
+
+    def _remove(self, key: ScoreKey) -> None:
+        """Drop one entry and its reverse index references (caller holds the lock)"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._discard(self._by_chunk, key[1], key)
+        if entry[2] is not None:
+            self._discard(self._by_document, entry[2], key)
+
+    @staticmethod
+    def _discard(index: Dict[int, Set[ScoreKey]], owner: int, key: ScoreKey) -> None:
+        keys = index.get(owner)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[owner]
+
+    def invalidate_chunks(self, chunk_ids: Iterable[int]) -> int:
+        """
+        Drop every cached score of the given chunks (re-embedded or edited)
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        with self._lock:
+            for chunk_id in chunk_ids:
+                for key in list(self._by_chunk.get(chunk_id, ())):
+                    self._remove(key)
+                    removed += 1
+            self.invalidations += removed
+        return removed
+
+    def invalidate_document(self, document_id: int) -> int:
+        """
+        Drop every cached score of a document's chunks (deleted or reprocessed)
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        with self._lock:
+            for key in list(self._by_document.get(document_id, ())):
+                self._remove(key)
+                removed += 1
+            self.invalidations += removed
+        return removed
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+            self._by_chunk.clear()
+            self._by_document.clear()
+
+    def get_stats(self) -> Dict[str, object]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with size, hit/miss counters, hit rate, evictions and invalidations
+        """
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+# Global singleton instance shared by all rerank calls of this process
+rerank_score_cache = RerankScoreCache()
@@ -0,0 +1,256 @@
+"""
+KnowledgeTree Backend - Search Result Cache
+Full-pipeline result cache for /search/reranked with an optional Redis tier
+
+search_with_reranking re-ran query expansion, hybrid retrieval, CRAG,
+cross-encoder scoring and explanations for every identical request. Final
+results are cached under a key built from the project, the normalized
+query, every pipeline parameter and the project's index version. The
+version lives in project_index_versions and is bumped by a database
+trigger in the same transaction that inserts, deletes or re-embeds a
+project's chunks (see migration 3e9a4c2d7b61), so a new version can never
+be paired with old results: entries of older versions are simply never
+looked up again and expire.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from core.config import settings
+from services.query_embedding_cache import QueryEmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+# Part of every key; bump when the shape of cached entries changes so
+# replicas running different versions never read each other's entries
+KEY_PREFIX = "search_result:v2"
+
+# Memory tier miss marker (distinct from a cached value)
+_MISSING = object()
+
+
+class SearchResultCache:
+    """
+    Two-tier search result cache
+
+    Tier 1: in-process OrderedDict LRU bounded by max_size, entries expire after ttl
+    Tier 2: optional Redis (shared by all API replicas), JSON with SETEX
+
+    Usage:
+        key = search_result_cache.make_key(project_id, version, query, params)
+        entry = await search_result_cache.get_async(key)
+        if entry is None:
+            entry = {"results": ..., "pipeline": ...}   # run the pipeline
+            await search_result_cache.set_async(key, entry)
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+        redis_url: Optional[str] = None,
+        use_redis: Optional[bool] = None,
+        enabled: Optional[bool] = None
+    ):
+        self.max_size = max_size or settings.SEARCH_RESULT_CACHE_SIZE
+        self.ttl_seconds = ttl_seconds or settings.SEARCH_RESULT_CACHE_TTL_SECONDS
+        self.use_redis = settings.SEARCH_RESULT_CACHE_USE_REDIS if use_redis is None else use_redis
+        self.redis_url = redis_url or settings.REDIS_URL
+        self.enabled = settings.SEARCH_RESULT_CACHE_ENABLED if enabled is None else enabled
+
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        self._redis_retry_at = 0.0
+
+        self.memory_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.redis_errors = 0
+
+    @staticmethod
+    def make_key(project_id: int, index_version: int, query: str, params: Dict[str, Any]) -> str:
+        """
+        Build the cache key of a pipeline run
+
+        Args:
+            project_id: Project searched
+            index_version: Project index version read in the same request
+            query: Raw query text (normalized here)
+            params: Every other parameter that affects the results
+
+        Returns:
+            Key string (index version readable, the rest hashed)
+        """
+        payload = json.dumps(
+            {"query": QueryEmbeddingCache.normalize(query), **params},
+            sort_keys=True,
+            default=str
+        )
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        return f"{KEY_PREFIX}:{project_id}:{index_version}:{digest}"
+
+    def _get_redis(self):
+        """Return a Redis client, or None while Redis is disabled or backing off"""
+        if not self.use_redis or time.time() < self._redis_retry_at:
+            return None
+        if self._redis is None:
+            import redis
+            self._redis = redis.from_url(self.redis_url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        return self._redis
+
+    def _redis_failed(self, error: Exception) -> None:
+        """Back off from Redis for 30s after an error so searches never wait on it"""
+        self.redis_errors += 1
+        self._redis_retry_at = time.time() + 30
+        logger.warning(f"Search result cache: Redis unavailable, using memory tier only ({error})")
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up an entry (memory first, then Redis)
+
+        Blocks on Redis for a memory miss; async callers use get_async().
+
+        Args:
+            key: Output of make_key()
+
+        Returns:
+            A private copy of the cached entry, or None
+        """
+        if not self.enabled:
+            return None
+        value = self._get_local(key)
+        return self._get_remote(key) if value is _MISSING else value
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        """
+        get() for the event loop: the memory tier is read inline, a Redis
+        lookup runs on a worker thread so a slow Redis never stalls the loop
+        """
+        if not self.enabled:
+            return None
+        value = self._get_local(key)
+        if value is not _MISSING:
+            return value
+        if not self.use_redis:
+            self.misses += 1
+            return None
+        return await asyncio.to_thread(self._get_remote, key)
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store an entry in both tiers
+
+        Blocks on Redis; async callers use set_async().
+
+        Args:
+            key: Output of make_key()
+            value: Final pipeline output (JSON-serializable, datetimes become ISO strings)
+        """
+        if not self.enabled:
+            return
+        self._set_remote(key, self._set_local(key, value))
+
+    async def set_async(self, key: str, value: Any) -> None:
+        """set() for the event loop: the Redis write runs on a worker thread"""
+        if not self.enabled:
+            return
+        blob = self._set_local(key, value)
+        if self.use_redis:
+            await asyncio.to_thread(self._set_remote, key, blob)
+
+    def _get_local(self, key: str) -> Any:
+        """Copy of a live memory tier entry, or _MISSING"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return copy.deepcopy(value)
+                del self._entries[key]
+        return _MISSING
+
+    def _get_remote(self, key: str) -> Optional[Any]:
+        """Redis tier lookup after a memory miss (blocking)"""
+        client = self._get_redis()
+        if client is not None:
+            try:
+                blob = client.get(key)
+            except Exception as e:
+                self._redis_failed(e)
+                blob = None
+            if blob:
+                value = json.loads(blob)
+                self._store_local(key, value)
+                self.redis_hits += 1
+                return copy.deepcopy(value)
+
+        self.misses += 1
+        return None
+
+    def _set_local(self, key: str, value: Any) -> str:
+        """Store an entry in the memory tier and return its JSON blob"""
+        # Round-trip through JSON so both tiers hold the same plain data
+        blob = json.dumps(value, default=str)
+        self._store_local(key, json.loads(blob))
+        return blob
+
+    def _set_remote(self, key: str, blob: str) -> None:
+        """Write a JSON blob to the Redis tier (blocking)"""
+        client = self._get_redis()
+        if client is not None:
+            try:
+                client.setex(key, self.ttl_seconds, blob)
+            except Exception as e:
+                self._redis_failed(e)
+
+    def _store_local(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all in-process entries (Redis entries expire on their own)"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, object]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with per-tier hit counters, size and configuration
+        """
+        lookups = self.memory_hits + self.redis_hits + self.misses
+        hits = self.memory_hits + self.redis_hits
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "redis_enabled": self.use_redis,
+            "memory_hits": self.memory_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "redis_errors": self.redis_errors,
+        }
+
+
+# Global singleton instance shared by every SearchService in the process
+search_result_cache = SearchResultCache()
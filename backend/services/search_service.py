@@ -3,19 +3,33 @@ KnowledgeTree Backend - Search Service
 Vector similarity search using pgvector + BM25 sparse retrieval
 
 TIER 1 Advanced RAG: Added BM25 sparse search capability
+Sparse engines: in-memory BM25 ("bm25"), PostgreSQL full-text search ("postgres")
+or BGE-M3 lexical weights ("lexical")
 """
 
 import logging
 import time
 import json
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, text
+from sqlalchemy import (
+    select, func, and_, text, cast, literal, literal_column, bindparam, table, column, union_all,
+    Text, Integer
+)
+from sqlalchemy.dialects.postgresql import ARRAY, REAL, TSQUERY
 from sqlalchemy.orm import joinedload
+from pgvector.sqlalchemy import HALFVEC
+
+from core.config import settings
 
 from models.chunk import Chunk
 from models.document import Document
-from services.embedding_generator import EmbeddingGenerator
+from services.embedding_generator import embedding_generator
+from services.query_embedding_cache import query_embedding_cache
+from services.search_result_cache import search_result_cache
+from services.pipeline_metrics import record_stage, stage_timer
+from services.inference_executor import inference_executor
+from services.micro_batcher import MicroBatcher
 from services.bm25_service import bm25_service
 from services.cross_encoder_service import cross_encoder_service
 from services.reranking_optimizer import reranking_optimizer
@@ -25,14 +39,56 @@ from services.crag_service import crag_service
 
 logger = logging.getLogger(__name__)
 
+# Text search configuration of chunks.text_search (see migration 1c8d5e7f2a94)
+FTS_CONFIG = "simple"
+
+SPARSE_ENGINES = ("bm25", "postgres", "lexical")
+
+# Postings of BGE-M3 lexical weights, filled by trigger from chunks.lexical_weights
+# (see migration 2d7f3a9b8e15)
+chunk_sparse_terms = table(
+    "chunk_sparse_terms",
+    column("chunk_id", Integer),
+    column("project_id", Integer),
+    column("term_id", Integer),
+    column("weight", REAL),
+)
+
+# Bumped by triggers whenever a project's chunks change (see migration 3e9a4c2d7b61)
+project_index_versions = table(
+    "project_index_versions",
+    column("project_id", Integer),
+    column("version", Integer),
+    column("updated_at"),
+)
+
+
+# Concurrent query encodes are coalesced into one BGE-M3 encode() call
+query_embedding_batcher = MicroBatcher(
+    name="query_embedding",
+    batch_fn=lambda texts: embedding_generator.generate_embeddings_batch(
+        texts, batch_size=len(texts), use_cache=False
+    )
+)
+
+# Same for query lexical weights (sparse-only encode, "lexical" engine)
+query_lexical_batcher = MicroBatcher(
+    name="query_lexical",
+    batch_fn=embedding_generator.generate_lexical_weights
+)
+
 
 class SearchService:
     """Hybrid search service with dense (vector) and sparse (BM25) retrieval"""
 
     def __init__(self):
-        self.embedding_generator = EmbeddingGenerator()
+        self.embedding_generator = embedding_generator
+        self.query_embedding_cache = query_embedding_cache
+        self.query_embedding_batcher = query_embedding_batcher
+        self.query_lexical_batcher = query_lexical_batcher
         self.bm25_service = bm25_service
         self.cross_encoder_service = cross_encoder_service
+        self.search_result_cache = search_result_cache
         self._hybrid_service = None  # Lazy initialization to avoid circular import
 
     def _get_hybrid_service(self):
@@ -42,6 +98,62 @@ class SearchService:
             self._hybrid_service = HybridSearchService(self)
         return self._hybrid_service
 
+    async def embed_query(self, query: str) -> List[float]:
+        """
+        Get the embedding for a search query, served from the query cache when possible
+
+        Cache misses are encoded through the query micro-batcher, which
+        coalesces concurrent queries into one model call on the inference
+        executor, so the event loop never blocks on the model. Redis lookups
+        also run on the executor. The normalized query is what gets embedded,
+        so cached and freshly computed vectors are identical. Query vectors
+        bypass the persistent chunk embedding cache.
+
+        Args:
+            query: Search query text
+
+        Returns:
+            Query embedding vector
+        """
+        return (await self.embed_queries([query]))[0]
+
+    async def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        Get embeddings for several queries (see embed_query)
+
+        All cache misses are submitted to the micro-batcher together, so
+        they are encoded in a single model call.
+
+        Args:
+            queries: Search query texts
+
+        Returns:
+            Query embedding vectors, aligned with queries
+        """
+        cache = self.query_embedding_cache
+        normalized = [cache.normalize(query) for query in queries]
+
+        if cache.use_redis:
+            embeddings = await inference_executor.run(lambda: [cache.get(n) for n in normalized])
+        else:
+            embeddings = [cache.get(n) for n in normalized]
+
+        misses = list(dict.fromkeys(n for n, e in zip(normalized, embeddings) if e is None))
+        if not misses:
+            return embeddings
+
+        encoded = dict(zip(misses, await self.query_embedding_batcher.submit(misses)))
+        if any(embedding is None for embedding in encoded.values()):
+            raise ValueError("Cannot generate embedding for empty query")
+
+        if cache.use_redis:
+            await inference_executor.run(lambda: [cache.set(n, e) for n, e in encoded.items()])
+        else:
+            for n, e in encoded.items():
+                cache.set(n, e)
+
+        return [e if e is not None else encoded[n] for n, e in zip(normalized, embeddings)]
+
     async def search(
         self,
         db: AsyncSession,
@@ -49,11 +161,18 @@ class SearchService:
         project_id: int,
         limit: int = 10,
         min_similarity: float = 0.5,
-        category_id: Optional[int] = None
+        category_id: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        vector_mode: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None
     ) -> tuple[List[dict], float]:
         """
         Perform semantic search using vector similarity
 
+        The query has the k-NN shape `ORDER BY embedding <=> :q LIMIT k` so the
+        HNSW index of the configured storage mode serves it; min_similarity is
+        applied to the k nearest rows afterwards instead of in the WHERE clause.
+
         Args:
             db: Database session
             query: Search query text
@@ -61,6 +180,9 @@ class SearchService:
             limit: Maximum number of results
             min_similarity: Minimum similarity threshold (0-1)
             category_id: Optional category filter
+            ef_search: HNSW candidate list size (default: settings.HNSW_EF_SEARCH)
+            vector_mode: float32, halfvec or binary (default: settings.VECTOR_SEARCH_MODE)
+            timings: Optional dict, filled with "query_embedding_ms" and "dense_sql_ms"
 
         Returns:
             Tuple of (results list, execution time in ms)
@@ -69,78 +191,276 @@ class SearchService:
 
         # Step 1: Generate embedding for query
         logger.info(f"Generating embedding for query: {query[:50]}...")
-        query_embedding = self.embedding_generator.generate_embedding(query)
+        with stage_timer("query_embedding", timings):
+            query_embedding = await self.embed_query(query)
 
-        # Step 2: Build vector similarity query
-        # Using cosine similarity: 1 - (embedding <=> query_embedding)
-        # pgvector <=> operator returns cosine distance, so we convert to similarity
-        similarity_expr = text("1 - (embedding <=> :query_embedding)")
+        # Step 2: Build k-NN query over the project's chunks
+        mode = vector_mode or settings.VECTOR_SEARCH_MODE
+        nearest, index_candidates = self._build_nearest_query(
+            query_embedding, project_id, limit, category_id, mode
+        )
 
-        # Build base query
+        # Document metadata is joined for the k nearest rows only; the outer
+        # ORDER BY restores exact order after a relaxed iterative index scan
+        nearest = nearest.subquery("nearest")
         stmt = (
             select(
-                Chunk.id.label("chunk_id"),
-                Chunk.text.label("chunk_text"),
-                Chunk.chunk_index,
-                Chunk.chunk_metadata,
-                Chunk.document_id,
+                nearest,
                 Document.title.label("document_title"),
                 Document.filename.label("document_filename"),
-                Document.created_at.label("document_created_at"),
-                similarity_expr.label("similarity_score")
+                Document.created_at.label("document_created_at")
             )
-            .join(Document, Chunk.document_id == Document.id)
-            .where(
-                and_(
-                    Document.project_id == project_id,
-                    Chunk.has_embedding == 1,
-                    similarity_expr >= min_similarity
-                )
-            )
-            .order_by(text("similarity_score DESC"))
-            .limit(limit)
+            .join(Document, nearest.c.document_id == Document.id)
+            .order_by(nearest.c.distance)
         )
 
-        # Add category filter if specified
-        if category_id is not None:
-            stmt = stmt.where(Document.category_id == category_id)
-
         # Step 3: Execute query
-        logger.info(f"Executing vector search with limit={limit}, min_similarity={min_similarity}")
-        result = await db.execute(
-            stmt,
-            {"query_embedding": query_embedding}
+        logger.info(
+            f"Executing vector search ({mode}) with limit={limit}, min_similarity={min_similarity}"
         )
-        rows = result.fetchall()
+        with stage_timer("dense_sql", timings):
+            await self._configure_vector_search(db, ef_search, index_candidates)
+            result = await db.execute(stmt)
+
+        # Rows arrive nearest first, so the threshold cuts off a suffix
+        rows = []
+        for row in result.fetchall():
+            if 1 - row.distance < min_similarity:
+                break
+            rows.append(row)
 
         # Step 4: Format results
-        results = []
-        for row in rows:
-            # Parse chunk metadata
-            chunk_metadata = None
-            if row.chunk_metadata:
-                try:
-                    chunk_metadata = json.loads(row.chunk_metadata)
-                except json.JSONDecodeError:
-                    logger.warning(f"Failed to parse chunk metadata for chunk {row.chunk_id}")
-
-            results.append({
-                "chunk_id": row.chunk_id,
-                "document_id": row.document_id,
-                "document_title": row.document_title,
-                "document_filename": row.document_filename,
-                "chunk_text": row.chunk_text,
-                "chunk_index": row.chunk_index,
-                "similarity_score": float(row.similarity_score),
-                "chunk_metadata": chunk_metadata,
-                "document_created_at": row.document_created_at,
-            })
+        results = [self._format_dense_row(row) for row in rows]
 
         execution_time = (time.time() - start_time) * 1000  # Convert to ms
         logger.info(f"Search completed: {len(results)} results in {execution_time:.2f}ms")
 
         return results, execution_time
 
+    async def search_multi(
+        self,
+        db: AsyncSession,
+        queries: List[str],
+        project_id: int,
+        limit: int = 10,
+        min_similarity: float = 0.5,
+        category_id: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        vector_mode: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> tuple[List[List[dict]], float]:
+        """
+        Semantic search for several queries in one model call and one SQL round trip
+
+        All query embeddings come from one batched encode (cache misses only).
+        The k-NN subqueries of search() are combined with UNION ALL, each
+        branch keeping its own `ORDER BY distance LIMIT k` so the HNSW index
+        serves every query, and document metadata is joined once.
+
+        Args:
+            db: Database session
+            queries: Search query texts
+            project_id: Project to search within
+            limit: Maximum number of results per query
+            min_similarity: Minimum similarity threshold (0-1)
+            category_id: Optional category filter
+            ef_search: HNSW candidate list size (default: settings.HNSW_EF_SEARCH)
+            vector_mode: float32, halfvec or binary (default: settings.VECTOR_SEARCH_MODE)
+            timings: Optional dict, filled with "query_embedding_ms" and "dense_sql_ms"
+
+        Returns:
+            Tuple of (one results list per query, execution time in ms)
+        """
+        start_time = time.time()
+        if not queries:
+            return [], 0.0
+
+        with stage_timer("query_embedding", timings):
+            query_embeddings = await self.embed_queries(queries)
+
+        mode = vector_mode or settings.VECTOR_SEARCH_MODE
+        branches = []
+        index_candidates = limit
+        for query_index, query_embedding in enumerate(query_embeddings):
+            nearest, index_candidates = self._build_nearest_query(
+                query_embedding, project_id, limit, category_id, mode,
+                cte_name=f"binary_candidates_{query_index}"
+            )
+            branches.append(nearest.add_columns(literal(query_index, Integer).label("query_index")))
+
+        nearest = union_all(*branches).subquery("nearest")
+        stmt = (
+            select(
+                nearest,
+                Document.title.label("document_title"),
+                Document.filename.label("document_filename"),
+                Document.created_at.label("document_created_at")
+            )
+            .join(Document, nearest.c.document_id == Document.id)
+            .order_by(nearest.c.query_index, nearest.c.distance)
+        )
+
+        logger.info(
+            f"Executing multi-query vector search ({mode}): {len(queries)} queries, "
+            f"limit={limit}, min_similarity={min_similarity}"
+        )
+        with stage_timer("dense_sql", timings):
+            await self._configure_vector_search(db, ef_search, index_candidates)
+            result = await db.execute(stmt)
+
+        # Rows arrive grouped by query, nearest first
+        results: List[List[dict]] = [[] for _ in queries]
+        for row in result.fetchall():
+            if 1 - row.distance >= min_similarity:
+                results[row.query_index].append(self._format_dense_row(row))
+
+        execution_time = (time.time() - start_time) * 1000  # Convert to ms
+        logger.info(
+            f"Multi-query search completed: {sum(len(r) for r in results)} results "
+            f"for {len(queries)} queries in {execution_time:.2f}ms"
+        )
+
+        return results, execution_time
+
+    @staticmethod
+    def _format_dense_row(row) -> dict:
+        """Result dict of one k-NN row (chunk columns, distance, document metadata)"""
+        chunk_metadata = None
+        if row.chunk_metadata:
+            try:
+                chunk_metadata = json.loads(row.chunk_metadata)
+            except json.JSONDecodeError:
+                logger.warning(f"Failed to parse chunk metadata for chunk {row.chunk_id}")
+
+        return {
+            "chunk_id": row.chunk_id,
+            "document_id": row.document_id,
+            "document_title": row.document_title,
+            "document_filename": row.document_filename,
+            "chunk_text": row.chunk_text,
+            "chunk_index": row.chunk_index,
+            "similarity_score": float(1 - row.distance),
+            "chunk_metadata": chunk_metadata,
+            "document_created_at": row.document_created_at,
+        }
+
+    def _build_nearest_query(
+        self,
+        query_embedding: List[float],
+        project_id: int,
+        limit: int,
+        category_id: Optional[int],
+        mode: str,
+        cte_name: str = "binary_candidates"
+    ):
+        """
+        Build the k-NN subquery for the configured vector storage mode
+
+        - float32: HNSW over chunks.embedding vector(1024)
+        - halfvec: HNSW over chunks.embedding halfvec(1024) (half the size)
+        - binary: HNSW Hamming scan over chunks.embedding_bin for
+          limit * BINARY_RESCORE_FACTOR candidates, rescored with cosine
+          distance on chunks.embedding halfvec(1024) (not indexed)
+
+        The mode must match the storage built by migration 0b6e2f9a1c57 /
+        convert_vector_storage.py. chunks.project_id is denormalized, so the
+        filter needs no join and the planner can pick the (project_id)
+        partial index for small projects.
+
+        Returns:
+            Tuple of (subquery with chunk columns + distance, rows the index scan must return)
+        """
+        filters = [Chunk.project_id == project_id, Chunk.has_embedding == 1]
+
+        # Category filter is a semi-join on the category's documents
+        if category_id is not None:
+            filters.append(
+                Chunk.document_id.in_(
+                    select(Document.id).where(
+                        and_(
+                            Document.project_id == project_id,
+                            Document.category_id == category_id
+                        )
+                    )
+                )
+            )
+
+        # pgvector <=> operator returns cosine distance (similarity = 1 - distance)
+        if mode == "float32":
+            distance_expr = Chunk.embedding.cosine_distance(query_embedding)
+        elif mode in ("halfvec", "binary"):
+            distance_expr = Chunk.embedding.cosine_distance(
+                cast(query_embedding, HALFVEC(len(query_embedding)))
+            )
+        else:
+            raise ValueError(f"Unknown vector search mode: {mode}")
+
+        chunk_columns = (
+            Chunk.id.label("chunk_id"),
+            Chunk.text.label("chunk_text"),
+            Chunk.chunk_index,
+            Chunk.chunk_metadata,
+            Chunk.document_id,
+        )
+
+        if mode != "binary":
+            nearest = (
+                select(*chunk_columns, distance_expr.label("distance"))
+                .where(and_(*filters))
+                .order_by(distance_expr)
+                .limit(limit)
+            )
+            return nearest, limit
+
+        # Same quantization as pgvector's binary_quantize(): bit = x > 0.
+        # Distances are computed inside the MATERIALIZED CTE, so the rescoring
+        # ORDER BY runs over the Hamming candidates only and can't be turned
+        # into a second index scan.
+        query_bits = "".join("1" if x > 0 else "0" for x in query_embedding)
+        index_candidates = limit * settings.BINARY_RESCORE_FACTOR
+        candidates = (
+            select(Chunk.id, distance_expr.label("distance"))
+            .where(and_(*filters))
+            .order_by(Chunk.embedding_bin.hamming_distance(query_bits))
+            .limit(index_candidates)
+            .cte(cte_name)
+            .prefix_with("MATERIALIZED")
+        )
+        nearest = (
+            select(*chunk_columns, candidates.c.distance)
+            .join(candidates, candidates.c.id == Chunk.id)
+            .order_by(candidates.c.distance)
+            .limit(limit)
+        )
+
+        return nearest, index_candidates
+
+    async def _configure_vector_search(
+        self,
+        db: AsyncSession,
+        ef_search: Optional[int],
+        limit: int
+    ) -> None:
+        """
+        Set HNSW query parameters for the current transaction
+
+        HNSW returns at most ef_search rows, so the value is raised to at least
+        limit. With iterative scans the index keeps walking the graph until
+        enough rows pass the project filter, which keeps recall up for small
+        projects in a large shared table. set_config(..., true) is
+        transaction-local like SET LOCAL.
+        """
+        ef = max(ef_search or settings.HNSW_EF_SEARCH, limit)
+        await db.execute(
+            text("SELECT set_config('hnsw.ef_search', :ef, true)"),
+            {"ef": str(ef)}
+        )
+        if settings.HNSW_ITERATIVE_SCAN and settings.HNSW_ITERATIVE_SCAN != "off":
+            await db.execute(
+                text("SELECT set_config('hnsw.iterative_scan', :mode, true)"),
+                {"mode": settings.HNSW_ITERATIVE_SCAN}
+            )
+
     async def get_statistics(
         self,
         db: AsyncSession,
@@ -163,37 +483,27 @@ class SearchService:
         )
         total_documents = doc_count_result.scalar()
 
-        # Count total chunks
-        chunk_count_result = await db.execute(
-            select(func.count(Chunk.id))
-            .join(Document, Chunk.document_id == Document.id)
-            .where(Document.project_id == project_id)
-        )
-        total_chunks = chunk_count_result.scalar()
-
-        # Count embedded chunks
-        embedded_count_result = await db.execute(
-            select(func.count(Chunk.id))
-            .join(Document, Chunk.document_id == Document.id)
-            .where(
-                and_(
-                    Document.project_id == project_id,
-                    Chunk.has_embedding == 1
-                )
+        # Chunk counts come from chunks.project_id alone (no join to documents)
+        chunk_stats_result = await db.execute(
+            select(
+                func.count(Chunk.id),
+                func.count(Chunk.id).filter(Chunk.has_embedding == 1),
+                func.avg(func.length(Chunk.text))
             )
+            .where(Chunk.project_id == project_id)
         )
-        embedded_chunks = embedded_count_result.scalar()
-
-        # Calculate average chunk length
-        avg_length_result = await db.execute(
-            select(func.avg(func.length(Chunk.text)))
-            .join(Document, Chunk.document_id == Document.id)
-            .where(Document.project_id == project_id)
-        )
-        avg_length = avg_length_result.scalar() or 0.0
-
-        # Estimate storage size (1024 dimensions * 4 bytes per float32)
-        vector_size_bytes = embedded_chunks * 1024 * 4
+        total_chunks, embedded_chunks, avg_length = chunk_stats_result.one()
+        avg_length = avg_length or 0.0
+
+        # Estimate storage size per embedded chunk for the configured mode:
+        # float32 (1024 * 4 bytes), halfvec (1024 * 2 bytes), binary
+        # (halfvec for rescoring + 1024 quantized bits)
+        bytes_per_chunk = {
+            "float32": 1024 * 4,
+            "halfvec": 1024 * 2,
+            "binary": 1024 * 2 + 1024 // 8,
+        }.get(settings.VECTOR_SEARCH_MODE, 1024 * 4)
+        vector_size_bytes = (embedded_chunks or 0) * bytes_per_chunk
         total_storage_mb = vector_size_bytes / (1024 * 1024)
 
         return {
@@ -210,7 +520,9 @@ class SearchService:
         query: str,
         project_id: int,
         limit: int = 20,
-        min_score: float = 0.0
+        min_score: float = 0.0,
+        engine: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None
     ) -> tuple[List[dict], float]:
         """
         Perform sparse retrieval using BM25 keyword matching.
@@ -223,58 +535,58 @@ class SearchService:
             query: Search query text
             project_id: Project to search within
             limit: Maximum number of results
-            min_score: Minimum BM25 score threshold
+            min_score: Minimum score threshold (engine-specific scale)
+            engine: "bm25" (in-memory index), "postgres" (tsvector + GIN,
+                ranked with ts_rank_cd) or "lexical" (BGE-M3 lexical weights
+                stored at ingestion); default: settings.SPARSE_ENGINE
+            timings: Optional dict, filled with the engine's stage times in ms
+                (bm25: "bm25_sync_ms", "bm25_scoring_ms", "sparse_hydrate_ms";
+                postgres: "postgres_fts_ms"; lexical: "lexical_query_encoding_ms",
+                "lexical_sql_ms")
 
         Returns:
             Tuple of (results list, execution time in ms)
         """
         start_time = time.time()
 
+        engine = engine or settings.SPARSE_ENGINE
+        if engine not in SPARSE_ENGINES:
+            raise ValueError(f"Unknown sparse engine '{engine}', expected one of {SPARSE_ENGINES}")
+
+        if engine in ("postgres", "lexical"):
+            if engine == "postgres":
+                with stage_timer("postgres_fts", timings):
+                    filtered_results = await self._search_sparse_postgres(db, query, project_id, limit, min_score)
+            else:
+                filtered_results = await self._search_sparse_lexical(
+                    db, query, project_id, limit, min_score, timings=timings
+                )
+            execution_time = (time.time() - start_time) * 1000
+            logger.info(
+                f"Sparse search ({engine}) completed: {len(filtered_results)} results in "
+                f"{execution_time:.2f}ms (query: '{query[:50]}...')"
+            )
+            return filtered_results, execution_time
+
         if not self.bm25_service.is_initialized:
             logger.warning("⚠️ BM25 service not initialized - returning empty results")
             return [], 0.0
 
-        # Perform BM25 search (over-fetch to compensate for project filtering)
-        bm25_results = await self.bm25_service.search(
-            query=query,
-            top_k=limit * 3,
-            min_score=min_score
-        )
+        # Sync newly ingested chunks (throttled) and load the project's shard
+        with stage_timer("bm25_sync", timings):
+            await self.bm25_service.prepare(db, project_id)
 
-        # Get document IDs and metadata for this project (single query)
-        doc_info_result = await db.execute(
-            select(Document.id, Document.title, Document.filename, Document.created_at)
-            .where(Document.project_id == project_id)
-        )
-        doc_info_map = {
-            row[0]: {"title": row[1], "filename": row[2], "created_at": row[3]}
-            for row in doc_info_result.fetchall()
-        }
-        project_doc_ids = set(doc_info_map.keys())
-
-        # Filter results to only include chunks from this project
-        filtered_results = []
-        for result in bm25_results:
-            if result["document_id"] not in project_doc_ids:
-                continue
-
-            doc_info = doc_info_map[result["document_id"]]
-
-            filtered_results.append({
-                "chunk_id": result["id"],
-                "document_id": result["document_id"],
-                "document_title": doc_info["title"] or result.get("title"),
-                "document_filename": doc_info["filename"] or "",
-                "chunk_text": result["content"],
-                "chunk_index": result.get("chunk_index", 0),
-                "similarity_score": result["score"],
-                "chunk_metadata": result.get("chunk_metadata"),
-                "document_created_at": doc_info["created_at"],
-                "source": "sparse"
-            })
+        # Perform BM25 search on this project's shard only
+        with stage_timer("bm25_scoring", timings):
+            bm25_results = await self.bm25_service.search(
+                query=query,
+                top_k=limit,
+                min_score=min_score,
+                project_id=project_id
+            )
 
-            if len(filtered_results) >= limit:
-                break
+        # Chunk text and document metadata for the returned chunks only (single query)
+        filtered_results = (await self._hydrate_bm25_results(db, [bm25_results], timings))[0]
 
         execution_time = (time.time() - start_time) * 1000  # Convert to ms
         logger.info(
@@ -284,6 +596,250 @@ class SearchService:
 
         return filtered_results, execution_time
 
+    async def search_sparse_multi(
+        self,
+        db: AsyncSession,
+        queries: List[str],
+        project_id: int,
+        limit: int = 20,
+        min_score: float = 0.0,
+        engine: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> tuple[List[List[dict]], float]:
+        """
+        Sparse retrieval for several queries (batch search)
+
+        With the bm25 engine the shard is prepared once, all queries are
+        scored in one vectorized pass (BM25Service.search_many) and the hits
+        of every query are hydrated with one SQL statement. The postgres and
+        lexical engines run search_sparse() per query on the same session.
+
+        Args:
+            db: Database session
+            queries: Search query texts
+            project_id: Project to search within
+            limit: Maximum number of results per query
+            min_score: Minimum score threshold (engine-specific scale)
+            engine: "bm25", "postgres" or "lexical" (default: settings.SPARSE_ENGINE)
+            timings: Optional dict, filled with the engine's stage times in ms
+
+        Returns:
+            Tuple of (one results list per query, execution time in ms)
+        """
+        start_time = time.time()
+
+        engine = engine or settings.SPARSE_ENGINE
+        if engine != "bm25":
+            result_lists = []
+            for query in queries:
+                results, _ = await self.search_sparse(
+                    db, query, project_id, limit=limit, min_score=min_score, engine=engine, timings=timings
+                )
+                result_lists.append(results)
+            return result_lists, (time.time() - start_time) * 1000
+
+        if not self.bm25_service.is_initialized:
+            logger.warning("⚠️ BM25 service not initialized - returning empty results")
+            return [[] for _ in queries], 0.0
+
+        with stage_timer("bm25_sync", timings):
+            await self.bm25_service.prepare(db, project_id)
+
+        with stage_timer("bm25_scoring", timings):
+            bm25_result_lists = await self.bm25_service.search_many(
+                queries=queries,
+                top_k=limit,
+                min_score=min_score,
+                project_id=project_id
+            )
+
+        result_lists = await self._hydrate_bm25_results(db, bm25_result_lists, timings)
+
+        execution_time = (time.time() - start_time) * 1000
+        logger.info(
+            f"Sparse batch search completed: {len(queries)} queries, "
+            f"{sum(len(results) for results in result_lists)} results in {execution_time:.2f}ms"
+        )
+        return result_lists, execution_time
+
+    async def _hydrate_bm25_results(
+        self,
+        db: AsyncSession,
+        bm25_result_lists: List[List[dict]],
+        timings: Optional[Dict[str, float]] = None
+    ) -> List[List[dict]]:
+        """
+        Attach chunk text and document metadata to BM25 hits
+
+        The distinct chunks of all lists are fetched with one SQL statement;
+        hits whose chunk or document was deleted since indexing are dropped.
+        """
+        chunk_ids = list({result["id"] for results in bm25_result_lists for result in results})
+        chunk_info_map = {}
+        if chunk_ids:
+            with stage_timer("sparse_hydrate", timings):
+                chunk_info_result = await db.execute(
+                    select(
+                        Chunk.id, Chunk.text, Chunk.chunk_metadata,
+                        Document.title, Document.filename, Document.created_at
+                    )
+                    .join(Document, Document.id == Chunk.document_id)
+                    .where(Chunk.id.in_(chunk_ids))
+                )
+            chunk_info_map = {row.id: row for row in chunk_info_result.fetchall()}
+
+        result_lists = []
+        for bm25_results in bm25_result_lists:
+            filtered_results = []
+            for result in bm25_results:
+                chunk_info = chunk_info_map.get(result["id"])
+                if chunk_info is None:
+                    # Chunk or document deleted since the index was built
+                    continue
+
+                filtered_results.append({
+                    "chunk_id": result["id"],
+                    "document_id": result["document_id"],
+                    "document_title": chunk_info.title or result.get("title"),
+                    "document_filename": chunk_info.filename or "",
+                    "chunk_text": chunk_info.text,
+                    "chunk_index": result.get("chunk_index", 0),
+                    "similarity_score": result["score"],
+                    "chunk_metadata": chunk_info.chunk_metadata,
+                    "document_created_at": chunk_info.created_at,
+                    "source": "sparse"
+                })
+            result_lists.append(filtered_results)
+        return result_lists
+
+    async def _search_sparse_postgres(
+        self,
+        db: AsyncSession,
+        query: str,
+        project_id: int,
+        limit: int,
+        min_score: float
+    ) -> List[dict]:
+        """
+        Keyword search on the generated chunks.text_search column.
+
+        Query terms are OR-ed (like BM25) by rewriting plainto_tsquery's '&'
+        operators; matching uses the GIN index, ranking uses ts_rank_cd
+        normalized by log document length. Scores are on ts_rank_cd's scale,
+        not BM25's.
+        """
+        regconfig = literal_column(f"'{FTS_CONFIG}'::regconfig")
+        ts_query = cast(
+            func.replace(cast(func.plainto_tsquery(regconfig, query), Text), "&", "|"),
+            TSQUERY
+        )
+        rank = func.ts_rank_cd(Chunk.text_search, ts_query, 1)
+        score = rank.label("score")
+
+        stmt = (
+            select(
+                Chunk.id, Chunk.document_id, Chunk.text, Chunk.chunk_index, Chunk.chunk_metadata,
+                Document.title, Document.filename, Document.created_at,
+                score
+            )
+            .join(Document, Document.id == Chunk.document_id)
+            .where(
+                Chunk.project_id == project_id,
+                Chunk.has_embedding == 1,
+                Chunk.text_search.op("@@")(ts_query)
+            )
+            .order_by(score.desc())
+            .limit(limit)
+        )
+        if min_score > 0:
+            stmt = stmt.where(rank >= min_score)
+
+        result = await db.execute(stmt)
+        return [
+            {
+                "chunk_id": row.id,
+                "document_id": row.document_id,
+                "document_title": row.title,
+                "document_filename": row.filename or "",
+                "chunk_text": row.text,
+                "chunk_index": row.chunk_index,
+                "similarity_score": float(row.score),
+                "chunk_metadata": row.chunk_metadata,
+                "document_created_at": row.created_at,
+                "source": "sparse"
+            }
+            for row in result.fetchall()
+        ]
+
+    async def _search_sparse_lexical(
+        self,
+        db: AsyncSession,
+        query: str,
+        project_id: int,
+        limit: int,
+        min_score: float,
+        timings: Optional[Dict[str, float]] = None
+    ) -> List[dict]:
+        """
+        Learned sparse search over BGE-M3 lexical weights (chunk_sparse_terms).
+
+        The query is encoded to {token_id: weight} through the lexical
+        micro-batcher; a chunk's score is the dot product of its stored
+        weights with the query's, as in BGE-M3's own sparse scoring. Token
+        ids come from the model's subword vocabulary, so inflected Polish
+        forms share pieces with their lemma instead of missing entirely.
+        Postings are read from the (project_id, term_id) covering index.
+        """
+        with stage_timer("lexical_query_encoding", timings):
+            query_weights = (await self.query_lexical_batcher.submit([query]))[0]
+        if not query_weights:
+            return []
+
+        query_terms = func.unnest(
+            bindparam("query_term_ids", list(query_weights.keys()), type_=ARRAY(Integer)),
+            bindparam("query_term_weights", list(query_weights.values()), type_=ARRAY(REAL))
+        ).table_valued("term_id", "weight").alias("query_terms")
+
+        score = func.sum(chunk_sparse_terms.c.weight * query_terms.c.weight)
+        matches = (
+            select(chunk_sparse_terms.c.chunk_id, score.label("score"))
+            .join(query_terms, query_terms.c.term_id == chunk_sparse_terms.c.term_id)
+            .where(chunk_sparse_terms.c.project_id == project_id)
+            .group_by(chunk_sparse_terms.c.chunk_id)
+            .order_by(score.desc())
+            .limit(limit)
+        )
+        if min_score > 0:
+            matches = matches.having(score >= min_score)
+        matches = matches.subquery("matches")
+
+        with stage_timer("lexical_sql", timings):
+            result = await db.execute(
+                select(
+                    Chunk.id, Chunk.document_id, Chunk.text, Chunk.chunk_index, Chunk.chunk_metadata,
+                    Document.title, Document.filename, Document.created_at,
+                    matches.c.score
+                )
+                .join(matches, matches.c.chunk_id == Chunk.id)
+                .join(Document, Document.id == Chunk.document_id)
+                .order_by(matches.c.score.desc())
+            )
+        return [
+            {
+                "chunk_id": row.id,
+                "document_id": row.document_id,
+                "document_title": row.title,
+                "document_filename": row.filename or "",
+                "chunk_text": row.text,
+                "chunk_index": row.chunk_index,
+                "similarity_score": float(row.score),
+                "chunk_metadata": row.chunk_metadata,
+                "document_created_at": row.created_at,
+                "source": "sparse"
+            }
+            for row in result.fetchall()
+        ]
+
     async def hybrid_search(
         self,
         db: AsyncSession,
@@ -295,7 +851,11 @@ class SearchService:
         min_bm25_score: float = 0.0,
         dense_weight: Optional[float] = None,
         sparse_weight: Optional[float] = None,
-        category_id: Optional[int] = None
+        category_id: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        sparse_engine: Optional[str] = None,
+        timings: Optional[dict] = None,
+        dense_queries: Optional[List[str]] = None
     ) -> tuple[List[dict], float]:
         """
         Perform hybrid search with dense + sparse retrieval and RRF fusion.
@@ -313,6 +873,12 @@ class SearchService:
             dense_weight: Override default dense weight (0.6)
             sparse_weight: Override default sparse weight (0.4)
             category_id: Optional category filter
+            ef_search: HNSW candidate list size for the dense leg
+            sparse_engine: Sparse leg engine ("bm25", "postgres" or "lexical")
+            timings: Optional dict, filled with per-leg wall times in ms
+            dense_queries: Queries for the dense leg instead of query (e.g. the
+                original query + reformulations); several are searched with
+                search_multi() and fused with RRF
 
         Returns:
             Tuple of (results list with RRF scores, execution time in ms)
@@ -328,9 +894,54 @@ class SearchService:
             min_bm25_score=min_bm25_score,
             dense_weight=dense_weight,
             sparse_weight=sparse_weight,
-            category_id=category_id
+            category_id=category_id,
+            ef_search=ef_search,
+            sparse_engine=sparse_engine,
+            timings=timings,
+            dense_queries=dense_queries
         )
 
+    async def hybrid_search_batch(
+        self,
+        queries: List[str],
+        project_id: int,
+        limit: int = 10,
+        top_k_retrieve: int = 20,
+        min_similarity: float = 0.5,
+        min_bm25_score: float = 0.0,
+        dense_weight: Optional[float] = None,
+        sparse_weight: Optional[float] = None,
+        category_id: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        sparse_engine: Optional[str] = None,
+        timings: Optional[dict] = None
+    ) -> AsyncIterator[Tuple[int, List[dict]]]:
+        """
+        Hybrid search for many queries, yielding each query's results as its group finishes
+
+        See HybridSearchService.search_batch(); the parameters are those of
+        hybrid_search() applied to every query.
+
+        Yields:
+            (query index, results list with RRF scores)
+        """
+        hybrid_service = self._get_hybrid_service()
+        async for item in hybrid_service.search_batch(
+            queries=queries,
+            project_id=project_id,
+            limit=limit,
+            top_k_retrieve=top_k_retrieve,
+            min_similarity=min_similarity,
+            min_bm25_score=min_bm25_score,
+            dense_weight=dense_weight,
+            sparse_weight=sparse_weight,
+            category_id=category_id,
+            ef_search=ef_search,
+            sparse_engine=sparse_engine,
+            timings=timings
+        ):
+            yield item
+
     async def search_with_reranking(
         self,
         db: AsyncSession,
@@ -346,7 +957,13 @@ class SearchService:
         category_id: Optional[int] = None,
         use_query_expansion: bool = True,
         expansion_strategy: str = "balanced",
-        use_crag: bool = True
+        use_crag: bool = True,
+        ef_search: Optional[int] = None,
+        sparse_engine: Optional[str] = None,
+        rerank_stages: Optional[List[int]] = None,
+        include_explanations: bool = False,
+        timings: Optional[Dict[str, float]] = None,
+        pipeline: Optional[dict] = None
     ) -> tuple[List[dict], float]:
         """
         Complete TIER 1 Advanced RAG pipeline: Hybrid Search + Cross-Encoder Reranking
@@ -362,6 +979,10 @@ class SearchService:
         - RRF fusion (balanced ranking)
         - Cross-encoder (precise relevance scoring)
 
+        Final results are served from the search result cache when the same
+        normalized query and parameters were run against the current project
+        index version (bumped by triggers on every chunk write).
+
         Args:
             db: Database session
             query: Search query text
@@ -374,6 +995,19 @@ class SearchService:
             dense_weight: Override dense weight (default: 0.6)
             sparse_weight: Override sparse weight (default: 0.4)
             category_id: Optional category filter
+            ef_search: HNSW candidate list size for dense retrieval
+            sparse_engine: Sparse leg engine ("bm25", "postgres" or "lexical")
+            rerank_stages: Cascade stage sizes for the cross-encoder
+                (default: settings.RERANK_CASCADE_STAGES)
+            include_explanations: Attach a per-result "explanation" (skipped
+                entirely otherwise)
+            timings: Optional dict, filled with per-stage wall times in ms
+                (query expansion, retrieval legs and their sub-stages, fusion,
+                CRAG, cross-encoder, explanations, result cache and total)
+            pipeline: Optional dict, filled with pipeline-level metadata shared
+                by all results (confidence_level, skip_metrics,
+                reranking_skipped, query_expansion, crag_evaluation,
+                crag_improvement)
 
         Returns:
             Tuple of (reranked results, execution time in ms)
@@ -385,24 +1019,179 @@ class SearchService:
         """
         start_time = time.time()
 
+        with stage_timer("result_cache_lookup", timings):
+            cache_key, cacheable, cached = await self._lookup_cached_results(db, project_id, query, {
+                "limit": limit,
+                "retrieval_limit": retrieval_limit,
+                "min_similarity": min_similarity,
+                "min_bm25_score": min_bm25_score,
+                "min_cross_encoder_score": min_cross_encoder_score,
+                "dense_weight": dense_weight,
+                "sparse_weight": sparse_weight,
+                "category_id": category_id,
+                "use_query_expansion": use_query_expansion,
+                "expansion_strategy": expansion_strategy,
+                "use_crag": use_crag,
+                "ef_search": ef_search or settings.HNSW_EF_SEARCH,
+                "vector_search_mode": settings.VECTOR_SEARCH_MODE,
+                "sparse_engine": sparse_engine or settings.SPARSE_ENGINE,
+                "rerank_stages": rerank_stages if rerank_stages is not None else settings.RERANK_CASCADE_STAGES,
+                "include_explanations": include_explanations,
+                "multi_query_max_reformulations": settings.MULTI_QUERY_MAX_REFORMULATIONS,
+            })
+
+        pipeline = pipeline if pipeline is not None else {}
+        if cached is not None:
+            pipeline.update(cached["pipeline"])
+            execution_time = (time.time() - start_time) * 1000
+            record_stage("total", execution_time / 1000, timings)
+            logger.info(f"⚡ Search result cache hit: {len(cached['results'])} results in {execution_time:.2f}ms")
+            return cached["results"], execution_time
+
+        results, _ = await self._search_with_reranking_uncached(
+            db=db,
+            query=query,
+            project_id=project_id,
+            limit=limit,
+            retrieval_limit=retrieval_limit,
+            min_similarity=min_similarity,
+            min_bm25_score=min_bm25_score,
+            min_cross_encoder_score=min_cross_encoder_score,
+            dense_weight=dense_weight,
+            sparse_weight=sparse_weight,
+            category_id=category_id,
+            use_query_expansion=use_query_expansion,
+            expansion_strategy=expansion_strategy,
+            use_crag=use_crag,
+            ef_search=ef_search,
+            sparse_engine=sparse_engine,
+            rerank_stages=rerank_stages,
+            include_explanations=include_explanations,
+            timings=timings,
+            pipeline=pipeline
+        )
+
+        if cacheable:
+            await self.search_result_cache.set_async(cache_key, {"results": results, "pipeline": pipeline})
+
+        execution_time = (time.time() - start_time) * 1000
+        record_stage("total", execution_time / 1000, timings)
+        return results, execution_time
+
+    async def _lookup_cached_results(
+        self,
+        db: AsyncSession,
+        project_id: int,
+        query: str,
+        params: dict
+    ) -> Tuple[Optional[str], bool, Optional[dict]]:
+        """
+        Look up final results in the search result cache
+
+        Returns:
+            Tuple of (cache key or None when bypassed, whether fresh results
+            may be stored under it, cached {"results", "pipeline"} entry or None)
+        """
+        cache = self.search_result_cache
+        if not cache.enabled:
+            return None, False, None
+
+        index_version = await self.get_project_index_version(db, project_id)
+        if index_version is None:
+            return None, False, None
+
+        version, age_seconds = index_version
+        cache_key = cache.make_key(project_id, version, query, params)
+        # The in-memory BM25 index picks up new chunks up to one sync
+        # interval after they commit; don't pin results from that window
+        cacheable = age_seconds >= settings.BM25_SYNC_INTERVAL_SECONDS
+
+        cached = await cache.get_async(cache_key)
+        return cache_key, cacheable, cached
+
+    async def get_project_index_version(
+        self,
+        db: AsyncSession,
+        project_id: int
+    ) -> Optional[Tuple[int, float]]:
+        """
+        Read a project's index version for search result cache keys
+
+        Args:
+            db: Database session
+            project_id: Project ID
+
+        Returns:
+            Tuple of (version, seconds since the last bump), (0, inf) for a
+            project that was never written, or None if the version table is
+            unavailable (results are then not cached)
+        """
+        # A savepoint confines a failed probe (e.g. table not migrated yet):
+        # rolling back the caller's session would discard its work and expire
+        # loaded instances such as the current user and project
+        try:
+            async with db.begin_nested():
+                result = await db.execute(
+                    select(
+                        project_index_versions.c.version,
+                        func.extract("epoch", func.now() - project_index_versions.c.updated_at).label("age_seconds")
+                    ).where(project_index_versions.c.project_id == project_id)
+                )
+                row = result.first()
+        except Exception as e:
+            logger.warning(f"⚠️ Project index version unavailable, search result cache bypassed: {e}")
+            return None
+
+        if row is None:
+            return 0, float("inf")
+        return int(row.version), float(row.age_seconds)
+
+    async def _search_with_reranking_uncached(
+        self,
+        db: AsyncSession,
+        query: str,
+        project_id: int,
+        limit: int,
+        retrieval_limit: int,
+        min_similarity: float,
+        min_bm25_score: float,
+        min_cross_encoder_score: float,
+        dense_weight: Optional[float],
+        sparse_weight: Optional[float],
+        category_id: Optional[int],
+        use_query_expansion: bool,
+        expansion_strategy: str,
+        use_crag: bool,
+        ef_search: Optional[int],
+        sparse_engine: Optional[str],
+        rerank_stages: Optional[List[int]],
+        include_explanations: bool = False,
+        timings: Optional[Dict[str, float]] = None,
+        pipeline: Optional[dict] = None
+    ) -> tuple[List[dict], float]:
+        """Run the full pipeline of search_with_reranking (no result cache)"""
+        start_time = time.time()
+
         # Step 0.5: TIER 2 Phase 3 - Query Expansion
         original_query = query
         expanded_query_obj = None
+        dense_queries = None
 
         if use_query_expansion:
             logger.info(f"🔍 TIER 2 Query Expansion: expanding query '{query[:50]}...'")
-            expanded_query_obj = query_expansion_service.expand_query(
-                query=query,
-                expansion_strategy=expansion_strategy
-            )
+            with stage_timer("query_expansion", timings):
+                expanded_query_obj = query_expansion_service.expand_query(
+                    query=query,
+                    expansion_strategy=expansion_strategy
+                )
 
-            # Use expanded query for sparse search (keywords benefit from expansion)
-            # Keep original for dense search (embeddings capture semantic meaning)
-            expanded_query_str = query_expansion_service.generate_expanded_query_string(
-                expanded=expanded_query_obj,
-                include_synonyms=True,
-                include_entities=True
-            )
+                # Use expanded query for sparse search (keywords benefit from expansion)
+                # Keep original for dense search (embeddings capture semantic meaning)
+                expanded_query_str = query_expansion_service.generate_expanded_query_string(
+                    expanded=expanded_query_obj,
+                    include_synonyms=True,
+                    include_entities=True
+                )
 
             logger.info(
                 f"📝 Expanded query: {len(expanded_query_obj.expanded_terms)} terms, "
@@ -412,6 +1201,13 @@ class SearchService:
             # Use expanded query for BM25 search
             query = expanded_query_str
 
+            # Dense leg: original query plus the top reformulations, embedded
+            # in one batch and searched in one SQL round trip
+            reformulations = [q for q in expanded_query_obj.reformulated_queries if q != original_query]
+            dense_queries = [original_query] + list(dict.fromkeys(reformulations))[
+                :settings.MULTI_QUERY_MAX_REFORMULATIONS
+            ]
+
         # Step 1: Hybrid retrieval (dense + sparse + RRF)
         logger.info(
             f"🔀 TIER 1 Complete Pipeline: query='{query[:50]}...', "
@@ -428,7 +1224,11 @@ class SearchService:
             min_bm25_score=min_bm25_score,
             dense_weight=dense_weight,
             sparse_weight=sparse_weight,
-            category_id=category_id
+            category_id=category_id,
+            ef_search=ef_search,
+            sparse_engine=sparse_engine,
+            timings=timings,
+            dense_queries=dense_queries
         )
 
         if not hybrid_results:
@@ -442,22 +1242,24 @@ class SearchService:
 
         if use_crag:
             logger.info("🔍 TIER 2 CRAG: Evaluating retrieval quality")
-            crag_evaluation = crag_service.evaluate_retrieval_quality(
-                results=hybrid_results,
-                score_field="rrf_score"
-            )
+            with stage_timer("crag_evaluation", timings):
+                crag_evaluation = crag_service.evaluate_retrieval_quality(
+                    results=hybrid_results,
+                    score_field="rrf_score"
+                )
 
             if crag_evaluation.should_apply_correction:
                 logger.info(
                     f"🔧 TIER 2 CRAG: Applying correction - "
                     f"action={crag_evaluation.corrective_action.value}"
                 )
-                crag_correction = crag_service.apply_corrective_action(
-                    results=hybrid_results,
-                    evaluation=crag_evaluation,
-                    query=query,
-                    score_field="rrf_score"
-                )
+                with stage_timer("crag_correction", timings):
+                    crag_correction = crag_service.apply_corrective_action(
+                        results=hybrid_results,
+                        evaluation=crag_evaluation,
+                        query=query,
+                        score_field="rrf_score"
+                    )
 
                 # Use corrected results
                 hybrid_results = crag_correction.corrected_results
@@ -475,37 +1277,38 @@ class SearchService:
             score_field="rrf_score"
         )
 
-        # Add confidence metrics to all results
-        confidence_level = reranking_optimizer.get_confidence_level(skip_metrics)
-        for result in hybrid_results:
-            result["confidence_level"] = confidence_level
-            result["skip_metrics"] = skip_metrics
-
-            # TIER 2 Phase 3: Add query expansion metadata
-            if expanded_query_obj:
-                result["query_expansion"] = {
-                    "used": True,
-                    "original_query": original_query,
-                    "expanded_terms_count": len(expanded_query_obj.expanded_terms),
-                    "entities_found": expanded_query_obj.entities,
-                    "expansion_strategy": expansion_strategy
-                }
-            else:
-                result["query_expansion"] = {"used": False}
-
-            # TIER 2 Phase 4: Add CRAG metadata
-            if crag_evaluation:
-                result["crag_evaluation"] = {
-                    "quality_level": crag_evaluation.quality_level.value,
-                    "confidence_score": crag_evaluation.confidence_score,
-                    "corrective_action": crag_evaluation.corrective_action.value,
-                    "reasoning": crag_evaluation.reasoning,
-                    "correction_applied": crag_evaluation.should_apply_correction
-                }
-                if crag_correction:
-                    result["crag_improvement"] = crag_correction.improvement_metrics
-            else:
-                result["crag_evaluation"] = {"used": False}
+        # Pipeline-level metadata is reported once per response, not per result
+        pipeline = pipeline if pipeline is not None else {}
+        pipeline["confidence_level"] = reranking_optimizer.get_confidence_level(skip_metrics)
+        pipeline["skip_metrics"] = skip_metrics
+        pipeline["reranking_skipped"] = should_skip
+
+        # TIER 2 Phase 3: Query expansion metadata
+        if expanded_query_obj:
+            pipeline["query_expansion"] = {
+                "used": True,
+                "original_query": original_query,
+                "expanded_terms_count": len(expanded_query_obj.expanded_terms),
+                "dense_queries_count": len(dense_queries),
+                "entities_found": expanded_query_obj.entities,
+                "expansion_strategy": expansion_strategy
+            }
+        else:
+            pipeline["query_expansion"] = {"used": False}
+
+        # TIER 2 Phase 4: CRAG metadata
+        if crag_evaluation:
+            pipeline["crag_evaluation"] = {
+                "quality_level": crag_evaluation.quality_level.value,
+                "confidence_score": crag_evaluation.confidence_score,
+                "corrective_action": crag_evaluation.corrective_action.value,
+                "reasoning": crag_evaluation.reasoning,
+                "correction_applied": crag_evaluation.should_apply_correction
+            }
+            if crag_correction:
+                pipeline["crag_improvement"] = crag_correction.improvement_metrics
+        else:
+            pipeline["crag_evaluation"] = {"used": False}
 
         if should_skip:
             # TIER 2 Optimization: Skip reranking for simple queries (30-50% latency reduction)
@@ -516,12 +1319,14 @@ class SearchService:
             # Return top-k results from RRF directly
             final_results = hybrid_results[:limit]
 
-            # TIER 2 Phase 2: Add explanations
-            final_results = explainability_service.explain_results(
-                results=final_results,
-                query=query,
-                pipeline_type="hybrid"
-            )
+            # TIER 2 Phase 2: Add explanations (only when requested)
+            if include_explanations:
+                with stage_timer("explanations", timings):
+                    final_results = explainability_service.explain_results(
+                        results=final_results,
+                        query=query,
+                        pipeline_type="hybrid"
+                    )
 
             execution_time = (time.time() - start_time) * 1000  # Convert to ms
 
@@ -538,20 +1343,19 @@ class SearchService:
             query=query,
             results=hybrid_results,
             top_k=limit,
-            min_score=min_cross_encoder_score
+            min_score=min_cross_encoder_score,
+            stages=rerank_stages,
+            timings=timings
         )
 
-        # Preserve confidence metrics in reranked results
-        for result in reranked_results:
-            result["confidence_level"] = confidence_level
-            result["skip_metrics"] = skip_metrics
-
-        # TIER 2 Phase 2: Add explanations
-        reranked_results = explainability_service.explain_results(
-            results=reranked_results,
-            query=query,
-            pipeline_type="reranked"
-        )
+        # TIER 2 Phase 2: Add explanations (only when requested)
+        if include_explanations:
+            with stage_timer("explanations", timings):
+                reranked_results = explainability_service.explain_results(
+                    results=reranked_results,
+                    query=query,
+                    pipeline_type="reranked"
+                )
 
         execution_time = (time.time() - start_time) * 1000  # Convert to ms
 
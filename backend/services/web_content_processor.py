@@ -13,9 +13,9 @@ from sqlalchemy import select
 from models.crawl_job import CrawlJob
 from models.document import Document, DocumentType, ProcessingStatus
 from models.category import Category
-from models.chunk import Chunk
 from services.text_chunker import TextChunker
-from services.embedding_generator import EmbeddingGenerator
+from services.embedding_generator import embedding_generator
+from services.chunk_writer import chunk_writer
 from services.crawler_orchestrator import CrawlerOrchestrator, ScrapeResult
 
 
@@ -34,7 +34,7 @@ class WebContentProcessor:
     def __init__(self):
         self.crawler = CrawlerOrchestrator()
         self.text_chunker = TextChunker()
-        self.embedding_generator = EmbeddingGenerator()
+        self.embedding_generator = embedding_generator
 
     async def process_crawl_job(
         self,
@@ -330,21 +330,26 @@ class WebContentProcessor:
 
             # Generate embeddings
             texts = [chunk["text"] for chunk in chunks_data]
-            embeddings = self.embedding_generator.generate_embeddings_batch(texts)
+            lexical_weights = []
+            embeddings = self.embedding_generator.generate_embeddings_batch(
+                texts, lexical_weights=lexical_weights
+            )
 
-            # Store chunks
-            for i, (chunk_data, embedding) in enumerate(zip(chunks_data, embeddings)):
-                chunk = Chunk(
+            # Store chunks (one bulk COPY per page)
+            await chunk_writer.write(db, [
+                chunk_writer.make_row(
+                    document_id=document.id,
                     text=chunk_data["text"],
                     embedding=embedding,
                     chunk_index=i,
                     chunk_metadata=str({"source_url": result.url}),  # Store URL in metadata as string
-                    document_id=document.id,
                     category_id=category.id,
-                    has_embedding=1
+                    lexical_weights=weights
                 )
-
-                db.add(chunk)
+                for i, (chunk_data, embedding, weights) in enumerate(
+                    zip(chunks_data, embeddings, lexical_weights)
+                )
+            ])
 
         # Update document status
         document.processing_status = ProcessingStatus.COMPLETED
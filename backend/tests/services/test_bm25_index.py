@@ -0,0 +1,146 @@
+"""
+Unit tests for BM25Index
+
+Tests incremental add / remove / update and collection statistics.
+"""
+
+import math
+import numpy as np
+import pytest
+
+from services.bm25_index import BM25Index
+
+
+@pytest.fixture
+def index():
+    idx = BM25Index()
+    idx.add_document(1, ["jwt", "authentication", "tokens"])
+    idx.add_document(2, ["database", "migrations"])
+    idx.add_document(3, ["jwt", "jwt", "refresh"])
+    return idx
+
+
+class TestDeltas:
+    """Tests for add / remove / update"""
+
+    def test_statistics_after_add(self, index):
+        assert index.num_documents == 3
+        assert index.avgdl == pytest.approx(8 / 3)
+        assert index.document_frequency("jwt") == 2
+
+    def test_remove_updates_statistics_and_postings(self, index):
+        assert index.remove_document(3) is True
+
+        assert index.num_documents == 2
+        assert index.avgdl == pytest.approx(5 / 2)
+        assert index.document_frequency("jwt") == 1
+        assert "refresh" not in index.postings
+        assert index.remove_document(3) is False
+
+    def test_update_replaces_tokens(self, index):
+        index.update_document(2, ["jwt"])
+
+        assert index.document_frequency("database") == 0
+        assert index.document_frequency("jwt") == 3
+        assert index.total_length == 7
+
+
+class TestScoring:
+    """Tests for BM25 scoring"""
+
+    def test_score_matches_formula(self, index):
+        scores = index.get_scores(["refresh"])
+
+        idf = math.log(1 + (3 - 1 + 0.5) / (1 + 0.5))
+        norm = 1 + 1.5 * (1 - 0.75 + 0.75 * 3 / (8 / 3))
+        assert set(scores) == {3}
+        assert scores[3] == pytest.approx(idf * 2.5 / norm)
+
+    def test_only_matching_documents_are_scored(self, index):
+        assert set(index.get_scores(["jwt"])) == {1, 3}
+        assert index.get_scores(["unknown"]) == {}
+
+    def test_doc_filter(self, index):
+        assert set(index.get_scores(["jwt"], doc_filter={3})) == {3}
+
+
+class TestCompaction:
+    """Tests for the CSR base segment"""
+
+    def test_compacted_scores_match_delta_scores(self, index):
+        expected = index.get_scores(["jwt", "tokens"])
+
+        index.compact()
+
+        assert index.postings == {}
+        assert index.get_scores(["jwt", "tokens"]) == pytest.approx(expected)
+        assert index.document_frequency("jwt") == 2
+
+    def test_remove_tombstones_base_document(self, index):
+        index.compact()
+
+        assert index.remove_document(3) is True
+        assert 3 not in index
+        assert index.num_documents == 2
+        assert set(index.get_scores(["jwt"])) == {1}
+        assert index.remove_document(3) is False
+
+    def test_top_k_merges_segments(self, index):
+        index.compact()
+        index.add_document(4, ["jwt", "jwt", "jwt", "jwt"])
+        index.update_document(1, ["database"])
+
+        hits = index.top_k(["jwt"], k=2)
+
+        assert [doc_id for doc_id, _ in hits] == [4, 3]
+        assert hits[0][1] >= hits[1][1]
+
+        index.compact()
+        assert index.top_k(["jwt"], k=2)[0][0] == 4
+        assert index.num_documents == 4
+
+    def test_top_k_many_matches_top_k(self, index):
+        index.compact()
+        index.add_document(4, ["jwt", "refresh", "refresh"])
+        index.remove_document(1)
+        queries = [["jwt", "refresh"], ["database"], ["unknown"], [], ["jwt", "jwt", "tokens"]]
+
+        batched = index.top_k_many(queries, k=2)
+
+        assert batched == [index.top_k(tokens, k=2) for tokens in queries]
+        assert batched[2] == [] and batched[3] == []
+
+    def test_load_documents_matches_incremental_build(self, index):
+        bulk = BM25Index()
+        bulk.load_documents([
+            (1, ["jwt", "authentication", "tokens"]),
+            (2, ["database", "migrations"]),
+            (3, ["jwt", "jwt", "refresh"]),
+        ])
+
+        assert bulk.num_documents == 3
+        assert bulk.get_scores(["jwt", "refresh"]) == pytest.approx(index.get_scores(["jwt", "refresh"]))
+
+
+class TestSnapshot:
+    """Tests for save / load of the base segment"""
+
+    def test_round_trip_is_memory_mapped(self, index, tmp_path):
+        index.compact()
+        expected = index.get_scores(["jwt", "refresh"])
+
+        index.save(tmp_path)
+        loaded = BM25Index.load(tmp_path)
+
+        assert isinstance(loaded.weights, np.memmap)
+        assert loaded.num_documents == 3
+        assert loaded.get_scores(["jwt", "refresh"]) == pytest.approx(expected)
+
+        loaded.add_document(4, ["jwt"])
+        loaded.remove_document(1)
+        loaded.compact()
+        assert set(loaded.get_scores(["jwt"])) == {3, 4}
+
+    def test_save_requires_compaction(self, index, tmp_path):
+        with pytest.raises(ValueError):
+            index.save(tmp_path)
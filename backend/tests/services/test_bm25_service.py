@@ -0,0 +1,323 @@
+"""
+Unit tests for BM25Service
+
+Tests per-project BM25 shards on a small in-memory corpus.
+"""
+
+import pytest
+from types import SimpleNamespace
+from sqlalchemy import column
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from services.bm25_service import BM25Service
+
+
+def make_chunk(chunk_id, project_id, text):
+    return SimpleNamespace(
+        id=chunk_id,
+        document_id=chunk_id * 10,
+        project_id=project_id,
+        text=text,
+        chunk_metadata=None
+    )
+
+
+CORPUS = {
+    1: [
+        make_chunk(1, 1, "jwt authentication tokens for the api"),
+        make_chunk(2, 1, "database migrations with alembic"),
+    ],
+    2: [
+        make_chunk(3, 2, "jwt authentication and refresh tokens"),
+        make_chunk(4, 2, "jwt jwt jwt authentication deep dive"),
+        make_chunk(5, 2, "celery workers and redis"),
+    ],
+}
+
+
+CHUNK_COLUMNS = SimpleNamespace(**{
+    name: column(name) for name in ("id", "document_id", "project_id", "text", "has_embedding")
+})
+
+
+def rows_result(rows):
+    result = MagicMock()
+    result.all.return_value = rows
+    return result
+
+
+async def load(service, project_id):
+    """Load a project's shard from a mocked session"""
+    session = AsyncMock()
+    session.execute.return_value = rows_result(CORPUS.get(project_id, []))
+    with patch("services.bm25_service.select"):
+        await service._load_shard(session, project_id)
+
+
+@pytest.fixture
+async def bm25(tmp_path):
+    """BM25Service with the shards of projects 1 and 2 loaded"""
+    service = BM25Service(max_loaded_chunks=100, snapshot_dir=str(tmp_path))
+    service.is_initialized = True
+    service.watermark = 5
+    await load(service, 1)
+    await load(service, 2)
+    return service
+
+
+class TestShards:
+    """Tests for per-project shards"""
+
+    @pytest.mark.asyncio
+    async def test_only_returns_chunks_of_project(self, bm25):
+        results = await bm25.search("jwt authentication", top_k=1, project_id=1)
+
+        assert [r["id"] for r in results] == [1]
+
+    @pytest.mark.asyncio
+    async def test_idf_is_computed_per_project(self, bm25):
+        # "jwt" is in every chunk of project 2 but only half of project 1
+        assert bm25.shards[1].index.idf("jwt") > bm25.shards[2].index.idf("jwt")
+        assert bm25.shards[1].index.num_documents == 2
+
+    @pytest.mark.asyncio
+    async def test_scoring_runs_off_the_event_loop(self, bm25):
+        import threading
+
+        shard = bm25.shards[2]
+        scoring_threads = []
+        top_k = shard.top_k
+
+        def record_thread(tokens, k):
+            scoring_threads.append(threading.get_ident())
+            return top_k(tokens, k)
+
+        shard.top_k = record_thread
+        results = await bm25.search("jwt", top_k=2, project_id=2)
+
+        assert [r["id"] for r in results] == [4, 3]
+        assert scoring_threads and scoring_threads[0] != threading.get_ident()
+
+    @pytest.mark.asyncio
+    async def test_shard_build_runs_off_the_event_loop(self, tmp_path):
+        import threading
+
+        service = BM25Service(max_loaded_chunks=100, snapshot_dir=str(tmp_path))
+        tokenize = service._tokenize
+        tokenizing_threads = set()
+
+        def record_thread(text):
+            tokenizing_threads.add(threading.get_ident())
+            return tokenize(text)
+
+        service._tokenize = record_thread
+        await load(service, 2)
+
+        assert len(service.shards[2]) == 3
+        assert tokenizing_threads and threading.get_ident() not in tokenizing_threads
+
+    @pytest.mark.asyncio
+    async def test_remove_document_waits_for_compaction_lock(self, bm25):
+        import threading
+
+        shard = bm25.shards[2]
+        removed = []
+        remover = threading.Thread(target=lambda: removed.append(shard.remove_document(40)))
+
+        with shard.lock:
+            remover.start()
+            remover.join(timeout=0.1)
+            assert remover.is_alive() and removed == []
+        remover.join()
+
+        assert removed == [1]
+        assert shard.document_ids([3, 5]) == [30, 50]
+
+    @pytest.mark.asyncio
+    async def test_search_many_matches_single_searches(self, bm25):
+        queries = ["jwt", "redis workers", "nothing matches", "jwt refresh"]
+
+        batched = await bm25.search_many(queries, top_k=2, project_id=2)
+
+        assert batched == [await bm25.search(query, top_k=2, project_id=2) for query in queries]
+        assert await bm25.search_many(queries, project_id=99) == [[], [], [], []]
+
+    @pytest.mark.asyncio
+    async def test_unloaded_project_returns_empty(self, bm25):
+        assert await bm25.search("jwt", project_id=99) == []
+
+    @pytest.mark.asyncio
+    async def test_prepare_loads_shard_once(self, bm25):
+        bm25.shards.pop(1)
+        bm25.snapshot_dir = None
+        bm25.sync = AsyncMock(return_value=0)
+        session = AsyncMock()
+        session.execute.return_value = rows_result(CORPUS[1])
+
+        with patch("services.bm25_service.select"):
+            await bm25.prepare(session, 1)
+            await bm25.prepare(session, 1)
+
+        assert session.execute.await_count == 1
+        assert list(bm25.shards) == [2, 1]
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_shard_is_evicted(self, tmp_path):
+        service = BM25Service(max_loaded_chunks=4, snapshot_dir=str(tmp_path))
+        await load(service, 1)
+        await load(service, 2)
+
+        assert list(service.shards) == [2]
+        assert service.get_stats()["shard_evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_remove_project_drops_shard(self, bm25, tmp_path):
+        bm25.remove_project(2)
+
+        assert 2 not in bm25.shards
+        assert not (tmp_path / "project_2").exists()
+        assert bm25.get_stats()["num_documents"] == 2
+
+
+class TestSnapshots:
+    """Tests for snapshot save / load with delta replay"""
+
+    @pytest.mark.asyncio
+    async def test_built_shards_are_saved(self, bm25, tmp_path):
+        assert (tmp_path / "project_1" / "manifest.json").exists()
+        assert bm25.get_stats()["snapshot_saves"] == 2
+
+    @pytest.mark.asyncio
+    async def test_load_replays_changes_since_version(self, bm25, tmp_path):
+        # Snapshot of project 1 is at version 5; chunk 6 was added and chunk 2 deleted since
+        session = AsyncMock()
+        session.execute.side_effect = [
+            rows_result([make_chunk(6, 1, "kubernetes jwt sidecar")]),
+            rows_result([(1,)]),
+        ]
+        service = BM25Service(snapshot_dir=str(tmp_path))
+        service.is_initialized = True
+
+        with patch("services.bm25_service.select"), patch("services.bm25_service.Chunk", CHUNK_COLUMNS):
+            await service._load_shard(session, 1)
+
+        shard = service.shards[1]
+        assert service.get_stats()["snapshot_loads"] == 1
+        assert shard.version == 5
+        assert 2 not in shard and len(shard) == 2
+        assert shard.document_ids([1, 6]) == [10, 60]
+        results = await service.search("jwt", project_id=1)
+        assert [r["id"] for r in results] == [6, 1]
+
+    @pytest.mark.asyncio
+    async def test_saves_publish_a_new_version_atomically(self, bm25, tmp_path):
+        link = tmp_path / "project_1"
+        first_version = link.resolve()
+        shard = bm25.shards[1]
+        shard.add(6, 60, ["kubernetes"])
+        shard.compact()
+
+        await bm25._save_snapshot(shard)
+
+        assert link.is_symlink() and link.resolve() != first_version
+        assert not first_version.exists()
+        assert sorted(p.name for p in (tmp_path / "versions").iterdir()) == sorted(
+            p.resolve().name for p in tmp_path.glob("project_*")
+        )
+        assert len(bm25._load_snapshot(1)) == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_save_keeps_published_version(self, bm25, tmp_path):
+        published = (tmp_path / "project_1").resolve()
+        versions = set((tmp_path / "versions").iterdir())
+
+        with patch("services.bm25_service.np.save", side_effect=OSError("disk full")):
+            await bm25._save_snapshot(bm25.shards[1])
+
+        assert (tmp_path / "project_1").resolve() == published
+        assert set((tmp_path / "versions").iterdir()) == versions
+        assert bm25._load_snapshot(1) is not None
+
+
+class TestIncrementalUpdates:
+    """Tests for document removal and delta sync"""
+
+    @pytest.mark.asyncio
+    async def test_remove_document_drops_its_chunks(self, bm25):
+        assert bm25.remove_document(10) == 1
+
+        results = await bm25.search("jwt authentication", top_k=1, project_id=1)
+        assert results == []
+        assert bm25.get_stats()["num_documents"] == 4
+
+    @pytest.mark.asyncio
+    async def test_compaction_keeps_document_ids_aligned(self, bm25):
+        shard = bm25.shards[2]
+        shard.add(7, 70, ["kubernetes"])
+        shard.add(3, 31, ["kubernetes", "jwt"])  # re-added under a new document
+        shard.remove(4)
+
+        shard.compact()
+
+        assert shard.index.base_ids.tolist() == [3, 5, 7]
+        assert shard.base_document_ids.tolist() == [31, 50, 70]
+        results = await bm25.search("kubernetes", project_id=2)
+        assert {(r["id"], r["document_id"]) for r in results} == {(3, 31), (7, 70)}
+
+    @pytest.mark.asyncio
+    async def test_stats_report_array_memory(self, bm25):
+        stats = bm25.get_stats()
+
+        assert stats["memory_bytes"] >= sum(shard.index.weights.nbytes for shard in bm25.shards.values())
+        assert stats["num_terms"] > 0
+
+    @pytest.mark.asyncio
+    async def test_sync_adds_new_chunks_and_waits_for_gaps(self, bm25):
+        ids_result = MagicMock()
+        ids_result.fetchall.return_value = [(6, 1), (8, 1), (9, 3)]
+        session = AsyncMock()
+        session.execute.side_effect = [
+            ids_result,
+            rows_result([
+                make_chunk(6, 1, "kubernetes jwt sidecar"),
+                make_chunk(8, 1, "unrelated text"),
+            ]),
+        ]
+
+        with patch("services.bm25_service.select"), patch("services.bm25_service.Chunk", CHUNK_COLUMNS):
+            added = await bm25.sync(session, force=True)
+
+        # chunk 9 belongs to a project without a loaded shard
+        assert added == 2
+        assert 3 not in bm25.shards
+        # id 7 may still be in flight, so the watermark stops before it
+        assert bm25.watermark == 6
+        results = await bm25.search("kubernetes", project_id=1)
+        assert [r["id"] for r in results] == [6]
+
+    @pytest.mark.asyncio
+    async def test_sync_compacts_on_a_worker_thread(self, bm25):
+        import threading
+
+        shard = bm25.shards[1]
+        shard.index.compact_min_delta = 1
+        compact = shard.compact
+        compacting_threads = []
+
+        def record_thread():
+            compacting_threads.append(threading.get_ident())
+            compact()
+
+        shard.compact = record_thread
+        ids_result = MagicMock()
+        ids_result.fetchall.return_value = [(6, 1)]
+        session = AsyncMock()
+        session.execute.side_effect = [ids_result, rows_result([make_chunk(6, 1, "kubernetes jwt sidecar")])]
+
+        with patch("services.bm25_service.select"), patch("services.bm25_service.Chunk", CHUNK_COLUMNS):
+            await bm25.sync(session, force=True)
+
+        assert compacting_threads and compacting_threads[0] != threading.get_ident()
+        assert shard.index.postings == {} and shard.version == 6
+        results = await bm25.search("kubernetes", project_id=1)
+        assert [(r["id"], r["document_id"]) for r in results] == [(6, 60)]
@@ -0,0 +1,118 @@
+"""
+Unit tests for ChunkWriter
+
+Tests row building and the COPY / INSERT write paths with mocked connections.
+"""
+
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from services.chunk_writer import CHUNK_COLUMNS, ChunkWriter
+
+
+def make_session(driver: str, driver_connection=None):
+    """AsyncSession mock whose connection reports the given DBAPI driver"""
+    connection = MagicMock()
+    connection.dialect.driver = driver
+    raw_connection = MagicMock()
+    raw_connection.driver_connection = driver_connection
+    connection.get_raw_connection = AsyncMock(return_value=raw_connection)
+
+    session = AsyncMock()
+    session.connection.return_value = connection
+    return session
+
+
+class TestMakeRow:
+    """Tests for row construction"""
+
+    def test_encodes_metadata_and_flags_embedding(self):
+        row = ChunkWriter.make_row(
+            document_id=7, text="hello", embedding=[0.1, 0.2],
+            chunk_index=3, chunk_metadata={"page": 1}
+        )
+
+        assert set(row) == set(CHUNK_COLUMNS)
+        assert json.loads(row["chunk_metadata"]) == {"page": 1}
+        assert row["has_embedding"] == 1
+
+    def test_keeps_preencoded_metadata_and_missing_embedding(self):
+        row = ChunkWriter.make_row(
+            document_id=7, text="hello", embedding=None,
+            chunk_index=0, chunk_metadata="{'source_url': 'x'}"
+        )
+
+        assert row["chunk_metadata"] == "{'source_url': 'x'}"
+        assert row["has_embedding"] == 0
+
+    def test_lexical_weights_use_json_object_keys(self):
+        row = ChunkWriter.make_row(
+            document_id=7, text="hello", embedding=[0.1],
+            chunk_index=0, lexical_weights={42: 0.123456}
+        )
+
+        assert row["lexical_weights"] == {"42": 0.1235}
+
+
+class TestWrite:
+    """Tests for the bulk write paths"""
+
+    @pytest.mark.asyncio
+    async def test_asyncpg_uses_copy_in_column_order(self):
+        driver_connection = AsyncMock()
+        session = make_session("asyncpg", driver_connection)
+        writer = ChunkWriter()
+        rows = [
+            ChunkWriter.make_row(
+                document_id=1, text=f"chunk {i}", embedding=[0.0] * 4, chunk_index=i,
+                lexical_weights={i: 0.5}
+            )
+            for i in range(3)
+        ]
+
+        written = await writer.write(session, rows)
+
+        assert written == 3
+        call = driver_connection.copy_records_to_table.call_args
+        assert call.args[0] == "chunks"
+        assert call.kwargs["columns"] == list(CHUNK_COLUMNS)
+        assert [record[0] for record in call.kwargs["records"]] == ["chunk 0", "chunk 1", "chunk 2"]
+        assert call.kwargs["records"][1][-1] == '{"1": 0.5}'
+        driver_connection.reset_type_codec.assert_awaited_once()
+        session.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_halfvec_storage_copies_with_halfvec_codec(self):
+        from pgvector import HalfVector
+
+        driver_connection = AsyncMock()
+        session = make_session("asyncpg", driver_connection)
+        rows = [ChunkWriter.make_row(document_id=1, text="a", embedding=[0.5, -1.0], chunk_index=0)]
+
+        with patch("services.chunk_writer.settings.VECTOR_SEARCH_MODE", "binary"):
+            await ChunkWriter().write(session, rows)
+
+        codec = driver_connection.set_type_codec.call_args
+        assert codec.args[0] == "halfvec"
+        assert codec.kwargs["encoder"]([0.5, -1.0]) == HalfVector([0.5, -1.0]).to_binary()
+        driver_connection.reset_type_codec.assert_awaited_once_with("halfvec", schema="public")
+
+    @pytest.mark.asyncio
+    async def test_other_drivers_fall_back_to_executemany(self):
+        session = make_session("psycopg")
+        writer = ChunkWriter()
+        rows = [ChunkWriter.make_row(document_id=1, text="a", embedding=[0.0], chunk_index=0)]
+
+        with patch("services.chunk_writer.insert") as insert:
+            await writer.write(session, rows)
+
+        session.execute.assert_awaited_once_with(insert.return_value, rows)
+        assert writer.get_stats()["insert_calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_empty_rows_skip_database(self):
+        session = make_session("asyncpg", AsyncMock())
+
+        assert await ChunkWriter().write(session, []) == 0
+        session.flush.assert_not_called()
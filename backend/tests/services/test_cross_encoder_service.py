@@ -0,0 +1,80 @@
+"""
+Unit tests for CrossEncoderService
+
+Tests single-stage and cascade reranking with a mocked micro-batcher.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from services.cross_encoder_service import CrossEncoderService
+from services.rerank_score_cache import RerankScoreCache
+
+
+def make_service():
+    """Service whose "model" scores a pair by how often "jwt" appears in the text"""
+    service = CrossEncoderService(score_cache=RerankScoreCache(enabled=False))
+    service.is_initialized = True
+    service.model = MagicMock()
+    service.batcher = MagicMock()
+    service.batcher.submit = AsyncMock(
+        side_effect=lambda pairs: [float(text.count("jwt")) for _, text in pairs]
+    )
+    return service
+
+
+def make_candidates():
+    # Chunk 4's extra matches are past the first 400 characters
+    return [
+        {"chunk_id": 1, "chunk_text": "jwt " * 3},
+        {"chunk_id": 2, "chunk_text": "nothing relevant"},
+        {"chunk_id": 3, "chunk_text": "jwt " * 2},
+        {"chunk_id": 4, "chunk_text": "jwt " + "x" * 500 + " jwt" * 5},
+        {"chunk_id": 5, "chunk_text": "unrelated"},
+    ]
+
+
+class TestCascade:
+    """Tests for cascade reranking"""
+
+    @pytest.mark.asyncio
+    async def test_single_stage_scores_every_candidate_on_full_text(self):
+        service = make_service()
+
+        reranked = await service.rerank("jwt", make_candidates(), top_k=2, stages=[])
+
+        assert [r["chunk_id"] for r in reranked] == [4, 1]
+        assert service.batcher.submit.await_count == 1
+        assert service.pairs_scored == 5
+
+    @pytest.mark.asyncio
+    async def test_cheap_stage_prunes_before_full_pass(self):
+        service = make_service()
+
+        reranked = await service.rerank("jwt", make_candidates(), top_k=2, stages=[3])
+
+        cheap_pairs, full_pairs = [call.args[0] for call in service.batcher.submit.await_args_list]
+        assert all(len(text) <= 400 for _, text in cheap_pairs)
+        assert len(full_pairs) == 3
+        # Final order comes from full-text scores, ranks from the input order
+        assert [r["chunk_id"] for r in reranked] == [4, 1]
+        assert reranked[0]["original_rank"] == 4
+        assert service.cascade_pruned == 2
+
+    @pytest.mark.asyncio
+    async def test_stage_never_keeps_fewer_than_top_k(self):
+        service = make_service()
+
+        reranked = await service.rerank("jwt", make_candidates(), top_k=5, stages=[2])
+
+        assert service.batcher.submit.await_count == 1  # nothing to prune
+        assert len(reranked) == 5
+
+    @pytest.mark.asyncio
+    async def test_timings_split_cascade_and_full_pass(self):
+        service = make_service()
+        timings = {}
+
+        await service.rerank("jwt", make_candidates(), top_k=2, stages=[3], timings=timings)
+
+        assert set(timings) == {"rerank_cascade_ms", "cross_encoder_ms"}
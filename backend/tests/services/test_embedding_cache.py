@@ -0,0 +1,84 @@
+"""
+Unit tests for EmbeddingCache
+
+Tests content addressing, persistence and LRU eviction of the on-disk cache.
+"""
+
+import pytest
+
+from services.embedding_cache import EmbeddingCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Small cache backed by a temporary SQLite file"""
+    return EmbeddingCache(
+        path=str(tmp_path / "embeddings.sqlite3"), max_entries=4, enabled=True, touch_interval_seconds=0
+    )
+
+
+class TestEmbeddingCache:
+    """Tests for EmbeddingCache"""
+
+    def test_key_depends_on_model_mode_and_text(self):
+        base = EmbeddingCache.make_key("text", "BAAI/bge-m3", "plain")
+        assert base == EmbeddingCache.make_key("text", "BAAI/bge-m3", "plain")
+        assert base != EmbeddingCache.make_key("text", "BAAI/bge-m3", "contextual")
+        assert base != EmbeddingCache.make_key("text", "other-model", "plain")
+        assert base != EmbeddingCache.make_key("text ", "BAAI/bge-m3", "plain")
+
+    def test_put_then_get_round_trip(self, cache):
+        cache.put_many(["a", "b"], [[0.5, 1.0], [2.0, 3.0]], "m", "plain")
+
+        hits = cache.get_many(["b", "missing", "a"], "m", "plain")
+
+        assert hits == {0: [2.0, 3.0], 2: [0.5, 1.0]}
+        assert cache.hits == 2
+        assert cache.misses == 1
+
+    def test_persists_across_instances(self, cache):
+        cache.put_many(["a"], [[1.0]], "m", "plain")
+
+        reopened = EmbeddingCache(path=str(cache.path), enabled=True)
+
+        assert reopened.get_many(["a"], "m", "plain") == {0: [1.0]}
+
+    def test_none_embeddings_are_not_stored(self, cache):
+        cache.put_many(["a", "b"], [None, [1.0]], "m", "plain")
+
+        assert cache.get_stats()["entries"] == 1
+
+    def test_evicts_least_recently_used(self, cache):
+        cache.put_many(["a", "b", "c", "d"], [[1.0]] * 4, "m", "plain")
+        cache.get_many(["a"], "m", "plain")  # Touch "a" so it survives eviction
+
+        cache.put_many(["e"], [[1.0]], "m", "plain")
+
+        assert cache.get_stats()["entries"] <= 4
+        assert 0 in cache.get_many(["a"], "m", "plain")
+        assert cache.evictions > 0
+
+    def test_lookups_do_not_write(self, cache):
+        cache.put_many(["a"], [[1.0]], "m", "plain")
+        conn = cache._connect()
+        changes = conn.total_changes
+
+        cache.get_many(["a"], "m", "plain")
+        assert conn.total_changes == changes  # refresh buffered, not written
+        assert list(cache._pending_touches) == [EmbeddingCache.make_key("a", "m", "plain")]
+
+        cache.put_many(["b"], [[1.0]], "m", "plain")
+        assert cache._pending_touches == {}
+
+    def test_recently_used_hits_are_not_refreshed(self, tmp_path):
+        cache = EmbeddingCache(path=str(tmp_path / "e.sqlite3"), enabled=True, touch_interval_seconds=3600)
+        cache.put_many(["a"], [[1.0]], "m", "plain")
+
+        assert cache.get_many(["a"], "m", "plain") == {0: [1.0]}
+        assert cache._pending_touches == {}
+
+    def test_disabled_cache_never_hits(self, tmp_path):
+        cache = EmbeddingCache(path=str(tmp_path / "off.sqlite3"), enabled=False)
+        cache.put_many(["a"], [[1.0]], "m", "plain")
+
+        assert cache.get_many(["a"], "m", "plain") == {}
@@ -0,0 +1,149 @@
+"""
+Unit tests for EmbeddingGenerator
+
+Tests length-bucketed contextual batching with a mocked BGE-M3 model.
+"""
+
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+
+from services.embedding_cache import EmbeddingCache
+from services.embedding_generator import EmbeddingGenerator
+
+
+@pytest.fixture
+def generator():
+    """EmbeddingGenerator with a fake model that records encode() calls"""
+    gen = EmbeddingGenerator(cache=EmbeddingCache(enabled=False))
+    model = MagicMock()
+    model.tokenizer = None
+
+    def fake_encode(texts, batch_size, max_length, return_sparse=False, **kwargs):
+        output = {"dense_vecs": np.ones((len(texts), gen.dimensions), dtype=np.float32)}
+        if return_sparse:
+            output["lexical_weights"] = [{"5": 0.25, str(len(t)): 0.5, "9": 0.0} for t in texts]
+        return output
+
+    model.encode.side_effect = fake_encode
+    gen.model = model
+    return gen
+
+
+class TestContextualText:
+    """Tests for contextual text construction"""
+
+    def test_build_contextual_text_all_parts(self):
+        text = EmbeddingGenerator.build_contextual_text("main", "before", "after")
+        assert text == "[BEFORE] before [MAIN] main [AFTER] after"
+
+    def test_build_contextual_text_main_only(self):
+        text = EmbeddingGenerator.build_contextual_text("main", None, "  ")
+        assert text == "[MAIN] main"
+
+
+class TestContextualBatching:
+    """Tests for generate_contextual_embeddings_batch"""
+
+    def test_preserves_order_and_skips_empty(self, generator):
+        chunks = [
+            {"text": "short"},
+            {"text": ""},
+            {"text": "a much longer chunk of text " * 20, "chunk_before": "prev"},
+        ]
+
+        embeddings = generator.generate_contextual_embeddings_batch(chunks, batch_size=8)
+
+        assert len(embeddings) == 3
+        assert embeddings[0] is not None
+        assert embeddings[1] is None
+        assert len(embeddings[2]) == generator.dimensions
+
+    def test_buckets_use_dynamic_max_length(self, generator):
+        chunks = [{"text": "x" * n} for n in (30, 30, 3000, 3000)]
+
+        generator.generate_contextual_embeddings_batch(chunks, batch_size=2)
+
+        max_lengths = [call.kwargs["max_length"] for call in generator.model.encode.call_args_list]
+        assert len(max_lengths) == 2
+        assert max_lengths[0] < max_lengths[1] < 8192
+
+    def test_reports_progress_per_bucket(self, generator):
+        chunks = [{"text": f"chunk {i}"} for i in range(5)]
+        progress = []
+
+        generator.generate_contextual_embeddings_batch(
+            chunks,
+            batch_size=2,
+            progress_callback=lambda done, total: progress.append((done, total))
+        )
+
+        assert progress == [(2, 5), (4, 5), (5, 5)]
+
+
+class TestEmbeddingCacheIntegration:
+    """Tests for transparent cache use in EmbeddingGenerator"""
+
+    def test_repeat_batch_is_served_from_cache(self, generator, tmp_path):
+        generator.cache = EmbeddingCache(path=str(tmp_path / "cache.sqlite3"), enabled=True)
+        texts = ["first chunk", "second chunk"]
+
+        generator.generate_embeddings_batch(texts)
+        generator.generate_embeddings_batch(texts)
+
+        assert generator.model.encode.call_count == 1
+        assert generator.cache.hits == 2
+
+    def test_contextual_batch_only_encodes_misses(self, generator, tmp_path):
+        generator.cache = EmbeddingCache(path=str(tmp_path / "cache.sqlite3"), enabled=True)
+        chunks = [{"text": "alpha"}, {"text": "beta"}]
+
+        generator.generate_contextual_embeddings_batch(chunks)
+        generator.model.encode.reset_mock()
+        embeddings = generator.generate_contextual_embeddings_batch(chunks + [{"text": "gamma"}])
+
+        assert all(e is not None for e in embeddings)
+        encoded = [t for call in generator.model.encode.call_args_list for t in call.args[0]]
+        assert encoded == ["[MAIN] gamma"]
+
+
+class TestLexicalWeights:
+    """Tests for BGE-M3 lexical weights returned alongside dense vectors"""
+
+    def test_batch_fills_lexical_weights_from_same_pass(self, generator):
+        lexical = []
+
+        generator.generate_embeddings_batch(["abc", "", "abcdef"], lexical_weights=lexical)
+
+        assert generator.model.encode.call_count == 1
+        assert generator.model.encode.call_args.kwargs["return_sparse"] is True
+        assert lexical == [{5: 0.25, 3: 0.5}, None, {5: 0.25, 6: 0.5}]
+
+    def test_contextual_batch_caches_lexical_weights(self, generator, tmp_path):
+        generator.cache = EmbeddingCache(path=str(tmp_path / "cache.sqlite3"), enabled=True)
+        chunks = [{"text": "alpha"}, {"text": "beta"}]
+
+        first, second = [], []
+        generator.generate_contextual_embeddings_batch(chunks, lexical_weights=first)
+        generator.model.encode.reset_mock()
+        generator.generate_contextual_embeddings_batch(chunks, lexical_weights=second)
+
+        generator.model.encode.assert_not_called()
+        assert second == first
+        assert first[0] == {5: 0.25, len("[MAIN] alpha"): 0.5}
+
+    def test_dense_only_cache_hit_is_encoded_again(self, generator, tmp_path):
+        generator.cache = EmbeddingCache(path=str(tmp_path / "cache.sqlite3"), enabled=True)
+        generator.generate_embeddings_batch(["alpha"])
+        generator.model.encode.reset_mock()
+
+        lexical = []
+        generator.generate_embeddings_batch(["alpha"], lexical_weights=lexical)
+
+        assert generator.model.encode.call_count == 1
+        assert lexical[0] is not None
+
+    def test_pack_round_trip(self):
+        weights = {250001: 0.125, 7: 0.5}
+        packed = EmbeddingGenerator.pack_lexical_weights(weights)
+        assert EmbeddingGenerator.unpack_lexical_weights(packed) == weights
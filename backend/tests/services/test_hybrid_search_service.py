@@ -0,0 +1,169 @@
+"""
+Unit tests for HybridSearchService
+
+Tests concurrent retrieval legs (one session each), per-leg timings and
+RRF fusion with a mocked SearchService.
+"""
+
+import asyncio
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock
+
+from services.hybrid_search_service import HybridSearchService
+
+
+class FakeSessionFactory:
+    """async_sessionmaker stand-in that hands out distinct sessions"""
+
+    def __init__(self):
+        self.sessions = []
+
+    @asynccontextmanager
+    async def __call__(self):
+        session = MagicMock(name=f"session{len(self.sessions)}")
+        self.sessions.append(session)
+        yield session
+
+
+def make_service(dense_delay: float = 0.05, sparse_delay: float = 0.05, sparse_error: Exception = None):
+    """HybridSearchService over a SearchService whose legs sleep and record their session"""
+    search_service = MagicMock()
+    seen = {}
+
+    async def dense(db, **kwargs):
+        seen["dense"] = db
+        await asyncio.sleep(dense_delay)
+        return [{"chunk_id": 1, "similarity_score": 0.9}, {"chunk_id": 2, "similarity_score": 0.8}], 0.0
+
+    async def sparse(db, **kwargs):
+        seen["sparse"] = db
+        await asyncio.sleep(sparse_delay)
+        if sparse_error:
+            raise sparse_error
+        return [{"chunk_id": 2, "similarity_score": 7.5}], 0.0
+
+    search_service.search.side_effect = dense
+    search_service.search_sparse.side_effect = sparse
+
+    factory = FakeSessionFactory()
+    return HybridSearchService(search_service, session_factory=factory), factory, seen
+
+
+class TestConcurrentLegs:
+    """Tests for per-leg sessions and timings"""
+
+    @pytest.mark.asyncio
+    async def test_legs_use_separate_sessions(self):
+        service, factory, seen = make_service()
+        caller_db = MagicMock(name="caller")
+
+        await service.search(caller_db, "jwt", project_id=1)
+
+        assert len(factory.sessions) == 2
+        assert seen["dense"] is not seen["sparse"]
+        assert caller_db not in seen.values()
+
+    @pytest.mark.asyncio
+    async def test_latency_is_max_of_legs_and_timings_are_reported(self):
+        service, _, _ = make_service(dense_delay=0.1, sparse_delay=0.1)
+        timings = {}
+
+        _, execution_time = await service.search(MagicMock(), "jwt", project_id=1, timings=timings)
+
+        assert set(timings) == {"dense_ms", "sparse_ms", "fusion_ms"}
+        assert timings["dense_ms"] >= 100 and timings["sparse_ms"] >= 100
+        assert execution_time < 190  # sequential legs would take >= 200ms
+
+    @pytest.mark.asyncio
+    async def test_failed_leg_degrades_to_other_leg(self):
+        service, _, _ = make_service(sparse_error=RuntimeError("index unavailable"))
+        timings = {}
+
+        results, _ = await service.search(MagicMock(), "jwt", project_id=1, timings=timings)
+
+        assert [r["chunk_id"] for r in results] == [1, 2]
+        assert all(r["source"] == "dense" for r in results)
+        assert "sparse_ms" in timings
+
+    @pytest.mark.asyncio
+    async def test_rrf_ranks_chunks_found_by_both_legs_first(self):
+        service, _, _ = make_service(dense_delay=0, sparse_delay=0)
+
+        results, _ = await service.search(MagicMock(), "jwt", project_id=1)
+
+        assert [r["chunk_id"] for r in results] == [2, 1]
+        assert results[0]["rrf_score"] > results[1]["rrf_score"]
+
+
+class TestMultiQueryDenseLeg:
+    """Tests for the dense leg with query reformulations"""
+
+    @pytest.mark.asyncio
+    async def test_reformulations_searched_together_and_fused(self):
+        service, _, _ = make_service()
+
+        async def dense_multi(db, queries, **kwargs):
+            return [
+                [{"chunk_id": 1, "similarity_score": 0.9}, {"chunk_id": 3, "similarity_score": 0.6}],
+                [{"chunk_id": 3, "similarity_score": 0.8}],
+            ], 0.0
+
+        service.search_service.search_multi.side_effect = dense_multi
+
+        results, _ = await service.search(
+            MagicMock(), "jwt OR token", project_id=1, dense_queries=["jwt", "json web token"]
+        )
+
+        assert service.search_service.search_multi.call_count == 1
+        assert service.search_service.search_multi.call_args.kwargs["queries"] == ["jwt", "json web token"]
+        assert not service.search_service.search.called
+        dense_ids = [r["chunk_id"] for r in results if r.get("dense_score") is not None]
+        assert dense_ids[0] == 3  # found by both queries
+
+
+class TestBatchSearch:
+    """Tests for search_batch()"""
+
+    @pytest.mark.asyncio
+    async def test_groups_share_one_call_per_leg_and_yield_in_order(self):
+        service, factory, _ = make_service()
+
+        async def dense_multi(db, queries, **kwargs):
+            return [[{"chunk_id": len(query), "similarity_score": 0.9}] for query in queries], 0.0
+
+        async def sparse_multi(db, queries, **kwargs):
+            return [[{"chunk_id": len(query), "similarity_score": 4.0}] for query in queries], 0.0
+
+        service.search_service.search_multi.side_effect = dense_multi
+        service.search_service.search_sparse_multi.side_effect = sparse_multi
+        timings = {}
+
+        items = [
+            item async for item in service.search_batch(
+                ["a", "bb", "ccc", "dddd", "eeeee"], project_id=1, group_size=2, timings=timings
+            )
+        ]
+
+        assert [index for index, _ in items] == [0, 1, 2, 3, 4]
+        assert [results[0]["chunk_id"] for _, results in items] == [1, 2, 3, 4, 5]
+        assert all(results[0]["rrf_score"] == pytest.approx(0.6 / 61 + 0.4 / 61) for _, results in items)
+        assert service.search_service.search_multi.call_count == 3
+        assert service.search_service.search_sparse_multi.call_args.kwargs["queries"] == ["eeeee"]
+        assert len(factory.sessions) == 6
+        assert {"dense_ms", "sparse_ms", "fusion_ms"} <= set(timings)
+
+    @pytest.mark.asyncio
+    async def test_failed_leg_degrades_to_other_leg(self):
+        service, _, _ = make_service()
+
+        async def dense_multi(db, queries, **kwargs):
+            return [[{"chunk_id": 1, "similarity_score": 0.9}] for _ in queries], 0.0
+
+        service.search_service.search_multi.side_effect = dense_multi
+        service.search_service.search_sparse_multi.side_effect = RuntimeError("index unavailable")
+
+        items = [item async for item in service.search_batch(["jwt", "alembic"], project_id=1)]
+
+        assert [[r["chunk_id"] for r in results] for _, results in items] == [[1], [1]]
+        assert all(results[0]["source"] == "dense" for _, results in items)
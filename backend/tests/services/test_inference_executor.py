@@ -0,0 +1,66 @@
+"""
+Unit tests for InferenceExecutor
+
+Tests that blocking calls run off the event loop and that metrics are tracked.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.inference_executor import InferenceExecutor
+
+
+@pytest.fixture
+def executor():
+    """Single-thread executor, shut down after each test"""
+    ex = InferenceExecutor(max_workers=1)
+    yield ex
+    ex.shutdown()
+
+
+class TestInferenceExecutor:
+    """Tests for InferenceExecutor"""
+
+    @pytest.mark.asyncio
+    async def test_runs_off_event_loop_thread(self, executor):
+        loop_thread = threading.get_ident()
+
+        worker_thread = await executor.run(threading.get_ident)
+
+        assert worker_thread != loop_thread
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self, executor):
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(executor.run(time.sleep, 0.1), ticker())
+
+        assert len(ticks) == 5
+
+    @pytest.mark.asyncio
+    async def test_tracks_queue_and_wait_metrics(self, executor):
+        await asyncio.gather(*(executor.run(time.sleep, 0.02) for _ in range(3)))
+
+        stats = executor.get_stats()
+        assert stats["total_calls"] == 3
+        assert stats["max_queue_depth"] >= 2
+        assert stats["queue_depth"] == 0
+        assert stats["max_wait_ms"] > 0
+
+    @pytest.mark.asyncio
+    async def test_exceptions_propagate(self, executor):
+        def boom():
+            raise RuntimeError("model failed")
+
+        with pytest.raises(RuntimeError):
+            await executor.run(boom)
+
+        assert executor.get_stats()["failed_calls"] == 1
@@ -0,0 +1,109 @@
+"""
+Unit tests for MicroBatcher
+
+Tests request coalescing, fan-out of results and error propagation.
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import MagicMock
+
+from services.inference_executor import InferenceExecutor
+from services.micro_batcher import MicroBatcher
+
+
+@pytest.fixture
+def executor():
+    ex = InferenceExecutor(max_workers=1)
+    yield ex
+    ex.shutdown()
+
+
+def make_batcher(executor, batch_fn, **kwargs):
+    return MicroBatcher(name="test", batch_fn=batch_fn, executor=executor, enabled=True, **kwargs)
+
+
+class TestMicroBatcher:
+    """Tests for MicroBatcher"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_batch(self, executor):
+        batch_fn = MagicMock(side_effect=lambda items: [item * 2 for item in items])
+        batcher = make_batcher(executor, batch_fn, max_batch_size=100, max_wait_ms=20)
+
+        results = await asyncio.gather(
+            batcher.submit([1]),
+            batcher.submit([2, 3]),
+            batcher.submit([4]),
+        )
+
+        assert results == [[2], [4, 6], [8]]
+        batch_fn.assert_called_once_with([1, 2, 3, 4])
+        assert batcher.get_stats()["avg_requests_per_batch"] == 3
+
+    @pytest.mark.asyncio
+    async def test_flushes_when_batch_is_full(self, executor):
+        batch_fn = MagicMock(side_effect=lambda items: items)
+        batcher = make_batcher(executor, batch_fn, max_batch_size=2, max_wait_ms=10_000)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(batcher.submit(["a"]), batcher.submit(["b"])),
+            timeout=1
+        )
+
+        assert results == [["a"], ["b"]]
+
+    @pytest.mark.asyncio
+    async def test_overflowing_request_starts_new_batch(self, executor):
+        batch_fn = MagicMock(side_effect=lambda items: items)
+        batcher = make_batcher(executor, batch_fn, max_batch_size=3, max_wait_ms=10)
+
+        await asyncio.gather(batcher.submit([1, 2]), batcher.submit([3, 4]))
+
+        assert [call.args[0] for call in batch_fn.call_args_list] == [[1, 2], [3, 4]]
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_waiter(self, executor):
+        def failing(items):
+            raise RuntimeError("model failed")
+
+        batcher = make_batcher(executor, failing, max_batch_size=10, max_wait_ms=5)
+
+        results = await asyncio.gather(
+            batcher.submit([1]), batcher.submit([2]), return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_disabled_batcher_calls_directly(self, executor):
+        batch_fn = MagicMock(side_effect=lambda items: items)
+        batcher = MicroBatcher(name="test", batch_fn=batch_fn, executor=executor, enabled=False)
+
+        await asyncio.gather(batcher.submit([1]), batcher.submit([2]))
+
+        assert batch_fn.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_running_batches_are_strongly_referenced(self):
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def run(fn, items):
+            started.set()
+            await release.wait()
+            return fn(items)
+
+        blocking_executor = MagicMock()
+        blocking_executor.run = run
+        batcher = make_batcher(blocking_executor, lambda items: items, max_batch_size=1, max_wait_ms=10)
+
+        waiter = asyncio.ensure_future(batcher.submit(["a"]))
+        await started.wait()
+        assert len(batcher._tasks) == 1
+
+        release.set()
+        assert await waiter == ["a"]
+        await asyncio.sleep(0)
+        assert batcher._tasks == set()
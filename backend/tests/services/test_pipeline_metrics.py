@@ -0,0 +1,55 @@
+"""
+Unit tests for pipeline stage metrics
+
+Tests per-request timings and the Prometheus stage histogram.
+"""
+
+import pytest
+from prometheus_client import REGISTRY
+
+from services.pipeline_metrics import record_stage, stage_timer
+
+
+def observed_count(stage):
+    return REGISTRY.get_sample_value(
+        "knowledgetree_search_stage_seconds_count", {"stage": stage}
+    ) or 0.0
+
+
+class TestStageTimer:
+    """Tests for stage_timer and record_stage"""
+
+    def test_records_timings_and_histogram(self):
+        before = observed_count("test_stage")
+        timings = {}
+
+        with stage_timer("test_stage", timings):
+            pass
+
+        assert set(timings) == {"test_stage_ms"}
+        assert observed_count("test_stage") == before + 1
+
+    def test_repeated_stage_accumulates(self):
+        timings = {}
+
+        record_stage("test_repeat", 0.010, timings)
+        record_stage("test_repeat", 0.005, timings)
+
+        assert timings["test_repeat_ms"] == pytest.approx(15.0)
+
+    def test_records_when_block_raises(self):
+        timings = {}
+
+        with pytest.raises(RuntimeError):
+            with stage_timer("test_failure", timings):
+                raise RuntimeError("boom")
+
+        assert "test_failure_ms" in timings
+
+    def test_without_timings_dict_only_histogram(self):
+        before = observed_count("test_no_dict")
+
+        with stage_timer("test_no_dict"):
+            pass
+
+        assert observed_count("test_no_dict") == before + 1
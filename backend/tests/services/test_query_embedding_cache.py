@@ -0,0 +1,71 @@
+"""
+Unit tests for QueryEmbeddingCache
+
+Tests normalization, LRU bounds and TTL expiry of the in-process tier.
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from services.query_embedding_cache import QueryEmbeddingCache
+
+
+@pytest.fixture
+def cache():
+    """Small memory-only cache"""
+    return QueryEmbeddingCache(max_size=2, ttl_seconds=60, use_redis=False)
+
+
+class TestQueryEmbeddingCache:
+    """Tests for QueryEmbeddingCache"""
+
+    def test_normalize_collapses_whitespace_and_preserves_case(self):
+        assert QueryEmbeddingCache.normalize("  JWT   Authentication\n") == "JWT Authentication"
+        assert QueryEmbeddingCache.normalize("ＪＷＴ token") == "JWT token"  # NFKC full-width
+
+    def test_get_or_compute_embeds_normalized_query_once(self, cache):
+        compute = MagicMock(return_value=[0.1, 0.2])
+
+        first = cache.get_or_compute("JWT  auth", compute)
+        second = cache.get_or_compute("JWT auth", compute)
+
+        assert first == second == [0.1, 0.2]
+        compute.assert_called_once_with("JWT auth")
+        assert cache.get_stats()["memory_hits"] == 1
+
+    def test_case_variants_are_distinct_entries(self, cache):
+        compute = MagicMock(side_effect=lambda q: [float(q.isupper())])
+
+        assert cache.get_or_compute("JWT", compute) == [1.0]
+        assert cache.get_or_compute("jwt", compute) == [0.0]
+        assert compute.call_count == 2
+
+    def test_lru_eviction(self, cache):
+        compute = MagicMock(side_effect=lambda q: [float(len(q))])
+
+        cache.get_or_compute("a", compute)
+        cache.get_or_compute("bb", compute)
+        cache.get_or_compute("a", compute)  # "a" becomes most recently used
+        cache.get_or_compute("ccc", compute)  # evicts "bb"
+
+        assert cache.get("a") is not None
+        assert cache.get("bb") is None
+        assert cache.evictions == 1
+
+    def test_entries_expire_after_ttl(self, cache):
+        cache.set("query", [1.0])
+
+        with patch("services.query_embedding_cache.time.time", return_value=10**12):
+            assert cache.get("query") is None
+
+    def test_redis_errors_fall_back_to_memory(self):
+        cache = QueryEmbeddingCache(max_size=10, ttl_seconds=60, use_redis=True)
+        failing = MagicMock()
+        failing.get.side_effect = ConnectionError("down")
+        cache._redis = failing
+
+        embedding = cache.get_or_compute("query", lambda q: [1.0])
+
+        assert embedding == [1.0]
+        assert cache.redis_errors == 1
+        assert cache.get("query") == [1.0]
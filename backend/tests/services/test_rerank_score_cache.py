@@ -0,0 +1,78 @@
+"""
+Unit tests for RerankScoreCache
+
+Tests content-versioned keys, LRU bounds, invalidation and the
+CrossEncoderService integration (only cache misses reach the model).
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from services.cross_encoder_service import CrossEncoderService
+from services.rerank_score_cache import RerankScoreCache
+
+
+def candidate(chunk_id, text, document_id=1):
+    return {"chunk_id": chunk_id, "chunk_text": text, "document_id": document_id}
+
+
+@pytest.fixture
+def cache():
+    """Small enabled cache"""
+    return RerankScoreCache(max_size=3, ttl_seconds=60, enabled=True)
+
+
+class TestRerankScoreCache:
+    """Tests for RerankScoreCache"""
+
+    def test_hit_requires_same_query_chunk_and_text(self, cache):
+        cache.put_many("jwt", [candidate(1, "tokens")], [0.9])
+
+        assert cache.get_many("jwt", [candidate(1, "tokens")]) == {0: 0.9}
+        assert cache.get_many("oauth", [candidate(1, "tokens")]) == {}
+        assert cache.get_many("jwt", [candidate(1, "edited tokens")]) == {}
+        assert cache.get_stats()["hit_rate"] == round(1 / 3, 4)
+
+    def test_lru_eviction(self, cache):
+        cache.put_many("q", [candidate(i, f"t{i}") for i in range(3)], [0.1, 0.2, 0.3])
+        cache.get_many("q", [candidate(0, "t0")])  # chunk 0 becomes most recently used
+        cache.put_many("q", [candidate(3, "t3")], [0.4])
+
+        assert cache.get_many("q", [candidate(1, "t1")]) == {}
+        assert cache.get_many("q", [candidate(0, "t0")]) == {0: 0.1}
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_invalidate_chunks_and_document(self, cache):
+        cache.put_many("q", [candidate(1, "a", 10), candidate(2, "b", 10), candidate(3, "c", 20)], [1, 2, 3])
+
+        assert cache.invalidate_chunks([1]) == 1
+        assert cache.invalidate_document(10) == 1
+        assert cache.get_many("q", [candidate(3, "c", 20)]) == {0: 3.0}
+        assert cache.get_stats()["invalidations"] == 2
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = RerankScoreCache(enabled=False)
+        cache.put_many("q", [candidate(1, "a")], [0.5])
+
+        assert cache.get_many("q", [candidate(1, "a")]) == {}
+
+
+class TestCrossEncoderIntegration:
+    """Tests for cached scoring in CrossEncoderService.rerank"""
+
+    @pytest.mark.asyncio
+    async def test_only_misses_are_scored(self, cache):
+        service = CrossEncoderService(score_cache=cache)
+        service.is_initialized = True
+        service.model = MagicMock()
+        service.batcher = MagicMock()
+        service.batcher.submit = AsyncMock(side_effect=lambda pairs: [len(text) / 10 for _, text in pairs])
+
+        await service.rerank("JWT  Tokens", [candidate(1, "a"), candidate(2, "bbb")], top_k=2)
+        reranked = await service.rerank("JWT Tokens", [candidate(3, "cc"), candidate(2, "bbb")], top_k=2)
+
+        first_pairs, second_pairs = (call.args[0] for call in service.batcher.submit.await_args_list)
+        assert first_pairs[0][0] == "JWT  Tokens"  # the model sees the query as written
+        assert second_pairs == [["JWT Tokens", "cc"]]
+        assert [r["chunk_id"] for r in reranked] == [2, 3]
+        assert reranked[0]["cross_encoder_score"] == pytest.approx(0.3)
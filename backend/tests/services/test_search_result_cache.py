@@ -0,0 +1,172 @@
+"""
+Unit tests for SearchResultCache
+
+Tests index-versioned keys, LRU bounds, the Redis tier backoff and the
+SearchService.search_with_reranking integration.
+"""
+
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+from services.search_result_cache import SearchResultCache
+from services.search_service import SearchService
+
+
+@pytest.fixture
+def cache():
+    """Small enabled memory-only cache"""
+    return SearchResultCache(max_size=2, ttl_seconds=60, use_redis=False, enabled=True)
+
+
+class TestSearchResultCache:
+    """Tests for SearchResultCache"""
+
+    def test_key_normalizes_query_and_includes_version(self):
+        key = SearchResultCache.make_key(1, 7, "JWT  Auth", {"limit": 5})
+
+        assert key == SearchResultCache.make_key(1, 7, "JWT Auth", {"limit": 5})
+        assert key != SearchResultCache.make_key(1, 7, "jwt auth", {"limit": 5})  # cased model
+        assert key != SearchResultCache.make_key(1, 8, "JWT Auth", {"limit": 5})
+        assert key != SearchResultCache.make_key(1, 7, "JWT Auth", {"limit": 10})
+        assert key != SearchResultCache.make_key(2, 7, "JWT Auth", {"limit": 5})
+
+    def test_returns_private_json_copies(self, cache):
+        created = datetime(2026, 1, 2, 3, 4, 5)
+        cache.set("k", [{"chunk_id": 1, "document_created_at": created}])
+
+        first = cache.get("k")
+        first[0]["chunk_id"] = 99
+
+        assert cache.get("k") == [{"chunk_id": 1, "document_created_at": str(created)}]
+
+    def test_lru_eviction(self, cache):
+        cache.set("a", [])
+        cache.set("b", [])
+        cache.get("a")  # "a" becomes most recently used
+        cache.set("c", [])
+
+        assert cache.get("b") is None
+        assert cache.get("a") == []
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_redis_tier_and_backoff(self):
+        cache = SearchResultCache(ttl_seconds=60, use_redis=True, enabled=True)
+        cache._redis = MagicMock()
+        cache._redis.get.return_value = b'[{"chunk_id": 3}]'
+
+        assert cache.get("shared") == [{"chunk_id": 3}]
+        assert cache.get("shared") == [{"chunk_id": 3}]  # now served from memory
+        assert cache._redis.get.call_count == 1
+
+        cache._redis.setex.side_effect = ConnectionError("down")
+        cache.set("other", [])
+        cache.get("missing")
+
+        assert cache.get_stats()["redis_errors"] == 1
+        assert cache._redis.get.call_count == 1  # backing off
+
+    @pytest.mark.asyncio
+    async def test_async_api_calls_redis_off_the_event_loop(self):
+        import threading
+
+        cache = SearchResultCache(ttl_seconds=60, use_redis=True, enabled=True)
+        cache._redis = MagicMock()
+        redis_threads = []
+        cache._redis.get.side_effect = lambda key: redis_threads.append(threading.get_ident())
+        cache._redis.setex.side_effect = lambda *args: redis_threads.append(threading.get_ident())
+
+        assert await cache.get_async("k") is None
+        await cache.set_async("k", {"results": []})
+
+        assert await cache.get_async("k") == {"results": []}  # memory tier, no Redis call
+        assert len(redis_threads) == 2
+        assert threading.get_ident() not in redis_threads
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = SearchResultCache(enabled=False)
+        cache.set("k", [{"chunk_id": 1}])
+
+        assert cache.get("k") is None
+
+
+class TestSearchServiceIntegration:
+    """Tests for cached search_with_reranking"""
+
+    @pytest.fixture
+    def service(self, cache):
+        service = SearchService()
+        service.search_result_cache = cache
+        service._search_with_reranking_uncached = AsyncMock(return_value=([{"chunk_id": 1}], 12.0))
+        return service
+
+    @pytest.mark.asyncio
+    async def test_repeat_query_served_until_version_changes(self, service):
+        service.get_project_index_version = AsyncMock(return_value=(4, 60.0))
+
+        await service.search_with_reranking(db=None, query="JWT auth", project_id=1)
+        results, _ = await service.search_with_reranking(db=None, query="JWT  auth", project_id=1)
+
+        assert results == [{"chunk_id": 1}]
+        assert service._search_with_reranking_uncached.await_count == 1
+
+        service.get_project_index_version = AsyncMock(return_value=(5, 60.0))
+        await service.search_with_reranking(db=None, query="JWT auth", project_id=1)
+
+        assert service._search_with_reranking_uncached.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_different_parameters_miss(self, service):
+        service.get_project_index_version = AsyncMock(return_value=(4, 60.0))
+
+        await service.search_with_reranking(db=None, query="jwt", project_id=1, category_id=2)
+        await service.search_with_reranking(db=None, query="jwt", project_id=1, category_id=3)
+
+        assert service._search_with_reranking_uncached.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_recent_bump_is_not_cached(self, service):
+        # BM25 may not have synced chunks committed less than a sync interval ago
+        service.get_project_index_version = AsyncMock(return_value=(4, 0.5))
+
+        await service.search_with_reranking(db=None, query="jwt", project_id=1)
+        await service.search_with_reranking(db=None, query="jwt", project_id=1)
+
+        assert service._search_with_reranking_uncached.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_version_unavailable_bypasses_cache(self, service):
+        service.get_project_index_version = AsyncMock(return_value=None)
+
+        await service.search_with_reranking(db=None, query="jwt", project_id=1)
+        await service.search_with_reranking(db=None, query="jwt", project_id=1)
+
+        assert service._search_with_reranking_uncached.await_count == 2
+        assert service.search_result_cache.get_stats()["misses"] == 0
+
+
+class TestProjectIndexVersion:
+    """Tests for SearchService.get_project_index_version"""
+
+    @pytest.mark.asyncio
+    async def test_failed_probe_keeps_caller_transaction(self):
+        from contextlib import asynccontextmanager
+
+        savepoints = []
+
+        @asynccontextmanager
+        async def begin_nested():
+            try:
+                yield
+            except Exception:
+                savepoints.append("rolled back")
+                raise
+
+        db = MagicMock()
+        db.begin_nested = begin_nested
+        db.execute = AsyncMock(side_effect=RuntimeError('relation "project_index_versions" does not exist'))
+        db.rollback = AsyncMock()
+
+        assert await SearchService().get_project_index_version(db, 1) is None
+        assert savepoints == ["rolled back"]
+        db.rollback.assert_not_awaited()
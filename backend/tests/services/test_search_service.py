@@ -12,6 +12,48 @@ from unittest.mock import AsyncMock, MagicMock, patch
 from services.search_service import SearchService
 
 
+def make_fake_models():
+    """Declarative Chunk / Document stand-ins that compile real SQL"""
+    from sqlalchemy import Column, Integer, Text
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.orm import declarative_base
+
+    Base = declarative_base()
+
+    class FakeDocument(Base):
+        __tablename__ = "documents"
+        id = Column(Integer, primary_key=True)
+        title = Column(Text)
+        filename = Column(Text)
+        created_at = Column(Text)
+
+    class FakeChunk(Base):
+        __tablename__ = "chunks"
+        id = Column(Integer, primary_key=True)
+        document_id = Column(Integer)
+        project_id = Column(Integer)
+        text = Column(Text)
+        chunk_index = Column(Integer)
+        chunk_metadata = Column(Text)
+        has_embedding = Column(Integer)
+        text_search = Column(postgresql.TSVECTOR)
+
+    return FakeChunk, FakeDocument
+
+
+def sparse_rows_result(score: float):
+    """Result mock holding one joined chunk/document row"""
+    from types import SimpleNamespace
+
+    row = SimpleNamespace(
+        id=5, document_id=2, text="JWT tokens", chunk_index=3, chunk_metadata=None,
+        title="Auth", filename="auth.pdf", created_at="2024-01-01", score=score
+    )
+    result = MagicMock()
+    result.fetchall.return_value = [row]
+    return result
+
+
 @pytest.fixture
 def search_service():
     """Create SearchService instance"""
@@ -212,6 +254,86 @@ class TestSparseSearch:
             assert execution_time > 0
             assert 'bm25_score' in results[0]
 
+    @pytest.mark.asyncio
+    async def test_postgres_engine_skips_in_memory_index(self, search_service):
+        """Test engine="postgres" does not touch the BM25 index"""
+        mock_db = AsyncMock()
+        search_service.bm25_service = MagicMock()
+
+        with patch.object(search_service, '_search_sparse_postgres', AsyncMock(return_value=[])) as fts:
+            results, _ = await search_service.search_sparse(
+                db=mock_db, query="jwt", project_id=1, engine="postgres"
+            )
+
+        assert results == []
+        fts.assert_awaited_once_with(mock_db, "jwt", 1, 20, 0.0)
+        search_service.bm25_service.prepare.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unknown_engine_is_rejected(self, search_service):
+        with pytest.raises(ValueError):
+            await search_service.search_sparse(db=AsyncMock(), query="jwt", project_id=1, engine="solr")
+
+    @pytest.mark.asyncio
+    async def test_postgres_query_uses_gin_match_and_ts_rank_cd(self, search_service):
+        """Test the full-text query shape and the shared result contract"""
+        from sqlalchemy.dialects import postgresql
+
+        FakeChunk, FakeDocument = make_fake_models()
+        mock_db = AsyncMock()
+        mock_db.execute.return_value = sparse_rows_result(score=0.42)
+
+        with patch("services.search_service.Chunk", FakeChunk), patch("services.search_service.Document", FakeDocument):
+            results = await search_service._search_sparse_postgres(mock_db, "jwt tokens", 1, 10, 0.0)
+
+        sql = str(mock_db.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "plainto_tsquery('simple'::regconfig" in sql
+        assert "@@" in sql and "ts_rank_cd" in sql
+        assert "chunks.chunk_index" in sql
+        assert results[0]["chunk_id"] == 5
+        assert results[0]["chunk_index"] == 3
+        assert results[0]["similarity_score"] == 0.42
+        assert results[0]["source"] == "sparse"
+
+    @pytest.mark.asyncio
+    async def test_lexical_query_scores_postings_by_dot_product(self, search_service):
+        """Test engine="lexical" joins query weights with chunk_sparse_terms"""
+        from sqlalchemy.dialects import postgresql
+
+        FakeChunk, FakeDocument = make_fake_models()
+        mock_db = AsyncMock()
+        mock_db.execute.return_value = sparse_rows_result(score=0.31)
+        search_service.query_lexical_batcher = MagicMock()
+        search_service.query_lexical_batcher.submit = AsyncMock(return_value=[{101: 0.3, 2048: 0.2}])
+
+        with patch("services.search_service.Chunk", FakeChunk), patch("services.search_service.Document", FakeDocument):
+            results, _ = await search_service.search_sparse(
+                db=mock_db, query="tokeny jwt", project_id=1, limit=10, engine="lexical"
+            )
+
+        compiled = mock_db.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+        sql = str(compiled)
+        assert "unnest" in sql and "chunk_sparse_terms" in sql
+        assert "sum(chunk_sparse_terms.weight * query_terms.weight)" in sql
+        assert compiled.params["query_term_ids"] == [101, 2048]
+        assert "chunks.chunk_index" in sql
+        assert results[0]["chunk_id"] == 5
+        assert results[0]["chunk_index"] == 3
+        assert results[0]["similarity_score"] == 0.31
+
+    @pytest.mark.asyncio
+    async def test_lexical_query_without_terms_skips_database(self, search_service):
+        mock_db = AsyncMock()
+        search_service.query_lexical_batcher = MagicMock()
+        search_service.query_lexical_batcher.submit = AsyncMock(return_value=[None])
+
+        results, _ = await search_service.search_sparse(
+            db=mock_db, query="   ", project_id=1, engine="lexical"
+        )
+
+        assert results == []
+        mock_db.execute.assert_not_called()
+
 
 class TestHybridSearch:
     """Tests for hybrid search combining vector + sparse"""
@@ -380,3 +502,186 @@ class TestReranking:
             assert 'rerank_score' in results[0]
             assert 'search_time_ms' in meta
             assert 'rerank_time_ms' in meta
+
+
+class TestRerankingPipelineMetadata:
+    """Tests for pipeline metadata and optional explanations in search_with_reranking"""
+
+    async def run_pipeline(self, search_service, **kwargs):
+        from services.search_result_cache import SearchResultCache
+
+        search_service.search_result_cache = SearchResultCache(enabled=False)
+        hybrid_results = [
+            {"chunk_id": 1, "chunk_text": "jwt tokens", "rrf_score": 0.03},
+            {"chunk_id": 2, "chunk_text": "oauth", "rrf_score": 0.02},
+        ]
+        pipeline = {}
+        with patch.object(search_service, "hybrid_search", AsyncMock(return_value=(hybrid_results, 1.0))), \
+                patch("services.search_service.reranking_optimizer") as optimizer, \
+                patch("services.search_service.explainability_service") as explainer:
+            optimizer.should_skip_reranking.return_value = (True, {"skip_reason": "high_confidence"})
+            optimizer.get_confidence_level.return_value = "high"
+            explainer.explain_results.side_effect = lambda results, **_: [
+                {**r, "explanation": {"score_type": "rrf_score"}} for r in results
+            ]
+
+            results, _ = await search_service.search_with_reranking(
+                db=AsyncMock(), query="jwt", project_id=1,
+                use_query_expansion=False, use_crag=False, pipeline=pipeline, **kwargs
+            )
+        return results, pipeline, explainer
+
+    @pytest.mark.asyncio
+    async def test_metadata_reported_once_not_per_result(self, search_service):
+        results, pipeline, _ = await self.run_pipeline(search_service)
+
+        assert pipeline["confidence_level"] == "high"
+        assert pipeline["reranking_skipped"] is True
+        assert pipeline["query_expansion"] == {"used": False}
+        assert pipeline["crag_evaluation"] == {"used": False}
+        for result in results:
+            assert not {"confidence_level", "skip_metrics", "query_expansion", "crag_evaluation"} & set(result)
+
+    @pytest.mark.asyncio
+    async def test_explanations_only_when_requested(self, search_service):
+        results, _, explainer = await self.run_pipeline(search_service)
+        assert not explainer.explain_results.called
+        assert "explanation" not in results[0]
+
+        results, _, explainer = await self.run_pipeline(search_service, include_explanations=True)
+        assert explainer.explain_results.called
+        assert results[0]["explanation"] == {"score_type": "rrf_score"}
+
+
+class TestMultiQuery:
+    """Tests for batched multi-query dense retrieval"""
+
+    @pytest.mark.asyncio
+    async def test_embed_queries_encodes_misses_in_one_batch(self, search_service):
+        from services.query_embedding_cache import QueryEmbeddingCache
+
+        search_service.query_embedding_cache = QueryEmbeddingCache(max_size=10, ttl_seconds=60, use_redis=False)
+        search_service.query_embedding_cache.set("cached", [1.0])
+        search_service.query_embedding_batcher = MagicMock()
+        search_service.query_embedding_batcher.submit = AsyncMock(
+            side_effect=lambda texts: [[float(len(t))] for t in texts]
+        )
+
+        embeddings = await search_service.embed_queries(["cached", "New one", "New  one", "new one"])
+
+        assert embeddings == [[1.0], [7.0], [7.0], [7.0]]
+        search_service.query_embedding_batcher.submit.assert_awaited_once_with(["New one", "new one"])
+
+    @pytest.mark.asyncio
+    async def test_search_multi_runs_one_statement_and_splits_by_query(self, search_service):
+        from types import SimpleNamespace
+        from sqlalchemy import Column, Integer, Text
+        from sqlalchemy.dialects import postgresql
+        from sqlalchemy.orm import declarative_base
+        from pgvector.sqlalchemy import Vector
+
+        Base = declarative_base()
+
+        class FakeDocument(Base):
+            __tablename__ = "documents"
+            id = Column(Integer, primary_key=True)
+            project_id = Column(Integer)
+            category_id = Column(Integer)
+            title = Column(Text)
+            filename = Column(Text)
+            created_at = Column(Text)
+
+        class FakeChunk(Base):
+            __tablename__ = "chunks"
+            id = Column(Integer, primary_key=True)
+            document_id = Column(Integer)
+            project_id = Column(Integer)
+            text = Column(Text)
+            chunk_index = Column(Integer)
+            chunk_metadata = Column(Text)
+            has_embedding = Column(Integer)
+            embedding = Column(Vector(3))
+
+        def row(chunk_id, query_index, distance):
+            return SimpleNamespace(
+                chunk_id=chunk_id, query_index=query_index, distance=distance, document_id=1,
+                chunk_text="t", chunk_index=0, chunk_metadata=None,
+                document_title="Doc", document_filename="doc.pdf", document_created_at="2024-01-01"
+            )
+
+        result = MagicMock()
+        result.fetchall.return_value = [row(1, 0, 0.1), row(2, 0, 0.7), row(2, 1, 0.2)]
+        db = AsyncMock()
+        db.execute.return_value = result
+        search_service.embed_queries = AsyncMock(return_value=[[0.1, 0.2, 0.3], [0.3, 0.2, 0.1]])
+
+        with patch("services.search_service.Chunk", FakeChunk), \
+                patch("services.search_service.Document", FakeDocument), \
+                patch("services.search_service.settings.VECTOR_SEARCH_MODE", "float32"), \
+                patch("services.search_service.settings.HNSW_ITERATIVE_SCAN", "off"):
+            results, _ = await search_service.search_multi(
+                db=db, queries=["jwt", "json web token"], project_id=1, limit=5, min_similarity=0.5
+            )
+
+        search_service.embed_queries.assert_awaited_once_with(["jwt", "json web token"])
+        sql = str(db.execute.await_args_list[-1].args[0].compile(dialect=postgresql.dialect()))
+        assert sql.count("UNION ALL") == 1
+        assert sql.count("LIMIT") == 2  # one k-NN branch per query
+        assert [[r["chunk_id"] for r in lst] for lst in results] == [[1], [2]]
+
+    @pytest.mark.asyncio
+    async def test_binary_mode_rescores_inside_materialized_cte(self, search_service):
+        from sqlalchemy import Column, Integer, Text
+        from sqlalchemy.dialects import postgresql
+        from sqlalchemy.orm import declarative_base
+        from pgvector.sqlalchemy import BIT, HALFVEC
+
+        Base = declarative_base()
+
+        class FakeDocument(Base):
+            __tablename__ = "documents"
+            id = Column(Integer, primary_key=True)
+            project_id = Column(Integer)
+            category_id = Column(Integer)
+            title = Column(Text)
+            filename = Column(Text)
+            created_at = Column(Text)
+
+        class FakeChunk(Base):
+            __tablename__ = "chunks"
+            id = Column(Integer, primary_key=True)
+            document_id = Column(Integer)
+            project_id = Column(Integer)
+            text = Column(Text)
+            chunk_index = Column(Integer)
+            chunk_metadata = Column(Text)
+            has_embedding = Column(Integer)
+            embedding = Column(HALFVEC(3))
+            embedding_bin = Column(BIT(3))
+
+        result = MagicMock()
+        result.fetchall.return_value = []
+        db = AsyncMock()
+        db.execute.return_value = result
+        search_service.embed_query = AsyncMock(return_value=[0.1, -0.2, 0.3])
+
+        with patch("services.search_service.Chunk", FakeChunk), \
+                patch("services.search_service.Document", FakeDocument), \
+                patch("services.search_service.settings.BINARY_RESCORE_FACTOR", 10), \
+                patch("services.search_service.settings.HNSW_ITERATIVE_SCAN", "off"):
+            await search_service.search(
+                db=db, query="jwt", project_id=1, limit=5, vector_mode="binary"
+            )
+
+        compiled = db.execute.await_args_list[-1].args[0].compile(dialect=postgresql.dialect())
+        sql = str(compiled)
+        cte_sql, outer_sql = sql.split(")\n SELECT", 1)
+        # Hamming candidates and their cosine distances come from the CTE ...
+        assert "WITH binary_candidates AS MATERIALIZED" in cte_sql
+        assert "<~>" in cte_sql and "<=>" in cte_sql
+        assert "CAST(" in cte_sql and "AS HALFVEC(3))" in cte_sql
+        # ... so the outer rescoring order can't be served by an index scan
+        assert "<=>" not in outer_sql
+        assert "ORDER BY binary_candidates.distance" in outer_sql
+        assert compiled.params["embedding_bin_1"] == "101"
+        assert 50 in compiled.params.values() and 5 in compiled.params.values()